@@ -1,13 +1,39 @@
 # app/__init__.py
+import os
+import weakref
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
-from app.extensions import db, jwt, migrate
+from app.extensions import db, idempotency, jwt, migrate, metrics, product_index, profiler, rate_limiter, readiness, report_cache, revenue_cache, sql_timing, token_blocklist, token_versions
 from app.api import register_blueprints
-from app.utils.logging_config import configure_logging
+from app.utils.logging_config import attach_handlers, configure_logging
+
+# Apps created in this process; forked children must not reuse their pooled connections
+_apps = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    """Make state inherited from a preloading parent (e.g. gunicorn --preload) private to the child."""
+    for app in list(_apps):
+        with app.app_context():
+            for engine in db.engines.values():
+                # close=False leaves the parent's sockets alone and just forgets them here
+                engine.dispose(close=False)
+    attach_handlers()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    _apps.add(app)
+    
+    # request.remote_addr is the client behind PROXY_FIX_X_FOR trusted proxies
+    if app.config.get('PROXY_FIX_X_FOR'):
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
     
     # Configure logging
     configure_logging(app)
@@ -16,6 +42,17 @@ def create_app(config_class=Config):
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    report_cache.init_app(app)
+    sql_timing.init_app(app)
+    metrics.init_app(app)
+    readiness.init_app(app)
+    profiler.init_app(app)
+    idempotency.init_app(app)
+    token_versions.init_app(app)
+    token_blocklist.init_app(app)
+    rate_limiter.init_app(app)
+    product_index.init_app(app)
+    revenue_cache.init_app(app)
     
     # Register blueprints
     register_blueprints(app)
@@ -24,5 +61,11 @@ def create_app(config_class=Config):
     def health_check():
         return {'status': 'ok'}
     
+    @app.route('/health/ready')
+    def readiness_check():
+        result, cached = readiness.check(db.engine)
+        status_code = 200 if result['status'] == 'ok' else 503
+        return {**result, 'cached': cached}, status_code
+    
     app.logger.info("Application initialized successfully")
     return app
\ No newline at end of file
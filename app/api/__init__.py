@@ -3,10 +3,12 @@ from app.api.users import users_bp
 from app.api.orders import orders_bp
 from app.api.reports import reports_bp
 from app.api.auth import auth_bp
+from app.api.products import products_bp
 
 
 def register_blueprints(app):
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(orders_bp, url_prefix='/api/orders')
     app.register_blueprint(reports_bp, url_prefix='/api/reports')
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
\ No newline at end of file
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(products_bp, url_prefix='/api/products')
\ No newline at end of file
@@ -1,8 +1,12 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from app.extensions import db, jwt
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
+from werkzeug.http import http_date
+from app.extensions import db, jwt, rate_limiter, token_blocklist, token_versions
 from app.schemas import UserLogin
 from app.utils.helpers import format_error_message
+from app.utils.metrics import record_error
+from app.utils.token_blocklist import revoke_token
 from pydantic import ValidationError
 from sqlalchemy import text
 
@@ -14,6 +18,12 @@ def login():
     data = request.get_json()
     try:
         user_data = UserLogin.model_validate(data)
+        # Throttled before any query so bursts of attempts never reach the database
+        wait = rate_limiter.check_login(request.remote_addr, user_data.email)
+        if wait:
+            response = jsonify({"message": "Too many login attempts", "error": "rate_limited"})
+            response.headers['Retry-After'] = str(wait)
+            return response, 429
         with db.engine.connect() as connection:
             query = text("""
             SELECT * FROM auth_login(:email)
@@ -32,23 +42,52 @@ def login():
                 "created_at": user_row.created_at
             }
             
-            access_token = create_access_token(identity=str(user_dict["id"]))  # Ensure ID is a string
+            # Signed claims let /verify answer without a query; `ver` is
+            # checked against user_token_versions on every request
+            access_token = create_access_token(
+                identity=str(user_dict["id"]),  # Ensure ID is a string
+                additional_claims={
+                    "email": user_row.email,
+                    "name": user_row.name,
+                    "created_at": http_date(user_row.created_at) if user_row.created_at else None,
+                    "ver": user_row.token_version
+                }
+            )
             return jsonify({
                 "access_token": access_token,
                 "user": user_dict
             }), 200
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
     except Exception as e:
+        record_error(e)
         return jsonify({"message": "Server error", "error": str(e)}), 500
     
 
 @auth_bp.route('/verify', methods=['GET'])
 @jwt_required()
 def verify_token():
-    current_user_id = get_jwt_identity()
+    # The token's signature, expiry and version were checked by jwt_required,
+    # so the user comes straight from its claims
+    claims = get_jwt()
+    if "email" not in claims:
+        # Issued before tokens carried the user's details
+        return verify_token_from_db(claims["sub"])
+    user_dict = {
+        "id": claims["sub"],
+        "email": claims["email"],
+        "name": claims.get("name"),
+        "created_at": claims.get("created_at")
+    }
+    return jsonify({
+        "message": "Token is valid",
+        "user": user_dict
+    }), 200
+
+def verify_token_from_db(current_user_id):
     try:
         # Use stored procedure to verify user
         with db.engine.connect() as connection:
@@ -72,8 +111,46 @@ def verify_token():
                 "user": user_dict
             }), 200
     except Exception as e:
+        record_error(e)
+        return jsonify({"message": "Server error", "error": str(e)}), 500
+
+@auth_bp.route('/logout', methods=['POST'])
+@jwt_required()
+def logout():
+    claims = get_jwt()
+    try:
+        # Kept until the token would have expired anyway
+        expires_at = datetime.utcfromtimestamp(claims["exp"]) if "exp" in claims else datetime.max
+        with db.engine.begin() as connection:
+            revoke_token(connection, claims["jti"], claims["sub"], expires_at)
+        token_blocklist.add(claims["jti"])
+        return jsonify({"message": "Token revoked"}), 200
+    except Exception as e:
+        record_error(e)
         return jsonify({"message": "Server error", "error": str(e)}), 500
 
+@jwt.token_in_blocklist_loader
+def token_in_blocklist_callback(jwt_header, jwt_payload):
+    return token_blocklist.is_revoked(jwt_payload["jti"], db.engine)
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    return jsonify({
+        "message": "The token has been revoked",
+        "error": "token_revoked"
+    }), 401
+
+@jwt.token_verification_loader
+def token_version_callback(jwt_header, jwt_payload):
+    return token_versions.is_current(jwt_payload["sub"], jwt_payload.get("ver", 0), db.engine)
+
+@jwt.token_verification_failed_loader
+def revoked_version_callback(jwt_header, jwt_payload):
+    return jsonify({
+        "message": "The token has been revoked",
+        "error": "token_revoked"
+    }), 401
+
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
     return jsonify({
@@ -1,13 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
+from app.extensions import db, idempotency, report_cache
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from pydantic import ValidationError
-from app.schemas import OrderCreate, OrderList, GetOrderId
+from app.schemas import DateRangeParams, OrderCreate, OrderList, GetOrderId
 from app.utils.helpers import format_error_message
 from app.utils.helpers import get_pagination_params
+from app.utils.metrics import record_error
 from app.utils.db_utils import TransactionManager
+from app.utils.http_cache import conditional_by_user_version
+from app.utils.idempotency import IDEMPOTENCY_HEADER, MAX_KEY_LENGTH, request_fingerprint
+from app.utils.order_queue import enqueue_order, get_order_status
+from app.utils.order_writer import write_order
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,6 +20,7 @@ orders_bp = Blueprint('orders', __name__)
 
 @orders_bp.route('/<order_id>', methods=['GET'])
 @jwt_required()
+@conditional_by_user_version
 def get_order_by_id(order_id):
     current_user_id = get_jwt_identity()
     
@@ -39,13 +45,29 @@ def get_order_by_id(order_id):
             
             order_row = result.fetchone()
             if not order_row:
-                return jsonify({"message": "Order not found"}), 404
+                # Old orders live in orders_archive with their lines
+                query = text("""
+                SELECT * FROM get_archived_order(:order_id, :user_id)
+                """)
+                archived_row = connection.execute(
+                    query, {"order_id": str(validated_id.order_id), "user_id": current_user_id}
+                ).fetchone()
+                if not archived_row:
+                    return jsonify({"message": "Order not found"}), 404
+                return jsonify({"order": {
+                    "id": archived_row.id,
+                    "user_id": archived_row.user_id,
+                    "customer_name": archived_row.customer_name,
+                    "total_price": archived_row.total_price,
+                    "created_at": archived_row.created_at,
+                    "products": archived_row.products
+                }}), 200
                 
             order = {
                 "id": order_row.id,
                 "user_id": order_row.user_id,
                 "customer_name": order_row.customer_name,
-                "total_price": float(order_row.total_price) if order_row.total_price else 0.0,
+                "total_price": order_row.total_price,
                 "created_at": order_row.created_at,
                 "products": []
             }
@@ -62,29 +84,77 @@ def get_order_by_id(order_id):
                     "id": prod_row.product_id,
                     "name": prod_row.product_name,
                     "quantity": prod_row.quantity,
-                    "unit_price": float(prod_row.unit_price) if prod_row.unit_price else 0.0
+                    "unit_price": prod_row.unit_price
                 })
                 
             return jsonify({"order": order}), 200
             
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
         
     except IntegrityError as e:
+        record_error(e)
         logger.error(f"Database integrity error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "A database constraint was violated"
         }), 400
         
     except SQLAlchemyError as e:
+        record_error(e)
         logger.error(f"Database error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "A database error occurred"
         }), 500
         
     except Exception as e:
+        record_error(e)
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "An unexpected error occurred"
+        }), 500
+    
+
+@orders_bp.route('/<order_id>/status', methods=['GET'])
+@jwt_required()
+def get_order_status_by_id(order_id):
+    current_user_id = get_jwt_identity()
+    
+    try:
+        validated_id = GetOrderId(order_id=order_id)
+        
+        with db.engine.connect() as connection:
+            status_row = get_order_status(connection, str(validated_id.order_id), current_user_id)
+        
+        if not status_row:
+            return jsonify({"message": "Order not found"}), 404
+        
+        order_status = {
+            "id": str(validated_id.order_id),
+            "status": status_row.status,
+            "created_at": status_row.created_at
+        }
+        if status_row.error:
+            order_status["error"] = status_row.error
+        return jsonify({"order": order_status}), 200
+    
+    except ValidationError as e:
+        record_error(e)
+        error_details = e.errors()
+        error_messages = [format_error_message(err) for err in error_details]
+        return jsonify({"message": "Validation error", "details": error_messages}), 400
+        
+    except SQLAlchemyError as e:
+        record_error(e)
+        logger.error(f"Database error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "A database error occurred"
+        }), 500
+        
+    except Exception as e:
+        record_error(e)
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "An unexpected error occurred"
@@ -93,6 +163,7 @@ def get_order_by_id(order_id):
 
 @orders_bp.route('', methods=['GET'])
 @jwt_required()
+@conditional_by_user_version
 def get_orders():
     current_user_id = get_jwt_identity()
     page, per_page = get_pagination_params()
@@ -100,47 +171,20 @@ def get_orders():
     try:
         validated_params = OrderList(**request.args)
         
+        filtered = any(value is not None for value in (
+            validated_params.customer_name, validated_params.start_date, validated_params.end_date
+        ))
+        
         # Call stored procedure for orders
         with db.engine.connect() as connection:
-            # Get all orders without pagination from database
-            query = text("""
-            SELECT * FROM get_user_orders(
-                :user_id, 
-                :customer_name, 
-                :start_date, 
-                :end_date
-            )
-            """)
-            
-            result = connection.execute(
-                query,
-                {
-                    "user_id": current_user_id,
-                    "customer_name": validated_params.customer_name,
-                    "start_date": validated_params.start_date,
-                    "end_date": validated_params.end_date
-                }
-            )
-            
-            all_orders = []
-            for row in result:
-                all_orders.append({
-                    "id": row.id,
-                    "user_id": row.user_id,
-                    "customer_name": row.customer_name,
-                    "total_price": float(row.total_price) if row.total_price else 0.0,
-                    "created_at": row.created_at
-                })
-            
-            # Calculate pagination in Python
-            total_count = len(all_orders)
+            if filtered:
+                total_count, paginated_orders = get_filtered_orders_page(
+                    connection, current_user_id, validated_params, page, per_page
+                )
+            else:
+                total_count, paginated_orders = get_orders_page(connection, current_user_id, page, per_page)
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
             
-            # Apply pagination in Python
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            paginated_orders = all_orders[start_idx:end_idx] if all_orders else []
-            
             # Extract order IDs for product lookup
             order_ids = [order["id"] for order in paginated_orders]
             
@@ -171,7 +215,7 @@ def get_orders():
                         "id": prod_row.product_id,
                         "name": prod_row.product_name,
                         "quantity": prod_row.quantity,
-                        "unit_price": float(prod_row.unit_price) if prod_row.unit_price else 0.0
+                        "unit_price": prod_row.unit_price
                     })
                 
                 # Add products to their respective orders
@@ -194,33 +238,163 @@ def get_orders():
         
         
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
         
     except IntegrityError as e:
+        record_error(e)
         logger.error(f"Database integrity error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "A database constraint was violated"
         }), 400
         
     except SQLAlchemyError as e:
+        record_error(e)
         logger.error(f"Database error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "A database error occurred"
         }), 500
         
     except Exception as e:
+        record_error(e)
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "An unexpected error occurred"
+        }), 500
+    
+
+@orders_bp.route('/summary', methods=['GET'])
+@jwt_required()
+def get_order_summary():
+    # Not conditional: "today" moves on at midnight without a new order
+    current_user_id = get_jwt_identity()
+    
+    try:
+        validated_params = DateRangeParams(**request.args)
+        
+        with db.engine.connect() as connection:
+            query = text("""
+            SELECT * FROM get_user_order_summary(:user_id, :start_day, :end_day)
+            """)
+            row = connection.execute(query, {
+                "user_id": current_user_id,
+                "start_day": validated_params.start_date,
+                "end_day": validated_params.end_date
+            }).fetchone()
+        
+        summary = {
+            "date": row.today.isoformat(),
+            "today": {"order_count": row.today_orders, "revenue": row.today_revenue},
+            "this_month": {"order_count": row.month_orders, "revenue": row.month_revenue},
+            "all_time": {"order_count": row.total_orders, "revenue": row.total_revenue}
+        }
+        if validated_params.start_date is not None or validated_params.end_date is not None:
+            summary["range"] = {
+                "start_date": validated_params.start_date,
+                "end_date": validated_params.end_date,
+                "order_count": row.range_orders,
+                "revenue": row.range_revenue
+            }
+        return jsonify({"summary": summary}), 200
+    
+    except ValidationError as e:
+        record_error(e)
+        error_details = e.errors()
+        error_messages = [format_error_message(err) for err in error_details]
+        return jsonify({"message": "Validation error", "details": error_messages}), 400
+    
+    except IntegrityError as e:
+        record_error(e)
+        logger.error(f"Database integrity error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "A database constraint was violated"
+        }), 400
+    
+    except SQLAlchemyError as e:
+        record_error(e)
+        logger.error(f"Database error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "A database error occurred"
+        }), 500
+    
+    except Exception as e:
+        record_error(e)
         logger.error(f"Unexpected error: {str(e)}", exc_info=True)
         return jsonify({
             "message": "An unexpected error occurred"
         }), 500
+
+
+def order_from_row(row):
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "customer_name": row.customer_name,
+        "total_price": row.total_price,
+        "created_at": row.created_at
+    }
+
+
+def get_orders_page(connection, user_id, page, per_page):
+    """(total, orders) for one page of all the user's orders.
+
+    The total comes from the daily counters in user_order_stats, read in the
+    same statement as the page, so only the page's orders are scanned.
+    Archived orders are counted there but not listed.
+    """
+    query = text("""
+    SELECT o.*, (SELECT total_orders - archived_orders FROM get_user_order_summary(:user_id)) AS total_count
+    FROM get_user_orders(:user_id) o
+    LIMIT :limit OFFSET :offset
+    """)
+    rows = connection.execute(
+        query, {"user_id": user_id, "limit": per_page, "offset": (page - 1) * per_page}
+    ).fetchall()
+    if rows:
+        return rows[0].total_count, [order_from_row(row) for row in rows]
+    # Past the last page (or no orders): there was no row to carry the total
+    query = text("""
+    SELECT total_orders - archived_orders FROM get_user_order_summary(:user_id)
+    """)
+    return connection.execute(query, {"user_id": user_id}).scalar(), []
+
+
+def get_filtered_orders_page(connection, user_id, validated_params, page, per_page):
+    """(total, orders) for one page of the user's orders matching the filters."""
+    # Get all orders without pagination from database
+    query = text("""
+    SELECT * FROM get_user_orders(
+        :user_id, 
+        :customer_name, 
+        :start_date, 
+        :end_date
+    )
+    """)
+    
+    result = connection.execute(
+        query,
+        {
+            "user_id": user_id,
+            "customer_name": validated_params.customer_name,
+            "start_date": validated_params.start_date,
+            "end_date": validated_params.end_date
+        }
+    )
+    all_orders = [order_from_row(row) for row in result]
     
+    # Apply pagination in Python
+    start_idx = (page - 1) * per_page
+    end_idx = start_idx + per_page
+    return len(all_orders), all_orders[start_idx:end_idx]
+
 
 @orders_bp.route('', methods=['POST'])
 @jwt_required()
 def create_order():
     current_user_id = get_jwt_identity()
+    idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
     
     try:
         data = request.get_json()
@@ -229,124 +403,83 @@ def create_order():
         
         order_data = OrderCreate.model_validate(data)
         
+        request_hash = None
+        if idempotency_key is not None:
+            if not 0 < len(idempotency_key) <= MAX_KEY_LENGTH:
+                return jsonify({
+                    "message": "Validation error",
+                    "details": [f"{IDEMPOTENCY_HEADER}: must be between 1 and {MAX_KEY_LENGTH} characters"]
+                }), 400
+            request_hash = request_fingerprint(data)
+            # Retries answered by this worker before need no connection at all
+            stored = idempotency.lookup(current_user_id, idempotency_key)
+            if stored is not None:
+                return idempotency.replay(stored, request_hash)
+        
         # Start with a new transaction-controlled connection
         with db.engine.begin() as connection:
-            # Verify user first - this is now part of the transaction
-            query = text("""
-            SELECT * FROM auth_verify_user(:user_id)
-            """)
-            result = connection.execute(query, {"user_id": current_user_id})
-            user_row = result.fetchone()
-            
-            if not user_row:
-                # This will automatically roll back the transaction
-                return jsonify({"message": "User not found"}), 404
-            
-            # Create order
-            query = text("""
-            SELECT * FROM create_order(:user_id, :customer_name)
-            """)
-            result = connection.execute(
-                query, 
-                {"user_id": current_user_id, "customer_name": order_data.customer_name}
-            )
-            order_id = result.scalar()
-            
-            # Add products
-            for product_data in order_data.products:
-                query = text("""
-                SELECT * FROM create_or_get_product(:name, :price)
-                """)
-                result = connection.execute(
-                    query,
-                    {"name": product_data.name, "price": product_data.price}
-                )
-                product_row = result.fetchone()
-            
-                unit_price = product_row.price if product_row.price else product_data.price
-            
-                query = text("""
-                SELECT add_product_to_order(:order_id, :product_id, :quantity, :unit_price)
-                """)
-                connection.execute(
-                    query,
-                    {
-                        "order_id": order_id,
-                        "product_id": product_row.id,
-                        "quantity": product_data.quantity,
-                        "unit_price": unit_price
-                    }
-                )
-
-            query = text("""
-            SELECT * FROM update_order_total(:order_id)
-            """)
-            result = connection.execute(query, {"order_id": order_id})
-            total_price = result.scalar()
-            
-            # Get order details
-            query = text("""
-            SELECT * FROM get_order_details(:order_id)
-            """)
-            result = connection.execute(query, {"order_id": order_id})
+            if idempotency_key is not None:
+                # Waits for a concurrent request with the same key, then replays its response
+                stored = idempotency.claim(connection, current_user_id, idempotency_key, request_hash)
+                if stored is not None:
+                    return idempotency.replay(stored, request_hash)
             
-            order_details = {}
-            products = []
-
-            rows = result.fetchall()
-            print(rows)
-            if rows:
-                # Initialize the order details and products
-                order_details = {
-                    "id": rows[0][0],  # Order ID at index 0
-                    "user_id": rows[0][1],  # User ID at index 1
-                    "customer_name": rows[0][2],  # Customer name at index 2
-                    "total_price": float(rows[0][3]),  # Total price at index 3 (convert Decimal to float)
-                    "created_at": rows[0][4],  # Created at at index 4
-                    "products": []  # Will be populated below
-                }
-
-                # Populate the products list with the first row
-                products = [{
-                    "id": rows[0][5],  # Product ID at index 5
-                    "name": rows[0][6],  # Product name at index 6
-                    "quantity": rows[0][7],  # Quantity at index 7
-                    "unit_price": float(rows[0][8])  # Unit price at index 8 (convert Decimal to float)
-                }]
-
-                # Add any additional products (if any)
-                for row in rows[1:]:
-                    products.append({
-                        "id": row[5],  # Product ID at index 5
-                        "name": row[6],  # Product name at index 6
-                        "quantity": row[7],  # Quantity at index 7
-                        "unit_price": float(row[8])  # Unit price at index 8
+            order_details = None
+            if current_app.config.get('ORDER_WRITE_BEHIND', False):
+                # Only the payload is stored now; the drain worker writes the order later
+                accepted = enqueue_order(connection, current_user_id, order_data)
+                if accepted is None:
+                    response = jsonify({"message": "User not found"})
+                    response.status_code = 404
+                else:
+                    response = jsonify({
+                        "message": "Order accepted",
+                        "order": {"id": accepted.id, "status": "pending", "created_at": accepted.created_at}
                     })
-
-                # Attach the products to order_details
-                order_details["products"] = products
-
-                return jsonify({
-                    "message": "Order details retrieved successfully",
-                    "order": order_details
-                }), 200
-
+                    response.status_code = 202
+                    response.headers['Location'] = url_for('orders.get_order_status_by_id', order_id=accepted.id)
             else:
-                return jsonify({
-                    "message": "No order details found"
-                }), 404
+                order_details = write_order(connection, current_user_id, order_data)
+                
+                if order_details is None:
+                    response = jsonify({"message": "User not found"})
+                    response.status_code = 404
+                elif not order_details:
+                    response = jsonify({"message": "No order details found"})
+                    response.status_code = 404
+                else:
+                    response = jsonify({
+                        "message": "Order details retrieved successfully",
+                        "order": order_details
+                    })
+            
+            if idempotency_key is not None:
+                # Committed together with the order, so a retry can never create a second one
+                stored = idempotency.complete(connection, current_user_id, idempotency_key, request_hash, response)
+        
+        if idempotency_key is not None:
+            idempotency.remember(current_user_id, idempotency_key, stored)
+        
+        if order_details:
+            # The new data version already hides cached reports; this frees this worker's copies early
+            report_cache.invalidate(current_user_id, order_details["created_at"])
+        
+        return response
                 
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
         
     except IntegrityError as e:
+        record_error(e)
         return jsonify({
             "message": f"Database error: {str(e)}"
         }), 500
         
     except Exception as e:
+        record_error(e)
         return jsonify({
             "message": f"Unexpected error: {str(e)}"
-        }), 500
\ No newline at end of file
+        }), 500
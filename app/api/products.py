@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from app.extensions import db, product_index
+from app.schemas import ProductSearch
+from app.utils.helpers import format_error_message
+from app.utils.metrics import record_error
+from pydantic import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+products_bp = Blueprint('products', __name__)
+
+
+@products_bp.route('', methods=['GET'])
+@jwt_required()
+def search_products():
+    try:
+        validated_params = ProductSearch(**request.args)
+        # Served from the in-memory index; only its periodic refresh queries PostgreSQL
+        products = product_index.search(validated_params.q, validated_params.limit, db.engine)
+        return jsonify({"products": products}), 200
+    
+    except ValidationError as e:
+        record_error(e)
+        error_details = e.errors()
+        error_messages = [format_error_message(err) for err in error_details]
+        return jsonify({"message": "Validation error", "details": error_messages}), 400
+        
+    except Exception as e:
+        record_error(e)
+        logger.error(f"Unexpected error: {str(e)}", exc_info=True)
+        return jsonify({
+            "message": "An unexpected error occurred"
+        }), 500
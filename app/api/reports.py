@@ -1,23 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.extensions import db
-from datetime import datetime
+from app.extensions import db, report_cache, revenue_cache
 from sqlalchemy import text
-from sqlalchemy.exc import IntegrityError
-from app.schemas import DateRangeParams
+from app.schemas import ProductReportParams, RevenueReportParams, TeamReportParams
 from app.utils.helpers import format_error_message
-from datetime import date, datetime
+from app.utils.metrics import record_error
+from app.utils.http_cache import conditional_by_user_version, get_user_history_version, get_user_version
+from app.utils.revenue_cache import BUCKET_SIZES, bucket_starts
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from pydantic import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
 
 reports_bp = Blueprint('reports', __name__)
 
+# A year of hourly buckets fits
+MAX_REVENUE_BUCKETS = 10000
+
 
 @reports_bp.route('/products', methods=['GET'])
 @jwt_required()
+@conditional_by_user_version
 def get_product_sales_report():
     current_user_id = get_jwt_identity()
     try:
-        validated_params = DateRangeParams(**request.args)
+        validated_params = ProductReportParams(**request.args)
         today = datetime.now().date()
         
         if validated_params.start_date is None:
@@ -31,6 +40,9 @@ def get_product_sales_report():
         end_date = datetime.strptime(validated_params.end_date, '%Y-%m-%d')
         end_date = end_date.replace(hour=23, minute=59, second=59)
         
+        if validated_params.top is not None or validated_params.approximate:
+            return get_top_products(current_user_id, validated_params, start_date, end_date)
+        
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)  # Default page is 1
         page_size = request.args.get('page_size', 10, type=int)  # Default page size is 10
@@ -38,6 +50,27 @@ def get_product_sales_report():
         # Calculate OFFSET for pagination
         offset = (page - 1) * page_size
         
+        # Serve repeated ranges from the report cache; the data version in the key
+        # makes pages cached before any order change unreachable in every worker
+        try:
+            version, _ = get_user_version(current_user_id)
+        except Exception as e:
+            logger.warning(f"Skipping the report cache, version lookup failed: {str(e)}")
+            version = None
+        cache_key = None
+        if version is not None:
+            cache_key = report_cache.make_key(
+                current_user_id,
+                validated_params.start_date,
+                validated_params.end_date,
+                page,
+                page_size,
+                version
+            )
+            cached_report = report_cache.get(cache_key)
+            if cached_report is not None:
+                return jsonify({"report": cached_report}), 200
+        
         # Use the stored procedure for data
         with db.engine.connect() as connection:
             # First, get the total count
@@ -77,29 +110,252 @@ def get_product_sales_report():
                 report_data.append({
                     "product_name": row.product_name,
                     "total_quantity": row.total_quantity,
-                    "total_price": float(round(row.total_price, 2))
+                    "total_price": row.total_price
                 })
             
             # Calculate total pages
             total_pages = (total_records + page_size - 1) // page_size if total_records else 0
             
-            return jsonify({
-                "report": {
-                    "start_date": validated_params.start_date,
-                    "end_date": validated_params.end_date,
-                    "page": page,
-                    "page_size": page_size,
-                    "total_pages": total_pages,
-                    "total_records": total_records,
-                    "products": report_data
-                }
-            }), 200
+            report = {
+                "start_date": validated_params.start_date,
+                "end_date": validated_params.end_date,
+                "page": page,
+                "page_size": page_size,
+                "total_pages": total_pages,
+                "total_records": total_records,
+                "products": report_data
+            }
+            if cache_key is not None:
+                report_cache.set(cache_key, report)
+            
+            return jsonify({"report": report}), 200
             
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
         
     except Exception as e:
+        record_error(e)
         db.session.rollback()
-        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+def get_top_products(current_user_id, validated_params, start_date, end_date):
+    """Best sellers of the range, exact or merged from the per-day summaries."""
+    top = validated_params.top or 10
+    with db.engine.connect() as connection:
+        if validated_params.approximate:
+            query = text("""
+                SELECT * FROM get_top_products_approx(:user_id, :start_day, :end_day, :top)
+            """)
+            params = {"start_day": start_date.date(), "end_day": end_date.date()}
+        else:
+            # Same aggregation as the full report; only the top rows are kept while sorting
+            query = text("""
+                SELECT * FROM get_product_sales_report(:user_id, :start_date, :end_date)
+                LIMIT :top
+            """)
+            params = {"start_date": start_date, "end_date": end_date}
+        result = connection.execute(query, {"user_id": current_user_id, "top": top, **params})
+        
+        report_data = []
+        for row in result:
+            product = {
+                "product_name": row.product_name,
+                "total_quantity": row.total_quantity,
+                "total_price": row.total_price
+            }
+            if validated_params.approximate:
+                # The product sold between total_quantity - max_error and total_quantity;
+                # total_price is exact when max_error is 0 and a lower bound otherwise
+                product["max_error"] = row.max_error
+            report_data.append(product)
+    
+    return jsonify({"report": {
+        "start_date": validated_params.start_date,
+        "end_date": validated_params.end_date,
+        "top": top,
+        "approximate": validated_params.approximate,
+        "products": report_data
+    }}), 200
+
+
+@reports_bp.route('/products/team', methods=['GET'])
+@jwt_required()
+def get_team_product_sales_report():
+    """Product sales summed over `user_ids` (every user when omitted), for report managers."""
+    managers = {user_id.strip().lower() for user_id in current_app.config['REPORT_MANAGER_USER_IDS'].split(',')}
+    if str(get_jwt_identity()).lower() not in managers - {""}:
+        return jsonify({"message": "Team reports are limited to report managers"}), 403
+    try:
+        validated_params = TeamReportParams(**request.args)
+        today = datetime.now().date()
+        
+        if validated_params.start_date is None:
+            first_day_of_month = date(today.year, today.month, 1)
+            validated_params.start_date = first_day_of_month.strftime('%Y-%m-%d')
+        
+        if validated_params.end_date is None:
+            validated_params.end_date = today.strftime('%Y-%m-%d')
+        
+        start_date = datetime.strptime(validated_params.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(validated_params.end_date, '%Y-%m-%d')
+        end_date = end_date.replace(hour=23, minute=59, second=59)
+        page, page_size = validated_params.page, validated_params.page_size
+        params = {"user_ids": validated_params.user_ids, "start_date": start_date, "end_date": end_date}
+        
+        # begin(): the planner hints are local to this transaction
+        with db.engine.begin() as connection:
+            set_parallel_hints(connection)
+            # One aggregation for the page and the total
+            query = text("""
+                SELECT *, COUNT(*) OVER () AS total_records
+                FROM get_team_product_sales_report(:user_ids, :start_date, :end_date)
+                LIMIT :limit OFFSET :offset
+            """)
+            rows = connection.execute(
+                query, {**params, "limit": page_size, "offset": (page - 1) * page_size}
+            ).fetchall()
+            
+            if rows:
+                total_records = rows[0].total_records
+            elif page > 1:
+                # Past the last page: the window had no row to report the total on
+                count_query = text("""
+                    SELECT COUNT(*) FROM get_team_product_sales_report(:user_ids, :start_date, :end_date)
+                """)
+                total_records = connection.execute(count_query, params).scalar()
+            else:
+                total_records = 0
+        
+        report_data = [
+            {"product_name": row.product_name, "total_quantity": row.total_quantity, "total_price": row.total_price}
+            for row in rows
+        ]
+        return jsonify({"report": {
+            "start_date": validated_params.start_date,
+            "end_date": validated_params.end_date,
+            "user_count": len(validated_params.user_ids) if validated_params.user_ids else None,
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total_records + page_size - 1) // page_size,
+            "total_records": total_records,
+            "products": report_data
+        }}), 200
+    
+    except ValidationError as e:
+        record_error(e)
+        error_details = e.errors()
+        error_messages = [format_error_message(err) for err in error_details]
+        return jsonify({"message": "Validation error", "details": error_messages}), 400
+        
+    except Exception as e:
+        record_error(e)
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
+
+
+def set_parallel_hints(connection):
+    """Planner settings for parallel aggregation, for the rest of the current transaction.
+
+    The team report is one inlinable, parallel safe SQL function, so PostgreSQL
+    can split the partition scans and the join between workers. The server-wide
+    max_parallel_workers_per_gather is usually tuned for small OLTP queries.
+    """
+    query = text("""
+        SELECT set_config('parallel_setup_cost', :setup_cost, true),
+               set_config('max_parallel_workers_per_gather', :workers, true)
+    """)
+    connection.execute(query, {
+        "setup_cost": str(current_app.config['REPORT_PARALLEL_SETUP_COST']),
+        "workers": str(current_app.config['REPORT_PARALLEL_WORKERS'])
+    })
+
+
+@reports_bp.route('/revenue', methods=['GET'])
+@jwt_required()
+@conditional_by_user_version
+def get_revenue_report():
+    current_user_id = get_jwt_identity()
+    try:
+        validated_params = RevenueReportParams(**request.args)
+        today = datetime.now().date()
+        
+        if validated_params.start_date is None:
+            first_day_of_month = date(today.year, today.month, 1)
+            validated_params.start_date = first_day_of_month.strftime('%Y-%m-%d')
+        
+        if validated_params.end_date is None:
+            validated_params.end_date = today.strftime('%Y-%m-%d')
+        
+        bucket = validated_params.bucket
+        start_date = datetime.strptime(validated_params.start_date, '%Y-%m-%d')
+        end_date = datetime.strptime(validated_params.end_date, '%Y-%m-%d')
+        end_date = end_date.replace(hour=23, minute=59, second=59)
+        
+        starts = bucket_starts(start_date, end_date, bucket)
+        if len(starts) > MAX_REVENUE_BUCKETS:
+            return jsonify({
+                "message": "Validation error",
+                "details": [f"bucket: at most {MAX_REVENUE_BUCKETS} buckets per report"]
+            }), 400
+        # Buckets are whole, so the report covers the first one's start to the last one's end
+        range_end = starts[-1] + BUCKET_SIZES[bucket] - timedelta(microseconds=1)
+        
+        # Closed buckets come from the cache; orders are only read from the first missing one on.
+        # The history version is read before the orders, so a late write can only make entries stale
+        try:
+            history_version, now = get_user_history_version(current_user_id)
+        except Exception as e:
+            logger.warning(f"Skipping the revenue cache, version lookup failed: {str(e)}")
+            history_version = None
+        values = {}
+        if history_version is not None:
+            closed = [start for start in starts if revenue_cache.is_closed(start, bucket, now)]
+            values = revenue_cache.get_many(current_user_id, bucket, closed, history_version)
+        missing = [start for start in starts if start not in values]
+        
+        if missing:
+            # Whole buckets only, so a week is never cached with part of its orders
+            fetched = {start: (0, Decimal(0)) for start in starts if start >= missing[0]}
+            with db.engine.connect() as connection:
+                query = text("""
+                    SELECT * FROM get_revenue_report(:user_id, :start_date, :end_date, :bucket)
+                """)
+                result = connection.execute(query, {
+                    "user_id": current_user_id,
+                    "start_date": missing[0],
+                    "end_date": range_end,
+                    "bucket": bucket
+                })
+                for row in result:
+                    fetched[row.bucket_start] = (row.order_count, row.revenue)
+            if history_version is not None:
+                revenue_cache.set_many(current_user_id, bucket, fetched, history_version, now)
+            values.update(fetched)
+        
+        # Revenue stays Decimal until it is serialised, so the total is exact to the cent
+        buckets = [
+            {"start": start.isoformat(), "order_count": values[start][0], "revenue": float(values[start][1])}
+            for start in starts
+        ]
+        report = {
+            "bucket": bucket,
+            "start_date": starts[0].date().isoformat(),
+            "end_date": range_end.date().isoformat(),
+            "total_orders": sum(item["order_count"] for item in buckets),
+            "total_revenue": float(sum(values[start][1] for start in starts)),
+            "buckets": buckets
+        }
+        return jsonify({"report": report}), 200
+    
+    except ValidationError as e:
+        record_error(e)
+        error_details = e.errors()
+        error_messages = [format_error_message(err) for err in error_details]
+        return jsonify({"message": "Validation error", "details": error_messages}), 400
+        
+    except Exception as e:
+        record_error(e)
+        return jsonify({"message": f"An error occurred: {str(e)}"}), 500
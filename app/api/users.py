@@ -6,6 +6,7 @@ from sqlalchemy.exc import IntegrityError
 from pydantic import ValidationError
 from app.schemas import UserCreate, GetUserId
 from app.utils.helpers import format_error_message, get_pagination_params
+from app.utils.metrics import record_error
 users_bp = Blueprint('users', __name__)
 
 
@@ -17,8 +18,9 @@ def create_user():
         with db.engine.connect() as connection:
             # Create a transaction that will be committed when the block exits
             with connection.begin():
-                # Enable more detailed error reporting
-                connection.execute(text("SET client_min_messages TO DEBUG;"))
+                # Enable more detailed error reporting for this transaction only;
+                # a plain SET would stay on the pooled connection for later requests
+                connection.execute(text("SET LOCAL client_min_messages TO DEBUG;"))
                 
                 query = text("""
                 SELECT * FROM create_user(:email, :name)
@@ -48,13 +50,16 @@ def create_user():
                 }), 201
                 
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
     except IntegrityError as e:
+        record_error(e)
         print(f"Integrity error: {str(e)}")
         return jsonify({"message": "A user with this email already exists"}), 409
     except Exception as e:
+        record_error(e)
         print(f"User creation error: {str(e)}")
         return jsonify({"message": "An unexpected error occurred", "details": str(e)}), 500
 
@@ -100,6 +105,7 @@ def get_users():
                 }
             }), 200
     except Exception as e:
+        record_error(e)
         return jsonify({"message": f"Error fetching users: {str(e)}"}), 500
     
 
@@ -135,9 +141,11 @@ def get_user(user_id):
             }), 200
         
     except ValidationError as e:
+        record_error(e)
         error_details = e.errors()
         error_messages = [format_error_message(err) for err in error_details]
         return jsonify({"message": "Validation error", "details": error_messages}), 400
     
     except Exception as e:
+        record_error(e)
         return jsonify({"message": f"Error fetching user: {str(e)}"}), 500
\ No newline at end of file
@@ -1,5 +1,6 @@
 # app/config.py
 import os
+import tempfile
 from datetime import timedelta
 
 JWT_ACCESS_TOKEN_EXPIRES = os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', '86400')
@@ -16,13 +17,117 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # All connection pooling parameters go here
+    # Under gevent size the pool for the database, not for the greenlets: extra
+    # greenlets queue for a connection for up to DB_POOL_TIMEOUT seconds
     SQLALCHEMY_ENGINE_OPTIONS = {
         'pool_pre_ping': True,
-        'pool_size': 10,
-        'max_overflow': 20,
-        'pool_timeout': 30,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '20')),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '30')),
         'pool_recycle': 1800
     }
     
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt_dev_key_change_this_in_production')
-    JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(JWT_ACCESS_TOKEN_EXPIRES))
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(JWT_ACCESS_TOKEN_EXPIRES))
+    
+    # ETag / Last-Modified support for order and report GETs
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+    
+    # Product sales report cache: 'memory' (per worker), 'sqlite' (shared by all workers) or 'none'
+    REPORT_CACHE_BACKEND = os.environ.get('REPORT_CACHE_BACKEND', 'memory')
+    REPORT_CACHE_PATH = os.environ.get(
+        'REPORT_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'order_management_report_cache.db')
+    )
+    REPORT_CACHE_MAX_ENTRIES = int(os.environ.get('REPORT_CACHE_MAX_ENTRIES', '1024'))
+    # Ranges that include today expire after this many seconds even without new orders
+    REPORT_CACHE_OPEN_TTL = int(os.environ.get('REPORT_CACHE_OPEN_TTL', '60'))
+    
+    # Per-request SQL statement count / DB time as Server-Timing headers and slow request logs
+    SQL_TIMING_ENABLED = os.environ.get('SQL_TIMING_ENABLED', 'false').lower() == 'true'
+    SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', '500'))
+    
+    # Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR under gunicorn to merge workers.
+    # With METRICS_TOKEN set, scrapes must send `Authorization: Bearer <token>`
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    
+    # /health/ready: probe result reuse window and thresholds that report 'degraded'
+    READINESS_CACHE_SECONDS = float(os.environ.get('READINESS_CACHE_SECONDS', '2'))
+    READINESS_MAX_PROBE_MS = float(os.environ.get('READINESS_MAX_PROBE_MS', '250'))
+    READINESS_MAX_POOL_USAGE = float(os.environ.get('READINESS_MAX_POOL_USAGE', '0.9'))
+    
+    # On-demand sampling profiler: PROFILER_SIGNAL to a worker, or POST /debug/profile with
+    # X-Profiler-Token on threaded (gthread) workers
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'false').lower() == 'true'
+    PROFILER_TOKEN = os.environ.get('PROFILER_TOKEN')
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', '5'))
+    PROFILER_SIGNAL = os.environ.get('PROFILER_SIGNAL', 'SIGUSR2')
+    PROFILER_SIGNAL_SECONDS = float(os.environ.get('PROFILER_SIGNAL_SECONDS', '30'))
+    PROFILER_OUTPUT_DIR = os.environ.get(
+        'PROFILER_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'order_management_profiles')
+    )
+    # Fraction of requests run under cProfile, dumped as .prof files to PROFILER_OUTPUT_DIR
+    PROFILE_REQUEST_SAMPLE_RATE = float(os.environ.get('PROFILE_REQUEST_SAMPLE_RATE', '0'))
+    
+    # Idempotency-Key on POST /api/orders: how long a key replays its response, and
+    # how many completed responses each worker keeps in memory
+    IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+    IDEMPOTENCY_CACHE_ENTRIES = int(os.environ.get('IDEMPOTENCY_CACHE_ENTRIES', '10000'))
+    
+    # Write-behind order creation: POST /api/orders queues the order and answers 202;
+    # scripts/drain_order_queue.py writes queued orders in batches
+    ORDER_WRITE_BEHIND = os.environ.get('ORDER_WRITE_BEHIND', 'false').lower() == 'true'
+    ORDER_QUEUE_BATCH_SIZE = int(os.environ.get('ORDER_QUEUE_BATCH_SIZE', '500'))
+    ORDER_QUEUE_POLL_SECONDS = float(os.environ.get('ORDER_QUEUE_POLL_SECONDS', '1'))
+    
+    # Access tokens are checked against an in-memory copy of user_token_versions,
+    # refreshed this often; a revocation takes effect within this many seconds
+    TOKEN_VERSION_REFRESH_SECONDS = float(os.environ.get('TOKEN_VERSION_REFRESH_SECONDS', '30'))
+    
+    # Revoked token ids are kept in a per-worker bloom filter sized for this many
+    # tokens at this false positive rate, synced from revoked_tokens this often
+    TOKEN_BLOCKLIST_CAPACITY = int(os.environ.get('TOKEN_BLOCKLIST_CAPACITY', '100000'))
+    TOKEN_BLOCKLIST_ERROR_RATE = float(os.environ.get('TOKEN_BLOCKLIST_ERROR_RATE', '0.001'))
+    TOKEN_BLOCKLIST_REFRESH_SECONDS = float(os.environ.get('TOKEN_BLOCKLIST_REFRESH_SECONDS', '5'))
+    
+    # Login attempts allowed per client IP and per email in a sliding window of
+    # LOGIN_RATE_LIMIT_WINDOW seconds; 'memory' counts per worker, 'sqlite' shares
+    # the counters between the workers on a host, 'none' turns limiting off
+    LOGIN_RATE_LIMIT_BACKEND = os.environ.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    LOGIN_RATE_LIMIT_PATH = os.environ.get(
+        'LOGIN_RATE_LIMIT_PATH', os.path.join(tempfile.gettempdir(), 'order_management_rate_limits.db')
+    )
+    LOGIN_RATE_LIMIT_WINDOW = int(os.environ.get('LOGIN_RATE_LIMIT_WINDOW', '60'))
+    LOGIN_RATE_LIMIT_PER_IP = int(os.environ.get('LOGIN_RATE_LIMIT_PER_IP', '20'))
+    LOGIN_RATE_LIMIT_PER_EMAIL = int(os.environ.get('LOGIN_RATE_LIMIT_PER_EMAIL', '5'))
+    LOGIN_RATE_LIMIT_MAX_KEYS = int(os.environ.get('LOGIN_RATE_LIMIT_MAX_KEYS', '100000'))
+    # Number of reverse proxies in front of the app whose X-Forwarded-For is trusted
+    # for the client address; 0 uses the address of the connection
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', '0'))
+    
+    # GET /api/products searches a per-worker index of product names that picks
+    # up new products this often
+    PRODUCT_INDEX_REFRESH_SECONDS = float(os.environ.get('PRODUCT_INDEX_REFRESH_SECONDS', '10'))
+    
+    # Products tracked per user per day by the approximate top products report;
+    # changing it only affects summaries written afterwards
+    PRODUCT_SKETCH_CAPACITY = int(os.environ.get('PRODUCT_SKETCH_CAPACITY', '64'))
+    
+    # Per-worker cache of closed /api/reports/revenue buckets; a bucket counts as
+    # closed this many seconds after it ends on the database clock, long enough
+    # for order transactions open at that moment to commit
+    REVENUE_CACHE_MAX_ENTRIES = int(os.environ.get('REVENUE_CACHE_MAX_ENTRIES', '100000'))
+    REVENUE_CACHE_GRACE_SECONDS = int(os.environ.get('REVENUE_CACHE_GRACE_SECONDS', '300'))
+    
+    # GET /api/reports/products/team is limited to these comma separated user ids,
+    # matched against the token's identity (emails can change; ids cannot).
+    # Its aggregate runs with these planner settings, for its transaction only;
+    # 0 workers keeps it in one process, which is faster on a single core
+    REPORT_MANAGER_USER_IDS = os.environ.get('REPORT_MANAGER_USER_IDS', '')
+    REPORT_PARALLEL_SETUP_COST = int(os.environ.get('REPORT_PARALLEL_SETUP_COST', '1000'))
+    REPORT_PARALLEL_WORKERS = int(os.environ.get('REPORT_PARALLEL_WORKERS', '4'))
+    
+    # scripts/archive_orders.py moves orders older than this many days to
+    # orders_archive: whole months at once, the rest in batches of this size
+    ORDER_ARCHIVE_AFTER_DAYS = int(os.environ.get('ORDER_ARCHIVE_AFTER_DAYS', '365'))
+    ORDER_ARCHIVE_BATCH_SIZE = int(os.environ.get('ORDER_ARCHIVE_BATCH_SIZE', '1000'))
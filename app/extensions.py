@@ -1,7 +1,29 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from app.utils.health import ReadinessCheck
+from app.utils.idempotency import IdempotencyStore
+from app.utils.metrics import Metrics
+from app.utils.profiler import Profiler
+from app.utils.report_cache import ReportCache
+from app.utils.revenue_cache import RevenueCache
+from app.utils.sql_timing import SQLTiming
+from app.utils.product_index import ProductIndex
+from app.utils.rate_limit import RateLimiter
+from app.utils.token_blocklist import TokenBlocklist
+from app.utils.token_versions import TokenVersions
 
 db = SQLAlchemy()
 migrate = Migrate()
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
+report_cache = ReportCache()
+sql_timing = SQLTiming()
+metrics = Metrics()
+readiness = ReadinessCheck()
+profiler = Profiler()
+idempotency = IdempotencyStore()
+token_versions = TokenVersions()
+token_blocklist = TokenBlocklist()
+rate_limiter = RateLimiter()
+product_index = ProductIndex()
+revenue_cache = RevenueCache()
@@ -1,5 +1,7 @@
-from app.models.user import User
-from app.models.order import Order
+from app.models.user import User, UserDataVersion, UserTokenVersion, RevokedToken
+from app.models.order import Order, OrderQueueEntry, ArchivedOrder
 from app.models.product import Product, OrderProduct
+from app.models.idempotency import IdempotencyKey
+from app.models.report import ProductSalesSketch, UserOrderStats
 
-__all__ = ['User', 'Order', 'Product', 'OrderProduct']
\ No newline at end of file
+__all__ = ['User', 'UserDataVersion', 'UserTokenVersion', 'RevokedToken', 'Order', 'OrderQueueEntry', 'ArchivedOrder', 'Product', 'OrderProduct', 'IdempotencyKey', 'ProductSalesSketch', 'UserOrderStats']
@@ -0,0 +1,18 @@
+from app.extensions import db
+from datetime import datetime
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+
+    user_id = db.Column(db.String(36), primary_key=True)
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    # Both stay NULL until the request that claimed the key commits its response
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.user_id} {self.key}>'
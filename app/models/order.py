@@ -1,16 +1,25 @@
 from app.extensions import db
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 import uuid
 
 
 class Order(db.Model):
     __tablename__ = 'orders'
+    __table_args__ = (
+        db.Index(
+            'ix_orders_user_id_created_at', 'user_id', db.text('created_at DESC'),
+            postgresql_include=['customer_name', 'total_price']
+        ),
+        # Monthly partitions; the partition key has to be part of the primary key
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     customer_name = db.Column(db.String(120), nullable=False)
-    total_price = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    total_price = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow, server_default=db.func.now(), index=True)
     
     # Relationships
     products = db.relationship('OrderProduct', backref='order', cascade='all, delete-orphan')
@@ -32,3 +41,53 @@ class Order(db.Model):
 
     def __repr__(self):
         return f'<Order {self.id}>'
+
+
+class OrderQueueEntry(db.Model):
+    """An accepted order waiting for the drain worker; deleted once the order is written."""
+    __tablename__ = 'order_queue'
+    __table_args__ = (
+        db.Index(
+            'ix_order_queue_pending_created_at', 'created_at',
+            postgresql_where=db.text("status = 'pending'")
+        ),
+    )
+
+    # Becomes the id of the order
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    payload = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False)
+    # 'pending' or 'failed'
+    status = db.Column(db.String(16), nullable=False, default='pending')
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<OrderQueueEntry {self.id} {self.status}>'
+
+
+class ArchivedOrder(db.Model):
+    """An order moved out of the partitioned tables by scripts/archive_orders.py.
+
+    `products` holds its lines as [{id, name, quantity, unit_price}], so an
+    archived order is a single row.
+    """
+    __tablename__ = 'orders_archive'
+    __table_args__ = (
+        # The reports read archived orders by user and range, like ix_orders_user_id_created_at
+        db.Index(
+            'ix_orders_archive_user_id_created_at', 'user_id', 'created_at',
+            postgresql_include=['total_price']
+        ),
+    )
+
+    id = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), nullable=False)
+    customer_name = db.Column(db.String(120), nullable=False)
+    total_price = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    products = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False, default=list)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ArchivedOrder {self.id}>'
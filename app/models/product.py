@@ -8,8 +8,11 @@ class Product(db.Model):
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = db.Column(db.String(120), nullable=False, index=True)
-    price = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    price = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    # Id of the inserting transaction, set by the database (migration f4c2a9d17b83);
+    # the product index reads new products by it, in commit order
+    created_xid = db.Column(db.BigInteger, nullable=False, server_default=db.FetchedValue(), index=True)
 
     def __init__(self, name, price):
         self.name = name
@@ -29,13 +32,26 @@ class Product(db.Model):
 
 class OrderProduct(db.Model):
     __tablename__ = 'order_products'
+    __table_args__ = (
+        db.Index(
+            'ix_order_products_order_id', 'order_id',
+            postgresql_include=['product_id', 'quantity', 'unit_price']
+        ),
+        db.Index('ix_order_products_product_id', 'product_id'),
+        # Lines carry their order's created_at, so both tables are partitioned on the same months
+        db.ForeignKeyConstraint(
+            ['order_id', 'created_at'], ['orders.id', 'orders.created_at'],
+            name='order_products_order_id_fkey'
+        ),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    order_id = db.Column(db.String(36), db.ForeignKey('orders.id'), nullable=False)
+    order_id = db.Column(db.String(36), nullable=False)
     product_id = db.Column(db.String(36), db.ForeignKey('products.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Float, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    unit_price = db.Column(db.Numeric(12, 2), nullable=False)
+    created_at = db.Column(db.DateTime, primary_key=True, default=datetime.utcnow, server_default=db.func.now())
 
     # Relationships
     product = db.relationship('Product', backref='order_products')
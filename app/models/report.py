@@ -0,0 +1,40 @@
+from app.extensions import db
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime
+
+
+class ProductSalesSketch(db.Model):
+    """Space-saving summary of one user's product sales on one day.
+
+    `sketch` maps at most PRODUCT_SKETCH_CAPACITY product names to
+    [quantity, revenue, error], where error bounds how much of the quantity
+    was inherited from the product it replaced. Revenue is not inherited.
+    No product missing from the sketch sold more than `untracked_quantity`.
+    """
+    __tablename__ = 'product_sales_sketches'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    sketch = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'), nullable=False, default=dict)
+    untracked_quantity = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ProductSalesSketch {self.user_id} {self.day}>'
+
+
+class UserOrderStats(db.Model):
+    """Number and total value of one user's orders on one day, kept by the order procedures.
+
+    `archived_count` of those orders were moved to orders_archive since.
+    """
+    __tablename__ = 'user_order_stats'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    order_count = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    archived_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserOrderStats {self.user_id} {self.day}>'
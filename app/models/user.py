@@ -26,3 +26,42 @@ class User(db.Model):
 
     def __repr__(self):
         return f'<User {self.email}>'
+
+
+class UserDataVersion(db.Model):
+    __tablename__ = 'user_data_versions'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    # Bumped only by changes to orders created before the current hour, which
+    # can alter time buckets that have already ended
+    history_version = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserDataVersion {self.user_id} v{self.version}>'
+
+
+class UserTokenVersion(db.Model):
+    __tablename__ = 'user_token_versions'
+
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    # Access tokens carry the version current at login; bumping it revokes them
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<UserTokenVersion {self.user_id} v{self.version}>'
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    # The access token's jti claim
+    jti = db.Column(db.String(36), primary_key=True)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
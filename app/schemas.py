@@ -1,48 +1,94 @@
-from pydantic import BaseModel, Field, StrictStr, StrictInt, StrictFloat, field_validator, UUID4
-from typing import List, Optional
-from datetime import datetime
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, StrictStr, StrictInt, StrictFloat, TypeAdapter, UUID4
+from typing import Annotated, List, Literal, Optional
+from typing_extensions import TypedDict
+from datetime import date
 
 import re
+import uuid
+
+# Compiled once; the checks below run inside pydantic-core's validation pass
+# for every field that uses them, with the same error messages as before
+LETTERS_AND_SPACES = re.compile(r'[a-zA-Z\s]+')
+ISO_DATE = re.compile(r'([0-9]{4})-([0-9]{1,2})-([0-9]{1,2})')
+EMAIL_PATTERN = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$'
+MAX_TEAM_REPORT_USERS = 1000
+
+
+def not_boolean_string(v):
+    if len(v) in (4, 5) and v.lower() in ("true", "false"):
+        raise ValueError('cannot be the string "True" or "False"')
+    return v
+
+
+def letters_and_spaces(v):
+    if not LETTERS_AND_SPACES.fullmatch(v):
+        raise ValueError('must contain only letters and spaces - no numbers or symbols')
+    return v
+
+
+def uuid_list(value):
+    # Comma separated user ids, parsed once so the report can pass them as an array
+    ids = [item.strip() for item in value.split(',') if item.strip()]
+    if not ids:
+        raise ValueError("must list at least one user id")
+    if len(ids) > MAX_TEAM_REPORT_USERS:
+        raise ValueError(f"at most {MAX_TEAM_REPORT_USERS} user ids")
+    try:
+        return [str(uuid.UUID(item)) for item in ids]
+    except ValueError:
+        raise ValueError("must be comma separated UUIDs")
+
+
+def iso_date(value):
+    # Same inputs as datetime.strptime(value, '%Y-%m-%d'), without the parser
+    match = ISO_DATE.fullmatch(value)
+    try:
+        if match is None:
+            raise ValueError
+        date(int(match[1]), int(match[2]), int(match[3]))
+    except ValueError:
+        raise ValueError("Date must be in YYYY-MM-DD format")
+    return value
+
+
+PersonName = Annotated[
+    StrictStr, Field(min_length=3, max_length=50),
+    AfterValidator(not_boolean_string), AfterValidator(letters_and_spaces)
+]
+ProductName = Annotated[StrictStr, Field(min_length=3, max_length=50), AfterValidator(not_boolean_string)]
+DateString = Annotated[str, AfterValidator(iso_date)]
+
 
 class DateRangeParams(BaseModel):
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
-    
-    @field_validator('start_date', 'end_date')
-    def validate_date_format(cls, value):
-        if value is None:
-            return None
-   
-        try:
-            # Try to convert to datetime to validate format
-            datetime.strptime(value, '%Y-%m-%d')
-            return value
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
+    start_date: Optional[DateString] = None
+    end_date: Optional[DateString] = None
+
+class ProductReportParams(DateRangeParams):
+    # Only the `top` best sellers, unpaginated; `approximate` reads the daily summaries
+    top: Optional[Annotated[int, Field(ge=1, le=100)]] = None
+    approximate: bool = False
+
+class RevenueReportParams(DateRangeParams):
+    bucket: Literal['hour', 'day', 'week'] = 'day'
+
+class TeamReportParams(DateRangeParams):
+    # None reports over every user
+    user_ids: Optional[Annotated[str, AfterValidator(uuid_list)]] = None
+    page: Annotated[int, Field(ge=1)] = 1
+    page_size: Annotated[int, Field(ge=1, le=100)] = 10
 
 class UserCreate(BaseModel):
-    name: StrictStr = Field(min_length=3, max_length=50)
-    email: StrictStr = Field(pattern=r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
-    
-    @field_validator('name')
-    @classmethod
-    def validate_name_letters_only(cls, v):
-        if not isinstance(v, str):
-            raise ValueError('must be a string')
-        if v.lower() in ["true", "false"]:
-            raise ValueError('cannot be the string "True" or "False"')
-        if not re.match(r'^[a-zA-Z\s]+$', v):
-            raise ValueError('must contain only letters and spaces - no numbers or symbols')
-        return v
-    
+    name: PersonName
+    email: StrictStr = Field(pattern=EMAIL_PATTERN)
+
     model_config = {
         "extra": "forbid",
         "validate_assignment": True
     }
 
 class UserLogin(BaseModel):
-    email: StrictStr = Field(pattern=r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$')
-    
+    email: StrictStr = Field(pattern=EMAIL_PATTERN)
+
     model_config = {
         "extra": "forbid",
         "validate_assignment": True
@@ -54,69 +100,39 @@ class GetUserId(BaseModel):
 class GetOrderId(BaseModel):
     order_id: UUID4
 
-class OrderItemCreate(BaseModel):
-    name: StrictStr = Field(min_length=3, max_length=50)
-    price: StrictFloat = Field(gt=0)
-    quantity: StrictInt = Field(gt=0)
-    
-    @field_validator('name')
-    @classmethod
-    def validate_name(cls, v):
-        if not isinstance(v, str):
-            raise ValueError('must be a string')
-        if v.lower() in ["true", "false"]:
-            raise ValueError('cannot be the string "True" or "False"')
-        return v
-    
-    model_config = {
-        "extra": "forbid", 
-        "validate_assignment": True
-    }
+class OrderItemCreate(TypedDict):
+    """One order line, validated into a plain dict.
+
+    A TypedDict rather than a model: building a model instance per line was
+    most of the validation time of large orders.
+    """
+    __pydantic_config__ = ConfigDict(extra='forbid')
+
+    name: ProductName
+    price: Annotated[StrictFloat, Field(gt=0)]
+    quantity: Annotated[StrictInt, Field(gt=0)]
 
 class OrderCreate(BaseModel):
-    customer_name: StrictStr = Field(min_length=3, max_length=50)
-    products: List[OrderItemCreate] = Field(min_items=1)
-    
-    @field_validator('customer_name')
-    @classmethod
-    def validate_customer_name(cls, v):
-        if not isinstance(v, str):
-            raise ValueError('must be a string')
-        if v.lower() in ["true", "false"]:
-            raise ValueError('cannot be the string "True" or "False"')
-        if not re.match(r'^[a-zA-Z\s]+$', v):
-            raise ValueError('must contain only letters and spaces - no numbers or symbols')
-        return v
-    
+    customer_name: PersonName
+    products: List[OrderItemCreate] = Field(min_length=1)
+
     model_config = {
         "extra": "forbid",
         "validate_assignment": True
     }
 
 class OrderList(BaseModel):
-    customer_name: Optional[str] = Field(None, min_length=3, max_length=50)
-    start_date: Optional[str] = None
-    end_date: Optional[str] = None
-    
-    @field_validator('start_date', 'end_date')
-    def validate_date_format(cls, value):
-        if value is None:
-            return None
-        try:
-            # Try to convert to datetime to validate format
-            datetime.strptime(value, '%Y-%m-%d')
-            return value
-        except ValueError:
-            raise ValueError("Date must be in YYYY-MM-DD format")
-        
-    @field_validator('customer_name')
-    @classmethod
-    def validate_customer_name(cls, v):
-        if not isinstance(v, str):
-            raise ValueError('must be a string')
-        if v.lower() in ["true", "false"]:
-            raise ValueError('cannot be the string "True" or "False"')
-        if not re.match(r'^[a-zA-Z\s]+$', v):
-            raise ValueError('must contain only letters and spaces - no numbers or symbols')
-        return v
-    
\ No newline at end of file
+    customer_name: Optional[
+        Annotated[str, Field(min_length=3, max_length=50),
+                  AfterValidator(not_boolean_string), AfterValidator(letters_and_spaces)]
+    ] = None
+    start_date: Optional[DateString] = None
+    end_date: Optional[DateString] = None
+
+class ProductSearch(BaseModel):
+    q: Annotated[str, Field(min_length=1, max_length=50)]
+    limit: Annotated[int, Field(ge=1, le=50)] = 10
+
+
+# Validates a whole list of order payloads in one pydantic-core call
+OrderCreateList = TypeAdapter(List[OrderCreate])
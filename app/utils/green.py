@@ -0,0 +1,33 @@
+# app/utils/green.py
+"""Cooperative (gevent) I/O for psycopg2.
+
+psycopg2 is a C extension, so gevent's monkey patching does not reach its
+sockets: a query would block the whole worker. Installing a wait callback
+switches every connection to async mode and parks the current greenlet on
+the socket instead, letting the worker serve other requests meanwhile.
+
+gevent's monkey.patch_all() must still run before the app is imported;
+see gunicorn.conf.py and scripts/run_app.py.
+"""
+import psycopg2
+from psycopg2 import extensions
+
+
+def gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def patch_psycopg2():
+    """Make psycopg2 yield to other greenlets while waiting on PostgreSQL."""
+    extensions.set_wait_callback(gevent_wait_callback)
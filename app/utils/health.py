@@ -0,0 +1,87 @@
+# app/utils/health.py
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.utils.periodic_refresh import PeriodicRefresh
+
+
+class ReadinessCheck(PeriodicRefresh):
+    """Database readiness for load balancers, cached for READINESS_CACHE_SECONDS.
+
+    Status is 'ok', 'degraded' (probe slower than READINESS_MAX_PROBE_MS or pool
+    usage above READINESS_MAX_POOL_USAGE) or 'unavailable' (probe failed). Only
+    'ok' should receive traffic.
+    """
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.refresh_seconds = 2.0
+        self.max_probe = 0.25
+        self.max_pool_usage = 0.9
+        self._result = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('READINESS_CACHE_SECONDS', 2.0)
+        self.max_probe = app.config.get('READINESS_MAX_PROBE_MS', 250) / 1000.0
+        self.max_pool_usage = app.config.get('READINESS_MAX_POOL_USAGE', 0.9)
+        self._result = None
+        self._reset_refresh()
+        app.extensions['readiness'] = self
+
+    def check(self, engine):
+        """Return (result, cached). Concurrent callers never run more than one probe."""
+        probed = self.maybe_refresh(engine)
+        return self._result, not probed
+
+    def _refresh(self, engine):
+        self._result = self._run(engine)
+
+    def _run(self, engine):
+        pool = pool_usage(engine)
+        database = {"ok": True}
+        status = 'ok'
+
+        # A saturated pool would make the probe itself wait for pool_timeout
+        if pool and pool["checked_out"] >= pool["capacity"]:
+            database = {"ok": None, "skipped": "pool exhausted"}
+            status = 'degraded'
+        else:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+            except Exception as e:
+                database = {"ok": False, "error": type(e).__name__}
+                status = 'unavailable'
+            latency = time.perf_counter() - started
+            database["latency_ms"] = round(latency * 1000, 2)
+            if status == 'ok' and latency > self.max_probe:
+                status = 'degraded'
+
+        if status == 'ok' and pool and pool["usage"] > self.max_pool_usage:
+            status = 'degraded'
+
+        return {
+            "status": status,
+            "checks": {"database": database, "pool": pool},
+            "checked_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+def pool_usage(engine):
+    """Checked-out connections versus pool capacity, or None for pools without a limit."""
+    pool = engine.pool
+    max_overflow = getattr(pool, '_max_overflow', None)
+    if max_overflow is None or max_overflow < 0:
+        return None
+    capacity = pool.size() + max_overflow
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "usage": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
@@ -0,0 +1,112 @@
+# app/utils/http_cache.py
+from datetime import date, datetime, time, timezone
+from functools import wraps
+import hashlib
+import logging
+
+from flask import current_app, g, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import text
+from app.extensions import db
+from app.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+
+def get_user_data_version(user_id):
+    """The get_user_data_version row of a user, looked up once per request.
+
+    Views under `conditional_by_user_version` can key their caches on the same
+    versions without another query.
+    """
+    rows = g.setdefault('user_data_versions', {})
+    if user_id not in rows:
+        with db.engine.connect() as connection:
+            query = text("""
+            SELECT * FROM get_user_data_version(:user_id)
+            """)
+            rows[user_id] = connection.execute(query, {"user_id": user_id}).fetchone()
+    return rows[user_id]
+
+
+def get_user_version(user_id):
+    """Return (version, updated_at) for a user's orders; (0, None) before the first order."""
+    row = get_user_data_version(user_id)
+    return row.version, row.updated_at
+
+
+def get_user_history_version(user_id):
+    """Return (history_version, now on the database clock) for a user's orders."""
+    row = get_user_data_version(user_id)
+    return row.history_version, row.checked_at
+
+
+def day_start():
+    """Start of today on the app clock, as an aware UTC datetime."""
+    return datetime.combine(date.today(), time.min).astimezone(timezone.utc)
+
+
+def build_last_modified(updated_at):
+    """Last-Modified for a user's responses: their latest order change, or today's start if later.
+
+    Report ranges default to the current day, so a response can also change at
+    midnight without any new order. HTTP dates have second precision and are UTC.
+    """
+    last_modified = day_start()
+    if updated_at:
+        # Naive timestamps are on the local clock, like the rest of the app
+        last_modified = max(last_modified, updated_at.astimezone(timezone.utc))
+    return last_modified.replace(microsecond=0)
+
+
+def build_etag(user_id, version):
+    """Weak ETag for the current request URL at a given user data version."""
+    # The date is part of the key because open-ended report ranges default to today
+    key = f"{user_id}:{version}:{date.today().isoformat()}:{request.full_path}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
+
+
+def conditional_by_user_version(view):
+    """Answer GETs with 304 when the user's data version has not changed.
+
+    Must be applied below `jwt_required` so the identity is available. Only the
+    cheap version lookup runs for a matching If-None-Match / If-Modified-Since.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_app.config.get('HTTP_CACHE_ENABLED', True):
+            return view(*args, **kwargs)
+
+        user_id = get_jwt_identity()
+        try:
+            version, updated_at = get_user_version(user_id)
+        except Exception as e:
+            logger.warning(f"Skipping conditional GET, version lookup failed: {str(e)}")
+            return view(*args, **kwargs)
+
+        etag = build_etag(user_id, version)
+        last_modified = build_last_modified(updated_at)
+
+        not_modified = _not_modified(etag, last_modified)
+        record_cache_lookup('http_conditional', not_modified)
+        if not_modified:
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag, weak=True)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    return wrapper
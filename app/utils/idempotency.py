@@ -0,0 +1,140 @@
+# app/utils/idempotency.py
+from collections import OrderedDict, namedtuple
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from flask import current_app, jsonify
+from sqlalchemy import text
+from app.utils.metrics import record_cache_lookup
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+MAX_KEY_LENGTH = 255
+
+# status_code and body are None while the request that claimed the key is still running
+StoredResponse = namedtuple('StoredResponse', ['request_hash', 'status_code', 'body'])
+
+
+def request_fingerprint(payload):
+    """SHA-256 of the JSON payload with sorted keys, so key order does not matter."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class IdempotencyStore:
+    """Responses of requests sent with an Idempotency-Key, per user.
+
+    PostgreSQL is the source of truth: a request claims its key in the same
+    transaction as its inserts and stores its response before committing, so a
+    retry either waits for that transaction or replays what it committed. A
+    bounded per-worker LRU answers repeated retries without a connection.
+    """
+
+    def __init__(self, app=None):
+        self.ttl = 86400
+        self.max_entries = 10000
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('IDEMPOTENCY_TTL_SECONDS', 86400)
+        self.max_entries = app.config.get('IDEMPOTENCY_CACHE_ENTRIES', 10000)
+        app.extensions['idempotency'] = self
+
+    def lookup(self, user_id, key):
+        """Completed response from this worker's memory, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is not None and entry[1] <= now:
+                del self._entries[(user_id, key)]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((user_id, key))
+        record_cache_lookup('idempotency', entry is not None)
+        return entry[0] if entry is not None else None
+
+    def remember(self, user_id, key, stored):
+        """Keep a committed response in memory until the key expires."""
+        with self._lock:
+            self._entries[(user_id, key)] = (stored, time.time() + self.ttl)
+            self._entries.move_to_end((user_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def claim(self, connection, user_id, key, request_hash):
+        """Take the key on an open transaction.
+
+        Returns None when this request owns the key, otherwise the response
+        stored by the request that does.
+        """
+        query = text("""
+        SELECT * FROM claim_idempotency_key(:user_id, :key, :request_hash, :ttl_seconds)
+        """)
+        row = connection.execute(query, {
+            "user_id": user_id,
+            "key": key,
+            "request_hash": request_hash,
+            "ttl_seconds": self.ttl
+        }).fetchone()
+
+        if row.claimed:
+            return None
+        stored = StoredResponse(row.stored_request_hash, row.stored_status_code, row.stored_response_body)
+        if stored.status_code is not None:
+            self.remember(user_id, key, stored)
+        return stored
+
+    def complete(self, connection, user_id, key, request_hash, response):
+        """Store the response on the claiming transaction; returns what was stored."""
+        stored = StoredResponse(request_hash, response.status_code, response.get_data(as_text=True))
+        query = text("""
+        SELECT complete_idempotency_key(:user_id, :key, :status_code, :response_body)
+        """)
+        connection.execute(query, {
+            "user_id": user_id,
+            "key": key,
+            "status_code": stored.status_code,
+            "response_body": stored.body
+        })
+        return stored
+
+    @staticmethod
+    def replay(stored, request_hash):
+        """Response for a retry of a request whose key is already taken."""
+        if stored.request_hash != request_hash:
+            return jsonify({
+                "message": f"{IDEMPOTENCY_HEADER} was already used with a different request"
+            }), 422
+        if stored.status_code is None:
+            return jsonify({
+                "message": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"
+            }), 409
+
+        response = current_app.response_class(stored.body, status=stored.status_code, mimetype='application/json')
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def prune_expired_keys(connection, batch_size=10000):
+    """Delete expired keys in batches of `batch_size`, committing after each one."""
+    total = 0
+    while True:
+        with connection.begin():
+            query = text("""
+            SELECT prune_idempotency_keys(:batch_size)
+            """)
+            deleted = connection.execute(query, {"batch_size": batch_size}).scalar()
+        total += deleted
+        if deleted < batch_size:
+            return total
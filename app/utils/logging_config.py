@@ -4,19 +4,52 @@ import sys
 import os
 from logging.handlers import RotatingFileHandler
 
+# Handlers installed by this module, so a second create_app or a forked worker replaces them
+_handlers = []
+_settings = {}
+
+
 def configure_logging(app):
     """Configure logging for the application."""
-    
+
     log_dir = os.path.join(app.root_path, '../logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
     log_level = app.config.get('LOG_LEVEL', logging.INFO)
-    
+
+    _settings.update(log_dir=log_dir, log_level=log_level)
+    attach_handlers()
+
+    # Configure SQL Alchemy logging
+    if app.config.get('SQLALCHEMY_ECHO', False):
+        logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
+
+    # Flask app logger propagates to the root handlers
+    app.logger.setLevel(log_level)
+
+    app.logger.info("Logging configured")
+
+
+def attach_handlers():
+    """(Re)create the console and rotating file handlers on the root logger.
+
+    Called again in every forked worker: a file handler opened by a preloading
+    gunicorn master would otherwise be shared, and rotated, by all workers.
+    """
+    if not _settings:
+        return
+    log_dir = _settings['log_dir']
+    log_level = _settings['log_level']
+
+    if not os.path.exists(log_dir):
+        os.makedirs(log_dir, exist_ok=True)
+
     # Configure root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    
+    for handler in _handlers:
+        root_logger.removeHandler(handler)
+        handler.close()
+    _handlers.clear()
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(log_level)
@@ -24,27 +57,20 @@ def configure_logging(app):
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
-    
+
     # File handler
     file_handler = RotatingFileHandler(
         os.path.join(log_dir, 'app.log'),
         maxBytes=10485760,  # 10MB
-        backupCount=10
+        backupCount=10,
+        delay=True  # Opened on first record, i.e. in the process that writes it
     )
     file_handler.setLevel(log_level)
     file_formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
     )
     file_handler.setFormatter(file_formatter)
-    root_logger.addHandler(file_handler)
-    
-    # Configure SQL Alchemy logging
-    if app.config.get('SQLALCHEMY_ECHO', False):
-        logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
-    
-    # Configure Flask app logger
-    app.logger.handlers = root_logger.handlers
-    app.logger.setLevel(log_level)
-    
-    app.logger.info("Logging configured")
\ No newline at end of file
+
+    for handler in (console_handler, file_handler):
+        root_logger.addHandler(handler)
+        _handlers.append(handler)
@@ -0,0 +1,148 @@
+# app/utils/metrics.py
+import hmac
+import os
+import time
+
+from flask import Response, abort, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Under gunicorn set PROMETHEUS_MULTIPROC_DIR (see gunicorn.conf.py): every worker then
+# writes its samples to files in that directory and /metrics merges all of them.
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by route',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being handled by route',
+    ['route'],
+    multiprocess_mode='livesum',
+    registry=REGISTRY,
+)
+REQUEST_ERRORS = Counter(
+    'http_request_errors',
+    'Exceptions handled by API views, by exception class',
+    ['route', 'exception'],
+    registry=REGISTRY,
+)
+CACHE_LOOKUPS = Counter(
+    'cache_lookups',
+    'Cache lookups by cache and result (hit or miss)',
+    ['cache', 'result'],
+    registry=REGISTRY,
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'SQLAlchemy pool connections by state',
+    ['state'],
+    multiprocess_mode='livesum',
+    registry=REGISTRY,
+)
+
+
+def current_route():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def record_error(exc):
+    """Count an exception handled inside a view's `except` branch."""
+    REQUEST_ERRORS.labels(current_route(), type(exc).__name__).inc()
+
+
+def record_cache_lookup(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def update_pool_stats(engine):
+    pool = engine.pool
+    # Only QueuePool tracks capacity; NullPool / StaticPool have nothing to report
+    if not hasattr(pool, 'checkedout'):
+        return
+    DB_POOL_CONNECTIONS.labels('size').set(pool.size())
+    DB_POOL_CONNECTIONS.labels('checked_out').set(pool.checkedout())
+    DB_POOL_CONNECTIONS.labels('checked_in').set(pool.checkedin())
+    DB_POOL_CONNECTIONS.labels('overflow').set(max(pool.overflow(), 0))
+
+
+class Metrics:
+    """Request metrics and the /metrics endpoint in Prometheus text format."""
+
+    def __init__(self, app=None):
+        self.engine = None
+        self.token = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        if not app.config.get('METRICS_ENABLED', False):
+            return
+        self.token = app.config.get('METRICS_TOKEN')
+
+        from app.extensions import db
+        with app.app_context():
+            self.engine = db.engine
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule('/metrics', 'metrics', self.export)
+
+    def _start_request(self):
+        if request.endpoint == 'metrics':
+            return
+        route = current_route()
+        g._metrics_route = route
+        g._metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.labels(route).inc()
+
+    def _finish_request(self, response):
+        if '_metrics_started' in g:
+            g._metrics_status = str(response.status_code)
+        return response
+
+    def _teardown_request(self, exc):
+        # Runs after unhandled exceptions too, which skip after_request when propagated
+        route = g.pop('_metrics_route', None)
+        if route is None:
+            return
+        status = g.pop('_metrics_status', None)
+        if exc is not None or status is None:
+            status = '500'
+        REQUEST_LATENCY.labels(request.method, route, status).observe(
+            time.perf_counter() - g.pop('_metrics_started')
+        )
+        REQUESTS_IN_FLIGHT.labels(route).dec()
+        update_pool_stats(self.engine)
+
+    def _authorized(self):
+        if not self.token:
+            return True
+        supplied = request.headers.get('Authorization', '')
+        expected = 'Bearer ' + self.token
+        return hmac.compare_digest(supplied.encode('utf-8'), expected.encode('utf-8'))
+
+    def export(self):
+        if not self._authorized():
+            abort(401)
+        update_pool_stats(self.engine)
+        if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
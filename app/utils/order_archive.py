@@ -0,0 +1,44 @@
+# app/utils/order_archive.py
+import time
+
+from sqlalchemy import text
+
+
+def archive_orders(connection, before, batch_size=1000, pause=0.0, lock_timeout='5s'):
+    """Move orders created before `before` to orders_archive; returns how many moved.
+
+    Months that end by `before` are archived whole and their partitions
+    dropped, one month per transaction. Orders left in the month containing
+    `before` (and in the default partition) are moved in batches of
+    `batch_size`, each committed on its own, sleeping `pause` seconds between
+    batches. Those deletes only touch that cold month, which a later run
+    drops in turn.
+
+    Dropping a month briefly locks orders exclusively. Instead of queueing
+    every query behind a long reader, it gives up after `lock_timeout` and
+    raises; the next run picks the month up again.
+    """
+    total = 0
+    with connection.begin():
+        query = text("""
+        SELECT * FROM get_archivable_months(:before)
+        """)
+        months = connection.execute(query, {"before": before}).scalars().all()
+    for month in months:
+        with connection.begin():
+            connection.execute(text("SELECT set_config('lock_timeout', :timeout, true)"), {"timeout": lock_timeout})
+            query = text("""
+            SELECT archive_order_partition(:month)
+            """)
+            total += connection.execute(query, {"month": month}).scalar()
+
+    while True:
+        with connection.begin():
+            query = text("""
+            SELECT archive_orders(:before, :batch_size)
+            """)
+            moved = connection.execute(query, {"before": before, "batch_size": batch_size}).scalar()
+        total += moved
+        if moved < batch_size:
+            return total
+        time.sleep(pause)
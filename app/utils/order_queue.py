@@ -0,0 +1,108 @@
+# app/utils/order_queue.py
+"""Write-behind order creation.
+
+With ORDER_WRITE_BEHIND on, POST /api/orders only inserts the validated
+payload into the order_queue table and answers 202 with the id the order
+will have. scripts/drain_order_queue.py then writes queued orders in batches:
+one transaction per batch, a savepoint per order so a bad order is marked
+failed without rolling back the rest. A queue row is deleted in the same
+transaction that writes its order, so get_order_status always finds exactly
+one of the two.
+"""
+from collections import namedtuple
+import json
+import logging
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from app.schemas import OrderCreate, OrderCreateList
+from app.utils.order_writer import write_order
+
+logger = logging.getLogger(__name__)
+
+DrainResult = namedtuple('DrainResult', ['written', 'failed'])
+
+
+def enqueue_order(connection, user_id, order_data):
+    """Queue a validated OrderCreate; returns (id, created_at) or None for an unknown user."""
+    query = text("""
+    SELECT * FROM enqueue_order(:user_id, CAST(:payload AS jsonb))
+    """)
+    return connection.execute(query, {
+        "user_id": user_id,
+        "payload": json.dumps(order_data.model_dump())
+    }).fetchone()
+
+
+def get_order_status(connection, order_id, user_id):
+    """(status, error, created_at) of a queued or written order, or None."""
+    query = text("""
+    SELECT * FROM get_order_status(:order_id, :user_id)
+    """)
+    return connection.execute(query, {"order_id": order_id, "user_id": user_id}).fetchone()
+
+
+def drain_batch(connection, batch_size, on_written=None):
+    """Write up to `batch_size` of the oldest queued orders in one transaction.
+
+    `on_written(user_id, order_details)` is called for every order after the
+    batch commits.
+    """
+    written = []
+    failed = 0
+    with connection.begin():
+        query = text("""
+        SELECT * FROM take_queued_orders(:batch_size)
+        """)
+        rows = connection.execute(query, {"batch_size": batch_size}).fetchall()
+
+        # The whole batch in one validation call; only a batch with an invalid
+        # payload falls back to validating orders one by one
+        try:
+            validated = OrderCreateList.validate_python([row.payload for row in rows])
+        except ValidationError:
+            validated = None
+
+        for index, row in enumerate(rows):
+            try:
+                with connection.begin_nested():
+                    if validated is not None:
+                        order_data = validated[index]
+                    else:
+                        order_data = OrderCreate.model_validate(row.payload)
+                    order_details = write_order(
+                        connection, row.user_id, order_data, order_id=row.id, created_at=row.created_at
+                    )
+                    if not order_details:
+                        # Raised inside the savepoint so nothing of this order is kept
+                        raise LookupError("User not found" if order_details is None else "No order details found")
+                written.append((row.id, row.user_id, order_details))
+            except Exception as e:
+                logger.warning(f"Queued order {row.id} failed: {str(e)}")
+                query = text("""
+                SELECT fail_queued_order(:order_id, :error)
+                """)
+                connection.execute(query, {"order_id": row.id, "error": str(e)})
+                failed += 1
+
+        if written:
+            query = text("""
+            SELECT finish_queued_orders(:order_ids)
+            """)
+            connection.execute(query, {"order_ids": [order_id for order_id, _, _ in written]})
+
+    if on_written is not None:
+        for _, user_id, order_details in written:
+            on_written(user_id, order_details)
+    return DrainResult(len(written), failed)
+
+
+def drain(connection, batch_size, on_written=None):
+    """Drain batches until the queue has no pending orders; returns the totals."""
+    written = failed = 0
+    while True:
+        result = drain_batch(connection, batch_size, on_written)
+        written += result.written
+        failed += result.failed
+        if result.written + result.failed < batch_size:
+            return DrainResult(written, failed)
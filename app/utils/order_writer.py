@@ -0,0 +1,118 @@
+# app/utils/order_writer.py
+import json
+
+from flask import current_app
+from sqlalchemy import text
+
+
+def write_order(connection, user_id, order_data, order_id=None, created_at=None):
+    """Insert a validated OrderCreate for a user on an open transaction.
+
+    `order_id` and `created_at` are set for orders accepted earlier through the
+    order queue; otherwise both are generated. Returns the order details with
+    its products, an empty dict if they could not be read back, or None when
+    the user does not exist. Committing is left to the caller.
+    """
+    # Verify user first - this is part of the caller's transaction
+    query = text("""
+    SELECT * FROM auth_verify_user(:user_id)
+    """)
+    result = connection.execute(query, {"user_id": user_id})
+    user_row = result.fetchone()
+
+    if not user_row:
+        return None
+
+    # Create order
+    if order_id is None:
+        query = text("""
+        SELECT * FROM create_order(:user_id, :customer_name)
+        """)
+    else:
+        query = text("""
+        SELECT * FROM create_order_with_id(:order_id, :user_id, :customer_name, :created_at)
+        """)
+    result = connection.execute(
+        query,
+        {
+            "order_id": order_id,
+            "user_id": user_id,
+            "customer_name": order_data.customer_name,
+            "created_at": created_at
+        }
+    )
+    order_id, created_at = result.fetchone()
+
+    # Add products
+    for product_data in order_data.products:
+        query = text("""
+        SELECT * FROM create_or_get_product(:name, :price)
+        """)
+        result = connection.execute(
+            query,
+            {"name": product_data["name"], "price": product_data["price"]}
+        )
+        product_row = result.fetchone()
+
+        unit_price = product_row.price if product_row.price else product_data["price"]
+
+        query = text("""
+        SELECT add_product_to_order(:order_id, :product_id, :quantity, :unit_price, :created_at)
+        """)
+        connection.execute(
+            query,
+            {
+                "order_id": order_id,
+                "created_at": created_at,
+                "product_id": product_row.id,
+                "quantity": product_data["quantity"],
+                "unit_price": unit_price
+            }
+        )
+
+    query = text("""
+    SELECT * FROM update_order_total(:order_id)
+    """)
+    connection.execute(query, {"order_id": order_id})
+
+    # Get order details
+    query = text("""
+    SELECT * FROM get_order_details(:order_id)
+    """)
+    rows = connection.execute(query, {"order_id": order_id}).fetchall()
+    if not rows:
+        return {}
+
+    # One row per product; the order columns repeat on every row
+    order_details = {
+        "id": rows[0][0],
+        "user_id": rows[0][1],
+        "customer_name": rows[0][2],
+        "total_price": rows[0][3],
+        "created_at": rows[0][4],
+        "products": [
+            {
+                "id": row[5],
+                "name": row[6],
+                "quantity": row[7],
+                "unit_price": row[8]
+            }
+            for row in rows
+        ]
+    }
+
+    # Keep the day's top-products summary in step with the order. The unit prices are
+    # float8 cent values, which JSON writes with at most two decimals and NUMERIC reads back exactly
+    query = text("""
+    SELECT record_product_sales(:user_id, :day, CAST(:items AS jsonb), :capacity)
+    """)
+    connection.execute(query, {
+        "user_id": user_id,
+        "day": order_details["created_at"].date(),
+        "items": json.dumps([
+            {"name": product["name"], "quantity": product["quantity"], "unit_price": product["unit_price"]}
+            for product in order_details["products"]
+        ]),
+        "capacity": current_app.config.get('PRODUCT_SKETCH_CAPACITY', 64)
+    })
+    return order_details
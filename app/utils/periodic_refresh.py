@@ -0,0 +1,56 @@
+# app/utils/periodic_refresh.py
+from datetime import datetime, timedelta
+import threading
+import time
+
+# Re-read rows stamped up to this long before the newest one seen, so a
+# transaction that committed after a later one is still picked up
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+def overlap_since(watermark):
+    """Where an incremental read by timestamp starts: everything before the first one."""
+    return watermark - REFRESH_OVERLAP if watermark else datetime.min
+
+
+class PeriodicRefresh:
+    """Base for per-worker state read from the database every `refresh_seconds`.
+
+    Subclasses implement `_refresh(engine)` with their own query, keeping the
+    current state when it fails. `refresh()` runs it now; `maybe_refresh()`
+    runs it from whichever request finds the last one too old. Concurrent
+    callers never run more than one: the others keep the current state, except
+    before the first refresh, which they wait for.
+    """
+
+    def __init__(self):
+        self.refresh_seconds = 10.0
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at = None
+
+    def _reset_refresh(self):
+        self._refreshed_at = None
+
+    def refresh(self, engine):
+        try:
+            self._refresh(engine)
+        finally:
+            self._refreshed_at = time.monotonic()
+
+    def maybe_refresh(self, engine):
+        """Refresh if due; True if this call ran the refresh."""
+        refreshed_at = self._refreshed_at
+        if refreshed_at is not None and time.monotonic() - refreshed_at < self.refresh_seconds:
+            return False
+        if not self._refresh_lock.acquire(blocking=refreshed_at is None):
+            return False
+        try:
+            if self._refreshed_at != refreshed_at:
+                return False
+            self.refresh(engine)
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, engine):
+        raise NotImplementedError
@@ -0,0 +1,96 @@
+# app/utils/product_index.py
+from bisect import bisect_left, bisect_right
+import logging
+
+from sqlalchemy import text
+
+from app.utils.periodic_refresh import PeriodicRefresh
+
+logger = logging.getLogger(__name__)
+
+
+class ProductIndex(PeriodicRefresh):
+    """Per-worker sorted array of product names for prefix search.
+
+    Loaded on first use (or by gunicorn's post_worker_init) and refreshed every
+    PRODUCT_INDEX_REFRESH_SECONDS with the products of transactions that were
+    still running at the previous read (get_product_watermark), so late commits
+    and backdated created_at values are picked up. Products are never renamed or
+    deleted, so new rows are merged into the sorted array. Searches bisect to the first name with the prefix,
+    case-insensitively, and read forward.
+    """
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.refresh_seconds = 10.0
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('PRODUCT_INDEX_REFRESH_SECONDS', 10)
+        self._reset()
+        app.extensions['product_index'] = self
+
+    def _reset(self):
+        # keys[i] is the folded name of products[i]; both are swapped in together
+        self._index = ([], [])
+        self._ids = set()
+        self._watermark = None
+        self._reset_refresh()
+
+    def __len__(self):
+        return len(self._index[0])
+
+    def search(self, prefix, limit, engine):
+        """Up to `limit` products whose name starts with `prefix`, ignoring case, by name."""
+        self.maybe_refresh(engine)
+        keys, products = self._index
+        prefix = prefix.casefold()
+        matches = []
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and len(matches) < limit and keys[position].startswith(prefix):
+            matches.append(products[position])
+            position += 1
+        return matches
+
+    def _refresh(self, engine):
+        """Merge in products committed since the last refresh. Failures keep the current index."""
+        try:
+            with engine.connect() as connection:
+                # Taken before the read, so transactions committing during it are read again next time
+                watermark = connection.execute(text("""
+                SELECT get_product_watermark()
+                """)).scalar()
+                query = text("""
+                SELECT * FROM get_products_since(:since)
+                """)
+                rows = connection.execute(query, {"since": self._watermark}).fetchall()
+        except Exception as e:
+            logger.warning(f"Product index refresh failed: {str(e)}")
+        else:
+            self._watermark = watermark
+            added = []
+            for row in rows:
+                # Products of transactions still running at the last read are returned again
+                if row.id in self._ids:
+                    continue
+                self._ids.add(row.id)
+                product = {"id": row.id, "name": row.name, "price": float(row.price)}
+                added.append((row.name.casefold(), product))
+            if added:
+                self._index = self._merge(added)
+
+    def _merge(self, added):
+        """New (keys, products) with `added` (key, product) pairs in sorted position."""
+        keys, products = self._index
+        if len(added) > len(keys) // 8:
+            entries = sorted(list(zip(keys, products)) + added, key=lambda entry: entry[0])
+            return [key for key, _ in entries], [product for _, product in entries]
+        # A few new products: insert into copies, so searches in progress keep a consistent pair
+        keys, products = list(keys), list(products)
+        for key, product in added:
+            position = bisect_right(keys, key)
+            keys.insert(position, key)
+            products.insert(position, product)
+        return keys, products
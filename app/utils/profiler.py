@@ -0,0 +1,200 @@
+# app/utils/profiler.py
+import cProfile
+import hmac
+import importlib
+import logging
+import os
+import random
+import signal
+import sys
+import time
+from collections import Counter
+
+from flask import Response, abort, g, request
+
+logger = logging.getLogger(__name__)
+
+MAX_PROFILE_SECONDS = 60
+
+
+def gevent_patched():
+    """Whether gevent's monkey patching turned this process's threads into greenlets."""
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+def _native(module, name):
+    """`module.name` as it was before gevent's monkey patching, if any."""
+    if gevent_patched():
+        from gevent.monkey import get_original
+        return get_original(module, name)
+    return getattr(importlib.import_module(module), name)
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for every other thread of the current process.
+
+    run_for() reads sys._current_frames() every `interval` seconds from the
+    calling thread, so the profiled code runs unmodified; cost is one stack
+    walk per thread per sample. It sleeps with the unpatched time.sleep, so
+    under gevent it must run in a native thread; the worker's thread then shows
+    the greenlet on the CPU at each sample, or the hub while it waits. Output
+    is collapsed-stack text (`frame;frame;frame count`), the input format of
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=0.005, exclude=()):
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.samples = Counter()
+
+    def run_for(self, seconds):
+        sleep = _native('time', 'sleep')
+        skip = self.exclude | {_native('_thread', 'get_ident')()}
+        names = {}
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            sleep(self.interval)
+            self._sample(skip, names)
+        return self.collapsed()
+
+    def collapsed(self):
+        return ''.join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def _sample(self, skip, names):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id in skip:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = names.get(code)
+                if label is None:
+                    label = names[code] = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+                stack.append(label)
+                frame = frame.f_back
+            stack.reverse()
+            self.samples[';'.join(stack)] += 1
+
+
+def _authorized(token):
+    supplied = request.headers.get('X-Profiler-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8'))
+
+
+class Profiler:
+    """Opt-in CPU profiling of a running worker.
+
+    - install_signal_handler() makes PROFILER_SIGNAL sample the worker for
+      PROFILER_SIGNAL_SECONDS from a native thread and write collapsed stacks
+      to PROFILER_OUTPUT_DIR; gunicorn.conf.py installs it in every worker.
+      This works with every worker class.
+    - POST /debug/profile?seconds=N returns the same output for the worker that
+      handles it. Needs PROFILER_ENABLED, the PROFILER_TOKEN in an
+      X-Profiler-Token header and a threaded worker (gthread): a sync or gevent
+      worker would only wait on its own request, so it is refused there.
+    - PROFILE_REQUEST_SAMPLE_RATE > 0 runs cProfile on that fraction of requests
+      and dumps .prof files to PROFILER_OUTPUT_DIR.
+    """
+
+    def __init__(self, app=None):
+        self.token = None
+        self.output_dir = None
+        self.interval = 0.005
+        self.request_sample_rate = 0.0
+        self.enabled = False
+        self.signal_name = 'SIGUSR2'
+        self.signal_seconds = 30
+        # Taken from native threads, so never a gevent lock
+        self._busy = _native('_thread', 'allocate_lock')()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.token = app.config.get('PROFILER_TOKEN')
+        self.output_dir = app.config.get('PROFILER_OUTPUT_DIR')
+        self.interval = app.config.get('PROFILER_INTERVAL_MS', 5) / 1000.0
+        self.request_sample_rate = app.config.get('PROFILE_REQUEST_SAMPLE_RATE', 0.0)
+        self.enabled = app.config.get('PROFILER_ENABLED', False)
+        self.signal_name = app.config.get('PROFILER_SIGNAL', 'SIGUSR2')
+        self.signal_seconds = app.config.get('PROFILER_SIGNAL_SECONDS', 30)
+        app.extensions['profiler'] = self
+
+        if self.enabled and self.token:
+            app.add_url_rule('/debug/profile', 'debug_profile', self.profile_endpoint, methods=['POST'])
+
+        if self.request_sample_rate > 0:
+            app.before_request(self._start_request_profile)
+            app.after_request(self._finish_request_profile)
+
+    def profile(self, seconds):
+        """Sample this process for `seconds`; returns None if a profile is already running."""
+        if not self._busy.acquire(blocking=False):
+            return None
+        try:
+            return SamplingProfiler(self.interval).run_for(seconds)
+        finally:
+            self._busy.release()
+
+    def profile_endpoint(self):
+        if not _authorized(self.token):
+            abort(403)
+        if not request.environ.get('wsgi.multithread') or gevent_patched():
+            return {
+                "message": "This worker runs one thread, which this request would keep busy; "
+                           "send it PROFILER_SIGNAL instead"
+            }, 409
+        seconds = min(request.args.get('seconds', 10, type=float), MAX_PROFILE_SECONDS)
+        output = self.profile(seconds)
+        if output is None:
+            return {"message": "A profile is already running in this worker"}, 409
+        return Response(output, mimetype='text/plain', headers={
+            'Content-Disposition': f'attachment; filename="profile-{os.getpid()}.collapsed"'
+        })
+
+    def install_signal_handler(self):
+        """Profile in the background whenever this process receives PROFILER_SIGNAL.
+
+        Must run in the worker's main thread, never in a gunicorn master.
+        """
+        signum = getattr(signal, self.signal_name)
+        seconds = self.signal_seconds
+
+        def handle(received, frame):
+            _native('_thread', 'start_new_thread')(self._profile_to_file, (seconds,))
+
+        signal.signal(signum, handle)
+
+    def _profile_to_file(self, seconds):
+        output = self.profile(seconds)
+        if output is None:
+            return
+        path = self._output_path(f"profile-{os.getpid()}-{int(time.time())}.collapsed")
+        with open(path, 'w') as f:
+            f.write(output)
+        logger.info(f"Wrote sampling profile to {path}")
+
+    def _output_path(self, filename):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, filename)
+
+    def _start_request_profile(self):
+        if random.random() >= self.request_sample_rate:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return
+        g._request_profile = profile
+
+    def _finish_request_profile(self, response):
+        profile = g.pop('_request_profile', None)
+        if profile is None:
+            return response
+        profile.disable()
+        endpoint = (request.endpoint or 'unmatched').replace('.', '-')
+        path = self._output_path(f"request-{endpoint}-{os.getpid()}-{time.time_ns()}.prof")
+        profile.dump_stats(path)
+        return response
@@ -0,0 +1,192 @@
+# app/utils/rate_limit.py
+"""Sliding-window rate limiting for unauthenticated endpoints.
+
+Each key (e.g. 'ip:10.0.0.1' or 'email:jane@example.com') has a counter for
+the current fixed window and the count of the previous one. A request is let
+through while the previous count, weighted by how much of its window still
+overlaps the sliding window, plus the current count stays under the limit.
+That approximates a true sliding log with two numbers per key.
+"""
+from collections import OrderedDict
+import logging
+import math
+import threading
+import time
+
+from app.utils.sqlite_store import LocalSQLite
+
+logger = logging.getLogger(__name__)
+
+
+def sliding_count(window_start, current, previous, window, now):
+    """Requests counted against a key at `now`, given its stored counters."""
+    elapsed = now - window_start
+    if elapsed >= 2 * window:
+        return 0.0
+    if elapsed >= window:
+        # The stored current window is now the previous one
+        return current * (1 - (elapsed - window) / window)
+    return previous * (1 - elapsed / window) + current
+
+
+def advance(window_start, current, previous, window, now):
+    """Counters rolled forward to the fixed window containing `now`."""
+    start = now - now % window
+    if window_start == start:
+        return start, current, previous
+    if window_start == start - window:
+        return start, 0, current
+    return start, 0, 0
+
+
+def retry_after(window_start, current, previous, window, limit, now):
+    """Whole seconds until one more request would fit under `limit`."""
+    start, current, previous = advance(window_start, current, previous, window, now)
+    elapsed = now - start
+    if current >= limit:
+        # Only the next window frees room; by then the weight of this one has to drop too
+        return math.ceil(window - elapsed + window * (1 - (limit - 1) / current))
+    # previous * (1 - t / window) + current <= limit - 1
+    needed = window * (1 - (limit - 1 - current) / previous)
+    return max(1, math.ceil(needed - elapsed))
+
+
+class MemoryRateLimitStore:
+    """In-process counters. Each worker allows the full limit on its own."""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._counters = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, limits, window, now):
+        """Count one request against every (key, limit) unless one of them is over.
+
+        Returns 0 when the request is allowed, else the seconds to wait.
+        """
+        with self._lock:
+            rows = [(key, limit, self._counters.get(key, (now - 2 * window, 0, 0))) for key, limit in limits]
+            wait = max(
+                (retry_after(*counters, window, limit, now)
+                 for _, limit, counters in rows if sliding_count(*counters, window, now) + 1 > limit),
+                default=0
+            )
+            if wait:
+                return wait
+            for key, _, counters in rows:
+                start, current, previous = advance(*counters, window, now)
+                self._counters[key] = (start, current + 1, previous)
+                self._counters.move_to_end(key)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+            return 0
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+
+class SQLiteRateLimitStore:
+    """File-backed counters shared by every worker on the host."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_limits (
+        key TEXT PRIMARY KEY,
+        window_start REAL NOT NULL,
+        current INTEGER NOT NULL,
+        previous INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ix_rate_limits_window_start ON rate_limits (window_start);
+    """
+
+    def __init__(self, path, max_keys):
+        self.max_keys = max_keys
+        self._db = LocalSQLite(path, self.SCHEMA)
+
+    def hit(self, limits, window, now):
+        conn = self._db.connection()
+        # IMMEDIATE takes the write lock up front so check and count are atomic across workers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = []
+            for key, limit in limits:
+                row = conn.execute(
+                    "SELECT window_start, current, previous FROM rate_limits WHERE key = ?", (key,)
+                ).fetchone()
+                rows.append((key, limit, row or (now - 2 * window, 0, 0)))
+            wait = max(
+                (retry_after(*counters, window, limit, now)
+                 for _, limit, counters in rows if sliding_count(*counters, window, now) + 1 > limit),
+                default=0
+            )
+            if not wait:
+                for key, _, counters in rows:
+                    start, current, previous = advance(*counters, window, now)
+                    conn.execute(
+                        "INSERT OR REPLACE INTO rate_limits (key, window_start, current, previous) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, start, current + 1, previous)
+                    )
+                # Keys idle for two windows count nothing; drop them once the table is full
+                if conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0] > self.max_keys:
+                    conn.execute("DELETE FROM rate_limits WHERE window_start <= ?", (now - 2 * window,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def clear(self):
+        self._db.connection().execute("DELETE FROM rate_limits")
+
+
+class RateLimiter:
+    """Login throttling per client IP and per email over LOGIN_RATE_LIMIT_WINDOW seconds.
+
+    Checked before any query, so rejected requests never reach the database.
+    A store failure lets the request through.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.window = 60
+        self.ip_limit = 20
+        self.email_limit = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+        max_keys = app.config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 100000)
+        self.window = app.config.get('LOGIN_RATE_LIMIT_WINDOW', 60)
+        self.ip_limit = app.config.get('LOGIN_RATE_LIMIT_PER_IP', 20)
+        self.email_limit = app.config.get('LOGIN_RATE_LIMIT_PER_EMAIL', 5)
+        # retry_after divides by the counts; a limit of 0 would fail every check, which lets requests through
+        for name, value in (('LOGIN_RATE_LIMIT_WINDOW', self.window), ('LOGIN_RATE_LIMIT_PER_IP', self.ip_limit),
+                            ('LOGIN_RATE_LIMIT_PER_EMAIL', self.email_limit)):
+            if value < 1:
+                raise ValueError(f"{name} must be at least 1, got {value}")
+
+        if backend == 'sqlite':
+            self.store = SQLiteRateLimitStore(app.config['LOGIN_RATE_LIMIT_PATH'], max_keys)
+        elif backend == 'memory':
+            self.store = MemoryRateLimitStore(max_keys)
+        else:
+            self.store = None
+
+        app.extensions['rate_limiter'] = self
+
+    def check_login(self, ip, email):
+        """0 if a login attempt may proceed, else the seconds the client should wait."""
+        if self.store is None:
+            return 0
+        limits = [(f"ip:{ip}", self.ip_limit), (f"email:{email.strip().lower()}", self.email_limit)]
+        try:
+            return self.store.hit(limits, self.window, time.time())
+        except Exception as e:
+            logger.warning(f"Rate limit check failed: {str(e)}")
+            return 0
+
+    def clear(self):
+        if self.store is not None:
+            self.store.clear()
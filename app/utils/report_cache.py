@@ -0,0 +1,218 @@
+# app/utils/report_cache.py
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+import json
+import logging
+import threading
+import time
+
+from app.utils.metrics import record_cache_lookup
+from app.utils.sqlite_store import LocalSQLite
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryReportStore:
+    """In-process LRU store. Invalidation only reaches the current worker."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._by_user = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= now:
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            self._by_user[key[0]].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+
+    def invalidate(self, user_id, day):
+        with self._lock:
+            stale = [key for key in self._by_user.get(user_id, ()) if key[1] <= day <= key[2]]
+            for key in stale:
+                self._remove(key)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[key[0]]
+
+
+class SQLiteReportStore:
+    """File-backed LRU store shared by every worker on the host."""
+
+    # Runs on every new connection, so it must never drop what other workers
+    # stored. Keys without the data version lived in a report_cache table,
+    # which is no longer read
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS report_pages (
+        user_id TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        page_size INTEGER NOT NULL,
+        version INTEGER NOT NULL,
+        payload TEXT NOT NULL,
+        expires_at REAL,
+        last_access REAL NOT NULL,
+        PRIMARY KEY (user_id, start_date, end_date, page, page_size, version)
+    );
+    CREATE INDEX IF NOT EXISTS ix_report_pages_last_access ON report_pages (last_access);
+    """
+
+    def __init__(self, path, max_entries):
+        self.max_entries = max_entries
+        self._db = LocalSQLite(path, self.SCHEMA)
+
+    def get(self, key, now):
+        conn = self._db.connection()
+        row = conn.execute(
+            "SELECT payload, expires_at FROM report_pages "
+            "WHERE user_id = ? AND start_date = ? AND end_date = ? AND page = ? AND page_size = ? AND version = ?",
+            key
+        ).fetchone()
+        if row is None:
+            return None
+
+        payload, expires_at = row
+        if expires_at is not None and expires_at <= now:
+            conn.execute(
+                "DELETE FROM report_pages "
+                "WHERE user_id = ? AND start_date = ? AND end_date = ? AND page = ? AND page_size = ? AND version = ?",
+                key
+            )
+            return None
+
+        conn.execute(
+            "UPDATE report_pages SET last_access = ? "
+            "WHERE user_id = ? AND start_date = ? AND end_date = ? AND page = ? AND page_size = ? AND version = ?",
+            (time.time(), *key)
+        )
+        return json.loads(payload)
+
+    def set(self, key, value, expires_at):
+        conn = self._db.connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO report_pages "
+            "(user_id, start_date, end_date, page, page_size, version, payload, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (*key, json.dumps(value), expires_at, time.time())
+        )
+        overflow = conn.execute("SELECT COUNT(*) FROM report_pages").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM report_pages WHERE rowid IN "
+                "(SELECT rowid FROM report_pages ORDER BY last_access, rowid LIMIT ?)",
+                (overflow,)
+            )
+
+    def invalidate(self, user_id, day):
+        conn = self._db.connection()
+        cursor = conn.execute(
+            "DELETE FROM report_pages WHERE user_id = ? AND start_date <= ? AND end_date >= ?",
+            (user_id, day, day)
+        )
+        return cursor.rowcount
+
+    def clear(self):
+        self._db.connection().execute("DELETE FROM report_pages")
+
+
+class ReportCache:
+    """Cache of product sales report pages keyed by (user_id, start_date, end_date, page, page_size, version).
+
+    `version` is the user's data version, which every order write and archive
+    run bumps in the database, so a page cached before a change is never read
+    again by any worker or process. Ranges that end before today are kept until
+    evicted; ranges that include today also expire after REPORT_CACHE_OPEN_TTL
+    seconds. Invalidation only frees superseded entries early.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.open_ttl = 60
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('REPORT_CACHE_BACKEND', 'memory')
+        max_entries = app.config.get('REPORT_CACHE_MAX_ENTRIES', 1024)
+        self.open_ttl = app.config.get('REPORT_CACHE_OPEN_TTL', 60)
+
+        if backend == 'sqlite':
+            self.store = SQLiteReportStore(app.config['REPORT_CACHE_PATH'], max_entries)
+        elif backend == 'memory':
+            self.store = MemoryReportStore(max_entries)
+        else:
+            self.store = None
+
+        app.extensions['report_cache'] = self
+
+    @staticmethod
+    def make_key(user_id, start_date, end_date, page, page_size, version):
+        return (str(user_id), start_date, end_date, int(page), int(page_size), int(version))
+
+    def get(self, key):
+        if self.store is None:
+            return None
+        try:
+            value = self.store.get(key, time.time())
+        except Exception as e:
+            logger.warning(f"Report cache read failed: {str(e)}")
+            value = None
+        record_cache_lookup('report', value is not None)
+        return value
+
+    def set(self, key, value):
+        if self.store is None:
+            return
+        expires_at = None
+        if key[2] >= date.today().isoformat():
+            expires_at = time.time() + self.open_ttl
+        try:
+            self.store.set(key, value, expires_at)
+        except Exception as e:
+            logger.warning(f"Report cache write failed: {str(e)}")
+
+    def invalidate(self, user_id, day):
+        """Drop every cached range of `user_id` that contains `day` (a date or YYYY-MM-DD)."""
+        if self.store is None:
+            return 0
+        if isinstance(day, datetime):
+            day = day.date()
+        if isinstance(day, date):
+            day = day.isoformat()
+        try:
+            return self.store.invalidate(str(user_id), day)
+        except Exception as e:
+            logger.warning(f"Report cache invalidation failed: {str(e)}")
+            return 0
+
+    def clear(self):
+        if self.store is not None:
+            self.store.clear()
@@ -0,0 +1,94 @@
+# app/utils/revenue_cache.py
+from collections import OrderedDict
+from datetime import timedelta
+import threading
+
+from app.utils.metrics import record_cache_lookup
+
+BUCKET_SIZES = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+}
+
+
+def bucket_start(moment, bucket):
+    """Start of the `bucket` containing `moment`, like PostgreSQL's date_trunc (weeks start on Monday)."""
+    if bucket == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if bucket == 'week':
+        start -= timedelta(days=start.weekday())
+    return start
+
+
+def bucket_starts(start, end, bucket):
+    """Starts of every `bucket` overlapping [start, end]."""
+    size = BUCKET_SIZES[bucket]
+    current = bucket_start(start, bucket)
+    starts = []
+    while current <= end:
+        starts.append(current)
+        current += size
+    return starts
+
+
+class RevenueCache:
+    """Per-worker cache of closed revenue buckets keyed by (user_id, bucket, bucket start).
+
+    Values are (order_count, revenue) with revenue a Decimal, so totals stay exact.
+
+    A bucket is closed once it ended more than REVENUE_CACHE_GRACE_SECONDS ago
+    on the database clock, the one orders.created_at is written with; the grace
+    covers order transactions still open when their bucket ends. Each entry
+    holds the user's history version, which the database bumps for every
+    order written or archived after its hour is over (write-behind, backdated
+    or archived orders), so those changes reach every worker. Only buckets
+    still open are read from orders again, so a year of daily buckets costs
+    one query over today's orders.
+    """
+
+    def __init__(self, app=None):
+        self.max_entries = 100000
+        self.grace = timedelta(seconds=300)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('REVENUE_CACHE_MAX_ENTRIES', 100000)
+        self.grace = timedelta(seconds=app.config.get('REVENUE_CACHE_GRACE_SECONDS', 300))
+        self.clear()
+        app.extensions['revenue_cache'] = self
+
+    def is_closed(self, start, bucket, now):
+        return start + BUCKET_SIZES[bucket] + self.grace <= now
+
+    def get_many(self, user_id, bucket, starts, history_version):
+        """Cached (order_count, revenue) by bucket start, for the starts cached at `history_version`."""
+        found = {}
+        with self._lock:
+            for start in starts:
+                key = (str(user_id), bucket, start)
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == history_version:
+                    self._entries.move_to_end(key)
+                    found[start] = entry[1]
+        record_cache_lookup('revenue', len(found) == len(starts))
+        return found
+
+    def set_many(self, user_id, bucket, values, history_version, now):
+        """Store (order_count, revenue) by bucket start; only buckets closed at `now` are kept."""
+        with self._lock:
+            for start, value in values.items():
+                if self.is_closed(start, bucket, now):
+                    key = (str(user_id), bucket, start)
+                    self._entries[key] = (history_version, value)
+                    self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,124 @@
+# app/utils/sql_timing.py
+import json
+import logging
+import re
+import time
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Every API query is `SELECT ... FROM some_procedure(...)`; the name is the useful label
+PROCEDURE_PATTERN = re.compile(r'\bFROM\s+([A-Za-z_][A-Za-z0-9_.]*)\s*\(', re.IGNORECASE)
+
+
+def describe_statement(statement):
+    """Short label for a statement: the stored procedure it calls, or its first words."""
+    match = PROCEDURE_PATTERN.search(statement)
+    if match:
+        return match.group(1)
+    return ' '.join(statement.split())[:60].replace('"', "'")
+
+
+class RequestSQLStats:
+    __slots__ = ('started', 'statements', 'db_time', 'slowest_time', 'slowest_statement')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, duration):
+        self.statements += 1
+        self.db_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+
+class SQLTiming:
+    """Per-request SQL statement count, DB time and slowest statement.
+
+    Exposed as a Server-Timing header and as a structured log line for requests
+    slower than SLOW_REQUEST_THRESHOLD_MS. With SQL_TIMING_ENABLED off no engine
+    listeners or request hooks are registered at all.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.slow_threshold = 0.5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('SQL_TIMING_ENABLED', False)
+        self.slow_threshold = app.config.get('SLOW_REQUEST_THRESHOLD_MS', 500) / 1000.0
+        app.extensions['sql_timing'] = self
+        if not self.enabled:
+            return
+
+        # Imported here: app.extensions imports this module
+        from app.extensions import db
+        with app.app_context():
+            engine = db.engine
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    @staticmethod
+    def current():
+        """Stats of the current request, or None outside a timed request."""
+        if not has_request_context():
+            return None
+        return g.get('_sql_stats')
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_sql_timing_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_sql_timing_start')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        stats = self.current()
+        if stats is not None:
+            stats.record(statement, duration)
+
+    def _start_request(self):
+        g._sql_stats = RequestSQLStats()
+
+    def _finish_request(self, response):
+        stats = g.pop('_sql_stats', None)
+        if stats is None:
+            return response
+
+        total = time.perf_counter() - stats.started
+        slowest = describe_statement(stats.slowest_statement) if stats.slowest_statement else None
+
+        timings = [
+            f'db;dur={stats.db_time * 1000:.2f};desc="{stats.statements} statements"',
+            f'app;dur={total * 1000:.2f}',
+        ]
+        if slowest:
+            timings.append(f'db-slowest;dur={stats.slowest_time * 1000:.2f};desc="{slowest}"')
+        response.headers.add('Server-Timing', ', '.join(timings))
+
+        if total >= self.slow_threshold:
+            logger.warning(json.dumps({
+                "event": "slow_request",
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "duration_ms": round(total * 1000, 2),
+                "db_ms": round(stats.db_time * 1000, 2),
+                "statements": stats.statements,
+                "slowest_statement": slowest,
+                "slowest_ms": round(stats.slowest_time * 1000, 2),
+            }))
+        return response
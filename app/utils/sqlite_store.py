@@ -0,0 +1,38 @@
+# app/utils/sqlite_store.py
+import os
+import sqlite3
+import threading
+
+
+class LocalSQLite:
+    """Per-thread, per-process SQLite connections to a file shared by all workers.
+
+    Connections are never shared across a fork: a child process that inherits a
+    connection from its parent opens its own on first use.
+    """
+
+    def __init__(self, path, schema_sql=None, timeout=5.0):
+        self.path = path
+        self.schema_sql = schema_sql
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        # WAL lets readers in other workers proceed while one worker writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if self.schema_sql:
+            conn.executescript(self.schema_sql)
+
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
@@ -0,0 +1,144 @@
+# app/utils/token_blocklist.py
+import hashlib
+import logging
+import math
+
+from sqlalchemy import text
+
+from app.utils.periodic_refresh import PeriodicRefresh, overlap_since
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size set of strings with no false negatives.
+
+    Sized for `capacity` entries at a false positive rate of `error_rate`;
+    adding more entries than that raises the rate.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        # Two 64-bit hashes combined into `hashes` positions (double hashing)
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        bits = self._bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenBlocklist(PeriodicRefresh):
+    """Per-worker bloom filter of revoked access token ids (jti).
+
+    Synced incrementally from revoked_tokens every TOKEN_BLOCKLIST_REFRESH_SECONDS,
+    so checking a token that was not revoked needs no query. A jti the filter
+    may contain is confirmed with is_token_revoked before the token is rejected.
+    The filter is rebuilt twice as large once it holds more than its capacity.
+    """
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self.refresh_seconds = 5.0
+        self._reset()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.capacity = app.config.get('TOKEN_BLOCKLIST_CAPACITY', 100000)
+        self.error_rate = app.config.get('TOKEN_BLOCKLIST_ERROR_RATE', 0.001)
+        self.refresh_seconds = app.config.get('TOKEN_BLOCKLIST_REFRESH_SECONDS', 5)
+        self._reset()
+        app.extensions['token_blocklist'] = self
+
+    def _reset(self):
+        self._filter = BloomFilter(self.capacity, self.error_rate)
+        self._count = 0
+        self._confirmed = set()
+        self._watermark = None
+        self._reset_refresh()
+
+    def add(self, jti):
+        """Block a token in this worker right away; others pick it up on their next sync."""
+        # Counted when the next sync reads it back
+        self._filter.add(jti)
+        self._confirmed.add(jti)
+
+    def is_revoked(self, jti, engine):
+        self.maybe_refresh(engine)
+        if jti not in self._filter:
+            return False
+        if jti in self._confirmed:
+            return True
+        try:
+            with engine.connect() as connection:
+                query = text("""
+                SELECT is_token_revoked(:jti)
+                """)
+                revoked = connection.execute(query, {"jti": jti}).scalar()
+        except Exception as e:
+            # The filter says the token may be revoked; reject it rather than guess
+            logger.warning(f"Token blocklist check failed: {str(e)}")
+            return True
+        if revoked:
+            self._confirmed.add(jti)
+        return revoked
+
+    def _refresh(self, engine):
+        """Add tokens revoked since the last refresh. Failures keep the current filter."""
+        # Too full for its error rate: reload every unexpired revoked token into a larger one
+        rebuild = self._count > self.capacity
+        previous = None if rebuild else self._watermark
+        since = overlap_since(previous)
+        try:
+            with engine.connect() as connection:
+                query = text("""
+                SELECT * FROM get_revoked_tokens_since(:since)
+                """)
+                rows = connection.execute(query, {"since": since}).fetchall()
+        except Exception as e:
+            logger.warning(f"Token blocklist refresh failed: {str(e)}")
+        else:
+            if rebuild:
+                self.capacity *= 2
+                self._reset()
+            for row in rows:
+                self._filter.add(row.jti)
+                # Rows in the overlap were counted by the previous refresh
+                if previous is None or row.revoked_at > previous:
+                    self._count += 1
+                if self._watermark is None or row.revoked_at > self._watermark:
+                    self._watermark = row.revoked_at
+
+def revoke_token(connection, jti, user_id, expires_at):
+    """Record a revoked token on an open transaction; False if it already was."""
+    query = text("""
+    SELECT revoke_token(:jti, :user_id, :expires_at)
+    """)
+    return connection.execute(query, {"jti": jti, "user_id": user_id, "expires_at": expires_at}).scalar()
+
+
+def prune_revoked_tokens(connection, batch_size=10000):
+    """Delete revoked tokens past their expiry in batches, committing after each one."""
+    total = 0
+    while True:
+        with connection.begin():
+            query = text("""
+            SELECT prune_revoked_tokens(:batch_size)
+            """)
+            deleted = connection.execute(query, {"batch_size": batch_size}).scalar()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,58 @@
+# app/utils/token_versions.py
+import logging
+
+from sqlalchemy import text
+
+from app.utils.periodic_refresh import PeriodicRefresh, overlap_since
+
+logger = logging.getLogger(__name__)
+
+
+class TokenVersions(PeriodicRefresh):
+    """Per-worker copy of user_token_versions for checking tokens without a query.
+
+    Access tokens carry the user's token version from login as the `ver` claim;
+    revoke_user_tokens bumps the stored version so older tokens fail the check.
+    The table is refreshed incrementally every TOKEN_VERSION_REFRESH_SECONDS, so
+    a revocation reaches every worker within that interval. Only users that were
+    ever revoked have a row, which keeps the table small.
+    """
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.refresh_seconds = 30.0
+        self._versions = {}
+        self._watermark = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('TOKEN_VERSION_REFRESH_SECONDS', 30)
+        self._versions = {}
+        self._watermark = None
+        self._reset_refresh()
+        app.extensions['token_versions'] = self
+
+    def is_current(self, user_id, version, engine):
+        """True unless the user's tokens were revoked after this version was issued."""
+        self.maybe_refresh(engine)
+        return version >= self._versions.get(user_id, 0)
+
+    def _refresh(self, engine):
+        """Load versions changed since the last refresh. Failures keep the current table."""
+        since = overlap_since(self._watermark)
+        try:
+            with engine.connect() as connection:
+                query = text("""
+                SELECT * FROM get_token_versions_since(:since)
+                """)
+                rows = connection.execute(query, {"since": since}).fetchall()
+        except Exception as e:
+            logger.warning(f"Token version refresh failed: {str(e)}")
+        else:
+            for row in rows:
+                # Versions only grow; overlapping reads can return a row twice
+                if row.version > self._versions.get(row.user_id, 0):
+                    self._versions[row.user_id] = row.version
+                if self._watermark is None or row.updated_at > self._watermark:
+                    self._watermark = row.updated_at
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Startup cost of the app: cold import + create_app, and gunicorn with and
+without preloading.
+
+For each mode it reports the time until every worker has finished booting,
+the time to the first /health response, and memory from
+/proc/<pid>/smaps_rollup: total PSS of master + workers and the average
+private (unshared) memory per worker. No database is needed; create_app
+does not connect.
+
+    python benchmarks/startup.py --workers 4 --repeat 3
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import tempfile
+import urllib.request
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; started = time.perf_counter(); import run; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measure app and gunicorn worker startup')
+    parser.add_argument('--workers', type=int, default=4, help='Gunicorn workers')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (median is reported)')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds to wait for workers to boot')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    return parser.parse_args()
+
+
+def measure_import():
+    """Seconds for `import run` (imports + create_app) in a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, '-c', IMPORT_SNIPPET],
+        cwd=project_root, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def write_config(directory, preload, ready_file):
+    """Project gunicorn.conf.py with preloading forced on/off and a boot marker per worker."""
+    path = Path(directory) / f"gunicorn_{'preload' if preload else 'lazy'}.conf.py"
+    path.write_text(
+        f"exec(open({str(project_root / 'gunicorn.conf.py')!r}).read())\n"
+        f"preload_app = {preload!r}\n"
+        "_post_worker_init = post_worker_init\n"
+        "def post_worker_init(worker):\n"
+        "    _post_worker_init(worker)\n"
+        "    import time\n"
+        f"    with open({str(ready_file)!r}, 'a') as f:\n"
+        "        f.write(f'{time.time()}\\n')\n"
+    )
+    return path
+
+
+def memory_kb(pid):
+    """(pss, private) in kB for one process, from smaps_rollup."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(':') and parts[1].isdigit():
+                values[parts[0][:-1]] = int(parts[1])
+    return values.get('Pss', 0), values.get('Private_Clean', 0) + values.get('Private_Dirty', 0)
+
+
+def children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return [int(child) for child in f.read().split()]
+
+
+def measure_gunicorn(preload, workers, timeout):
+    with tempfile.TemporaryDirectory() as directory:
+        ready_file = Path(directory) / 'ready'
+        ready_file.touch()
+        config = write_config(directory, preload, ready_file)
+        port = free_port()
+        env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(Path(directory) / 'metrics'))
+
+        started = time.time()
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', str(config), '--workers', str(workers),
+             '--bind', f'127.0.0.1:{port}', 'run:app'],
+            cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            first_response = None
+            while time.time() - started < timeout:
+                if first_response is None:
+                    try:
+                        urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1).read()
+                        first_response = time.time() - started
+                    except OSError:
+                        pass
+                booted = ready_file.read_text().split()
+                if first_response is not None and len(booted) >= workers:
+                    break
+                time.sleep(0.02)
+            else:
+                raise RuntimeError(f"Workers did not boot within {timeout}s")
+
+            all_ready = max(float(t) for t in booted) - started
+            # Let copy-on-write settle before reading memory
+            time.sleep(0.5)
+            master_pss, _ = memory_kb(process.pid)
+            worker_memory = [memory_kb(pid) for pid in children(process.pid)]
+            return {
+                "all_workers_ready_s": round(all_ready, 3),
+                "first_response_s": round(first_response, 3),
+                "total_pss_mb": round((master_pss + sum(p for p, _ in worker_memory)) / 1024, 1),
+                "worker_private_mb": round(statistics.mean(u for _, u in worker_memory) / 1024, 1),
+            }
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+
+def median_of(runs):
+    return {key: round(statistics.median(run[key] for run in runs), 3) for key in runs[0]}
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    results = {
+        "import_and_create_app_s": round(statistics.median(measure_import() for _ in range(args.repeat)), 3)
+    }
+    for preload in (False, True):
+        runs = [measure_gunicorn(preload, args.workers, args.timeout) for _ in range(args.repeat)]
+        results['preload' if preload else 'no_preload'] = median_of(runs)
+
+    print(f"import + create_app: {results['import_and_create_app_s']}s")
+    print(f"{'gunicorn x' + str(args.workers):<14}{'ready s':>10}{'first s':>10}{'PSS MB':>10}{'private/worker MB':>20}")
+    for mode in ('no_preload', 'preload'):
+        r = results[mode]
+        print(f"{mode:<14}{r['all_workers_ready_s']:>10}{r['first_response_s']:>10}"
+              f"{r['total_pss_mb']:>10}{r['worker_private_mb']:>20}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of request payload validation in app/schemas.py.
+
+For each order size it reports the time to validate one OrderCreate payload,
+and for a batch of orders the per-order time of validating them one by one
+versus through the OrderCreateList TypeAdapter (the drain worker's path).
+Also times UserCreate and a date-range query. No database is needed.
+
+    python benchmarks/validation.py --sizes 1,10,40,100 --batch 500
+"""
+
+import sys
+import json
+import timeit
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app.schemas import DateRangeParams, OrderCreate, OrderCreateList, UserCreate
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Time payload validation per order size')
+    parser.add_argument('--sizes', default='1,10,40,100', help='Comma separated products per order')
+    parser.add_argument('--batch', type=int, default=500, help='Orders per batch for the list comparison')
+    parser.add_argument('--repeat', type=int, default=5, help='Timing runs per measurement (best is reported)')
+    parser.add_argument('--output', help='Also write the results as JSON to this file')
+    return parser.parse_args()
+
+
+def order_payload(lines):
+    return {
+        "customer_name": "Jane Doe",
+        "products": [
+            {"name": f"Product {chr(65 + i % 26)}", "price": 2.5 + i, "quantity": 1 + i % 3}
+            for i in range(lines)
+        ]
+    }
+
+
+def best_us(statement, number, repeat):
+    """Best time of `repeat` runs, in microseconds per call."""
+    return min(timeit.repeat(statement, number=number, repeat=repeat)) / number * 1e6
+
+
+def measure(sizes, batch, repeat):
+    results = {"order": {}, "batch": {}}
+    for size in sizes:
+        payload = order_payload(size)
+        number = max(10, 20000 // size)
+        results["order"][size] = round(best_us(lambda: OrderCreate.model_validate(payload), number, repeat), 2)
+
+        payloads = [payload] * batch
+        number = max(1, 2000 // size)
+        one_by_one = best_us(lambda: [OrderCreate.model_validate(p) for p in payloads], number, repeat) / batch
+        adapter = best_us(lambda: OrderCreateList.validate_python(payloads), number, repeat) / batch
+        results["batch"][size] = {"one_by_one": round(one_by_one, 2), "type_adapter": round(adapter, 2)}
+
+    user = {"name": "Jane Doe", "email": "jane@example.com"}
+    dates = {"start_date": "2026-01-01", "end_date": "2026-01-31"}
+    results["user_create"] = round(best_us(lambda: UserCreate.model_validate(user), 20000, repeat), 2)
+    results["date_range"] = round(best_us(lambda: DateRangeParams(**dates), 20000, repeat), 2)
+    return results
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = measure(sizes, args.batch, args.repeat)
+
+    print(f"{'lines':>6}{'OrderCreate us':>16}{'batch: each us':>18}{'batch: adapter us':>20}")
+    for size in sizes:
+        batch = results["batch"][size]
+        print(f"{size:>6}{results['order'][size]:>16}{batch['one_by_one']:>18}{batch['type_adapter']:>20}")
+    print(f"UserCreate: {results['user_create']} us, DateRangeParams: {results['date_range']} us")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
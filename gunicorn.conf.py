@@ -0,0 +1,53 @@
+# gunicorn.conf.py
+# Loaded automatically by `gunicorn run:app` from the project root.
+import os
+import shutil
+import tempfile
+
+# 'sync' (default), 'gthread' or 'gevent'. Requests mostly wait on PostgreSQL,
+# so gevent lets one worker hold hundreds of requests open at a time.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+
+if worker_class == 'gevent':
+    # Patch before the app is preloaded, so every lock, socket and pool queue it
+    # creates is cooperative, then make psycopg2 wait by yielding the greenlet
+    from gevent import monkey
+    monkey.patch_all()
+    from app.utils.green import patch_psycopg2
+    patch_psycopg2()
+
+    worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', '500'))
+    # One pool per worker, bounded so workers x pool stays under max_connections
+    os.environ.setdefault('DB_POOL_SIZE', '20')
+    os.environ.setdefault('DB_MAX_OVERFLOW', '0')
+
+# Import and build the app once in the master; workers fork with it already in
+# (copy-on-write) memory. create_app opens no connections or log files, and
+# app/__init__.py resets pools and log handlers in every forked child.
+preload_app = True
+
+# Must be set before prometheus_client is imported anywhere: every worker then
+# writes its metric samples to this directory and /metrics merges all of them.
+# Samples left by a previous master are cleared; a HUP reload keeps them.
+if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = os.path.join(tempfile.gettempdir(), 'order_management_metrics')
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Signal handlers belong in the worker; gunicorn's master uses SIGUSR2 for upgrades
+    from app.extensions import profiler
+    if profiler.enabled:
+        profiler.install_signal_handler()
+
+    # Load the product search index before the worker takes requests, not on
+    # the first keystroke; the master never connects to the database
+    from app.extensions import db, product_index
+    with worker.wsgi.app_context():
+        product_index.refresh(db.engine)
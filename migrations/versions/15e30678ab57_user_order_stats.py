@@ -0,0 +1,39 @@
+"""Per-user, per-day order counts and revenue
+
+Revision ID: 15e30678ab57
+Revises: 671b298d8552
+Create Date: 2026-10-20 09:12:47.503118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '15e30678ab57'
+down_revision = '671b298d8552'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_order_stats',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('order_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+    # Seed counters for orders placed so far
+    op.execute("""
+    INSERT INTO user_order_stats (user_id, day, order_count, revenue)
+    SELECT user_id, created_at::DATE, COUNT(*), SUM(total_price)
+    FROM orders
+    GROUP BY user_id, created_at::DATE
+    """)
+
+
+def downgrade():
+    op.drop_table('user_order_stats')
@@ -0,0 +1,33 @@
+"""Per-user token versions for revoking issued access tokens
+
+Revision ID: 4a0f034dfb28
+Revises: 4cf6f7353938
+Create Date: 2026-10-19 19:58:12.664190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a0f034dfb28'
+down_revision = '4cf6f7353938'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_token_versions',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Workers poll for versions changed since their last refresh
+    op.create_index('ix_user_token_versions_updated_at', 'user_token_versions', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_user_token_versions_updated_at', table_name='user_token_versions')
+    op.drop_table('user_token_versions')
@@ -0,0 +1,40 @@
+"""Durable queue of accepted orders for write-behind creation
+
+Revision ID: 4cf6f7353938
+Revises: 02b347d8e85a
+Create Date: 2026-10-19 19:20:41.083315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '4cf6f7353938'
+down_revision = '02b347d8e85a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('order_queue',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.String(length=16), server_default='pending', nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The drain worker takes the oldest pending rows; failed rows stay out of its index
+    op.create_index(
+        'ix_order_queue_pending_created_at', 'order_queue', ['created_at'], unique=False,
+        postgresql_where=sa.text("status = 'pending'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_order_queue_pending_created_at', table_name='order_queue')
+    op.drop_table('order_queue')
@@ -0,0 +1,149 @@
+"""Partition orders and order_products by month
+
+Revision ID: 55b1afc602df
+Revises: 4b0356515f88
+Create Date: 2026-10-19 09:12:40.118204
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '55b1afc602df'
+down_revision = '4b0356515f88'
+branch_labels = None
+depends_on = None
+
+# Number of monthly partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_range(connection):
+    first = connection.execute(sa.text(
+        "SELECT date_trunc('month', MIN(created_at))::date FROM orders"
+    )).scalar()
+    today = date.today()
+    current = date(today.year, today.month, 1)
+    return (first or current), _add_months(current, MONTHS_AHEAD)
+
+
+def _create_monthly_partitions(parent, first, last):
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE {parent}_p{month:%Y_%m} PARTITION OF {parent}_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{upper.isoformat()}')"
+        )
+        month = upper
+    op.execute(f"CREATE TABLE {parent}_default PARTITION OF {parent}_partitioned DEFAULT")
+
+
+def upgrade():
+    connection = op.get_bind()
+    first, last = _month_range(connection)
+
+    # Partition key columns must be NOT NULL and part of every unique key
+    op.execute("""
+    CREATE TABLE orders_partitioned (
+        id VARCHAR(36) NOT NULL DEFAULT gen_random_uuid(),
+        user_id VARCHAR(36) NOT NULL,
+        customer_name VARCHAR(120) NOT NULL,
+        total_price DOUBLE PRECISION NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT NOW()
+    ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("""
+    CREATE TABLE order_products_partitioned (
+        id VARCHAR(36) NOT NULL DEFAULT gen_random_uuid(),
+        order_id VARCHAR(36) NOT NULL,
+        product_id VARCHAR(36) NOT NULL,
+        quantity INTEGER NOT NULL,
+        unit_price DOUBLE PRECISION NOT NULL,
+        created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT NOW()
+    ) PARTITION BY RANGE (created_at)
+    """)
+    _create_monthly_partitions('orders', first, last)
+    _create_monthly_partitions('order_products', first, last)
+
+    # Order lines inherit the order timestamp so both tables prune on the same range
+    op.execute("""
+    INSERT INTO orders_partitioned (id, user_id, customer_name, total_price, created_at)
+    SELECT id, user_id, customer_name, total_price, COALESCE(created_at, NOW())
+    FROM orders
+    """)
+    op.execute("""
+    INSERT INTO order_products_partitioned (id, order_id, product_id, quantity, unit_price, created_at)
+    SELECT op.id, op.order_id, op.product_id, op.quantity, op.unit_price, o.created_at
+    FROM order_products op
+    JOIN orders_partitioned o ON o.id = op.order_id
+    """)
+
+    op.drop_table('order_products')
+    op.drop_table('orders')
+    op.rename_table('orders_partitioned', 'orders')
+    op.rename_table('order_products_partitioned', 'order_products')
+
+    op.create_primary_key('orders_pkey', 'orders', ['id', 'created_at'])
+    op.create_primary_key('order_products_pkey', 'order_products', ['id', 'created_at'])
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_foreign_key('orders_user_id_fkey', 'orders', 'users', ['user_id'], ['id'])
+    op.create_foreign_key(
+        'order_products_order_id_fkey', 'order_products', 'orders',
+        ['order_id', 'created_at'], ['id', 'created_at']
+    )
+    op.create_foreign_key(
+        'order_products_product_id_fkey', 'order_products', 'products',
+        ['product_id'], ['id']
+    )
+
+
+def downgrade():
+    op.rename_table('order_products', 'order_products_partitioned')
+    op.rename_table('orders', 'orders_partitioned')
+    op.execute("ALTER INDEX orders_pkey RENAME TO orders_partitioned_pkey")
+    op.execute("ALTER INDEX order_products_pkey RENAME TO order_products_partitioned_pkey")
+    op.execute("ALTER INDEX ix_orders_created_at RENAME TO ix_orders_partitioned_created_at")
+
+    op.create_table('orders',
+    sa.Column('id', sa.String(length=36), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('customer_name', sa.String(length=120), nullable=False),
+    sa.Column('total_price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_table('order_products',
+    sa.Column('id', sa.String(length=36), server_default=sa.text('gen_random_uuid()'), nullable=False),
+    sa.Column('order_id', sa.String(length=36), nullable=False),
+    sa.Column('product_id', sa.String(length=36), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.execute("""
+    INSERT INTO orders (id, user_id, customer_name, total_price, created_at)
+    SELECT id, user_id, customer_name, total_price, created_at FROM orders_partitioned
+    """)
+    op.execute("""
+    INSERT INTO order_products (id, order_id, product_id, quantity, unit_price, created_at)
+    SELECT id, order_id, product_id, quantity, unit_price, created_at FROM order_products_partitioned
+    """)
+
+    # Dropping the parents drops every attached partition with them
+    op.execute("DROP TABLE order_products_partitioned")
+    op.execute("DROP TABLE orders_partitioned")
@@ -0,0 +1,44 @@
+"""Store money columns as NUMERIC(12,2)
+
+Revision ID: 5b89944552d0
+Revises: 7db8c30d7dd2
+Create Date: 2026-10-19 12:40:51.270316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b89944552d0'
+down_revision = '7db8c30d7dd2'
+branch_labels = None
+depends_on = None
+
+MONEY_COLUMNS = [
+    ('orders', 'total_price'),
+    ('products', 'price'),
+    ('order_products', 'unit_price'),
+]
+
+
+def upgrade():
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.Float(),
+            type_=sa.Numeric(12, 2),
+            existing_nullable=False,
+            postgresql_using=f'ROUND({column}::NUMERIC, 2)'
+        )
+
+
+def downgrade():
+    for table, column in MONEY_COLUMNS:
+        op.alter_column(
+            table, column,
+            existing_type=sa.Numeric(12, 2),
+            type_=sa.Float(),
+            existing_nullable=False,
+            postgresql_using=f'{column}::DOUBLE PRECISION'
+        )
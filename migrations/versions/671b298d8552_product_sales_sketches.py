@@ -0,0 +1,32 @@
+"""Per-user, per-day space-saving summaries of product sales
+
+Revision ID: 671b298d8552
+Revises: 8fb7e5c08a87
+Create Date: 2026-10-19 22:04:51.370218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '671b298d8552'
+down_revision = '8fb7e5c08a87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product_sales_sketches',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('sketch', postgresql.JSONB(astext_type=sa.Text()), server_default='{}', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('product_sales_sketches')
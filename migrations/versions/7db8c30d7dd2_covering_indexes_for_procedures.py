@@ -0,0 +1,45 @@
+"""Covering indexes for the stored procedure access paths
+
+Revision ID: 7db8c30d7dd2
+Revises: 55b1afc602df
+Create Date: 2026-10-19 11:02:17.533120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7db8c30d7dd2'
+down_revision = '55b1afc602df'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_user_orders / get_product_sales_report: user_id + created_at range, newest first
+    op.create_index(
+        'ix_orders_user_id_created_at', 'orders',
+        ['user_id', sa.text('created_at DESC')],
+        unique=False,
+        postgresql_include=['customer_name', 'total_price']
+    )
+    # get_order_products_by_ids, update_order_total and the report join from orders
+    op.create_index(
+        'ix_order_products_order_id', 'order_products',
+        ['order_id'],
+        unique=False,
+        postgresql_include=['product_id', 'quantity', 'unit_price']
+    )
+    # Report join from products and the product foreign key
+    op.create_index(
+        'ix_order_products_product_id', 'order_products',
+        ['product_id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_order_products_product_id', table_name='order_products')
+    op.drop_index('ix_order_products_order_id', table_name='order_products')
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
@@ -0,0 +1,39 @@
+"""Archive table for old orders
+
+Revision ID: 8f6b28cd9eb9
+Revises: 15e30678ab57
+Create Date: 2026-10-20 11:38:05.914260
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '8f6b28cd9eb9'
+down_revision = '15e30678ab57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('orders_archive',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('customer_name', sa.String(length=120), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('products', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+    sa.Column('archived_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    op.add_column('user_order_stats',
+        sa.Column('archived_count', sa.Integer(), server_default='0', nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('user_order_stats', 'archived_count')
+    op.drop_table('orders_archive')
@@ -0,0 +1,25 @@
+"""Index products by created_at for incremental product index refreshes
+
+Revision ID: 8fb7e5c08a87
+Revises: e0304ac8e15c
+Create Date: 2026-10-19 21:27:05.914362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8fb7e5c08a87'
+down_revision = 'e0304ac8e15c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # get_products_since: workers poll for products added since their last refresh
+    op.create_index('ix_products_created_at', 'products', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_products_created_at', table_name='products')
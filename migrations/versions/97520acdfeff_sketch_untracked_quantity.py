@@ -0,0 +1,87 @@
+"""Bound for products left out of a product sales summary, and summaries for existing days
+
+Revision ID: 97520acdfeff
+Revises: 8f6b28cd9eb9
+Create Date: 2026-10-20 14:21:37.402518
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '97520acdfeff'
+down_revision = '8f6b28cd9eb9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('product_sales_sketches',
+        sa.Column('untracked_quantity', sa.BigInteger(), server_default='0', nullable=False)
+    )
+
+    # Each eviction stored the smallest count it replaced as the new entry's error,
+    # and that count only grows, so the largest error left is the latest one
+    op.execute("""
+    UPDATE product_sales_sketches s
+    SET untracked_quantity = e.max_error
+    FROM (
+        SELECT s2.user_id, s2.day, MAX((e.value ->> 2)::BIGINT) AS max_error
+        FROM product_sales_sketches s2, jsonb_each(s2.sketch) e
+        GROUP BY s2.user_id, s2.day
+    ) e
+    WHERE s.user_id = e.user_id
+        AND s.day = e.day
+    """)
+
+    # Exact summaries for the days before today, like rebuild_product_sales_sketches.
+    # This covers orders placed before the summaries existed and drops the revenue
+    # evicted products used to hand on. Today's summaries keep being updated by orders
+    op.execute(sa.text("""
+    WITH lines AS (
+        SELECT o.user_id, o.created_at, p.name, op.quantity, op.unit_price
+        FROM orders o
+        JOIN order_products op ON op.order_id = o.id AND op.created_at = o.created_at
+        JOIN products p ON p.id = op.product_id
+        WHERE o.created_at < CURRENT_DATE
+            AND op.created_at < CURRENT_DATE
+        UNION ALL
+        SELECT a.user_id, a.created_at, x.name, x.quantity, x.unit_price
+        FROM orders_archive a,
+            jsonb_to_recordset(a.products) AS x(name character varying, quantity integer, unit_price numeric)
+        WHERE a.created_at < CURRENT_DATE
+    ), sales AS (
+        SELECT
+            l.user_id,
+            l.created_at::DATE AS day,
+            l.name,
+            SUM(l.quantity)::BIGINT AS quantity,
+            SUM(l.quantity * l.unit_price) AS revenue,
+            ROW_NUMBER() OVER (
+                PARTITION BY l.user_id, l.created_at::DATE
+                ORDER BY SUM(l.quantity) DESC, l.name
+            ) AS rank
+        FROM lines l
+        GROUP BY l.user_id, l.created_at::DATE, l.name
+    )
+    INSERT INTO product_sales_sketches (user_id, day, sketch, untracked_quantity, updated_at)
+    SELECT
+        user_id,
+        day,
+        jsonb_object_agg(name, jsonb_build_array(quantity, revenue, 0)) FILTER (WHERE rank <= :capacity),
+        COALESCE(MAX(quantity) FILTER (WHERE rank > :capacity), 0),
+        NOW()
+    FROM sales
+    GROUP BY user_id, day
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET sketch = EXCLUDED.sketch,
+        untracked_quantity = EXCLUDED.untracked_quantity,
+        updated_at = EXCLUDED.updated_at
+    """).bindparams(capacity=int(os.environ.get('PRODUCT_SKETCH_CAPACITY', '64'))))
+
+
+def downgrade():
+    op.drop_column('product_sales_sketches', 'untracked_quantity')
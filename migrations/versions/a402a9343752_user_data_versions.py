@@ -0,0 +1,38 @@
+"""Per-user data version stamps for conditional GETs
+
+Revision ID: a402a9343752
+Revises: 5b89944552d0
+Create Date: 2026-10-19 14:05:33.806412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a402a9343752'
+down_revision = '5b89944552d0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('user_data_versions',
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Seed stamps for users who already have orders
+    op.execute("""
+    INSERT INTO user_data_versions (user_id, version, updated_at)
+    SELECT user_id, COUNT(*), MAX(created_at)
+    FROM orders
+    GROUP BY user_id
+    """)
+
+
+def downgrade():
+    op.drop_table('user_data_versions')
@@ -0,0 +1,26 @@
+"""Per-user version of orders in time buckets that have already ended
+
+Revision ID: c3d5e8a41f07
+Revises: 97520acdfeff
+Create Date: 2026-10-20 16:48:09.217734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d5e8a41f07'
+down_revision = '97520acdfeff'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user_data_versions',
+        sa.Column('history_version', sa.BigInteger(), server_default='0', nullable=False)
+    )
+
+
+def downgrade():
+    op.drop_column('user_data_versions', 'history_version')
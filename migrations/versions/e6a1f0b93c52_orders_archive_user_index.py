@@ -0,0 +1,26 @@
+"""Index for reading archived orders by user and range in the reports
+
+Revision ID: e6a1f0b93c52
+Revises: c3d5e8a41f07
+Create Date: 2026-10-20 18:02:44.610395
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6a1f0b93c52'
+down_revision = 'c3d5e8a41f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_orders_archive_user_id_created_at', 'orders_archive', ['user_id', 'created_at'],
+        unique=False, postgresql_include=['total_price']
+    )
+
+
+def downgrade():
+    op.drop_index('ix_orders_archive_user_id_created_at', table_name='orders_archive')
@@ -0,0 +1,31 @@
+"""Record the transaction that created each product, for product index refreshes
+
+Revision ID: f4c2a9d17b83
+Revises: e6a1f0b93c52
+Create Date: 2026-10-21 10:14:52.381907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c2a9d17b83'
+down_revision = 'e6a1f0b93c52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing products get 0 and are loaded by the first full read of every worker;
+    # new ones the id of the transaction inserting them
+    op.add_column('products',
+        sa.Column('created_xid', sa.BigInteger(), server_default='0', nullable=False)
+    )
+    op.execute("ALTER TABLE products ALTER COLUMN created_xid SET DEFAULT (pg_current_xact_id()::text)::BIGINT")
+    op.create_index('ix_products_created_xid', 'products', ['created_xid'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_products_created_xid', table_name='products')
+    op.drop_column('products', 'created_xid')
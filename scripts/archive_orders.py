@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+Move old orders out of the partitioned orders tables into orders_archive.
+
+Run from cron (e.g. nightly). Orders older than ORDER_ARCHIVE_AFTER_DAYS are
+stored as one row each, with their lines as JSON; GET /api/orders/<id> still
+finds them. Whole months are moved by dropping their partitions, the rest in
+short batched transactions.
+
+    python scripts/archive_orders.py --older-than-days 365 --batch-size 1000
+"""
+
+import sys
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app import create_app
+from app.extensions import db
+from app.utils.order_archive import archive_orders
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Archive old orders')
+    parser.add_argument('--older-than-days', type=int, help='Archive orders older than this, default ORDER_ARCHIVE_AFTER_DAYS')
+    parser.add_argument('--batch-size', type=int, help='Orders moved per transaction, default ORDER_ARCHIVE_BATCH_SIZE')
+    parser.add_argument('--pause', type=float, default=0.1, help='Seconds to sleep between batches')
+    parser.add_argument('--lock-timeout', default='5s', help='Longest wait for the lock that drops a month')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        days = args.older_than_days or app.config['ORDER_ARCHIVE_AFTER_DAYS']
+        batch_size = args.batch_size or app.config['ORDER_ARCHIVE_BATCH_SIZE']
+        before = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+        with db.engine.connect() as connection:
+            archived = archive_orders(connection, before, batch_size, args.pause, args.lock_timeout)
+        print(f"Archived {archived} orders created before {before:%Y-%m-%d}")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Background worker for write-behind order creation (ORDER_WRITE_BEHIND=true).
+
+Writes queued orders in batches of ORDER_QUEUE_BATCH_SIZE, one transaction per
+batch, and polls every ORDER_QUEUE_POLL_SECONDS once the queue is empty.
+Several drainers can run at once; each locks its own batch. Writing an
+order bumps its user's data version, which the API's report caches are
+keyed on, so nothing has to be invalidated from here.
+"""
+
+import sys
+import time
+import argparse
+import logging
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app import create_app
+from app.extensions import db
+from app.utils.order_queue import drain
+
+logger = logging.getLogger('drain_order_queue')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Write queued orders to the orders tables')
+    parser.add_argument('--batch-size', type=int, help='Orders per transaction (default ORDER_QUEUE_BATCH_SIZE)')
+    parser.add_argument('--interval', type=float, help='Seconds between polls of an empty queue (default ORDER_QUEUE_POLL_SECONDS)')
+    parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+    return parser.parse_args()
+
+
+def run(batch_size, interval, once):
+    with db.engine.connect() as connection:
+        while True:
+            started = time.perf_counter()
+            written, failed = drain(connection, batch_size)
+            if written or failed:
+                logger.info(
+                    f"Wrote {written} queued orders ({failed} failed) "
+                    f"in {time.perf_counter() - started:.2f}s"
+                )
+            if once:
+                return
+            time.sleep(interval)
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        batch_size = args.batch_size or app.config['ORDER_QUEUE_BATCH_SIZE']
+        interval = args.interval if args.interval is not None else app.config['ORDER_QUEUE_POLL_SECONDS']
+        try:
+            run(batch_size, interval, args.once)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+"""
+Synthetic dataset generator for performance work.
+
+Produces users, products, orders and order lines with production-like skew:
+Zipf product popularity, Pareto (heavy-tail) order counts per user and a
+diurnal/weekly created_at distribution. Orders are generated in fixed-size
+chunks, each from its own seeded RNG, and loaded with COPY by a pool of
+worker processes, so the same --seed and --end-date always produce the same
+rows regardless of --workers.
+
+    python scripts/generate_data.py --orders 2000000 --workers 8 --seed 42 --end-date 2026-01-31
+"""
+
+import io
+import sys
+import time
+import uuid
+import random
+import argparse
+import itertools
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import create_engine
+from app.config import Config
+
+# Relative order volume per hour of day: quiet nights, lunch and evening peaks
+HOURLY_WEIGHTS = [
+    0.6, 0.4, 0.3, 0.2, 0.2, 0.4, 1.0, 2.2, 3.4, 3.8, 4.2, 5.6,
+    7.4, 6.8, 4.6, 3.9, 4.1, 5.2, 6.9, 7.2, 6.0, 4.4, 2.6, 1.3,
+]
+# Monday .. Sunday
+WEEKDAY_WEIGHTS = [0.9, 0.95, 1.0, 1.0, 1.15, 1.3, 1.1]
+
+FIRST_NAMES = ['Alice', 'Bruno', 'Carmen', 'Daniel', 'Elena', 'Farid', 'Grace', 'Hugo',
+               'Ines', 'Jonas', 'Keiko', 'Liam', 'Maria', 'Nadia', 'Oscar', 'Priya']
+LAST_NAMES = ['Smith', 'Garcia', 'Johnson', 'Silva', 'Kowalski', 'Nguyen', 'Okafor', 'Rossi',
+              'Schmidt', 'Tanaka', 'Williams', 'Haddad']
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 10000
+    products: int = 2000
+    orders: int = 1000000
+    mean_lines: float = 4.0
+    max_lines: int = 40
+    days: int = 365
+    end_date: date = field(default_factory=date.today)
+    seed: int = 42
+    zipf_s: float = 1.1
+    pareto_alpha: float = 1.2
+    # Yearly growth of daily volume, so recent months are busier than old ones
+    growth: float = 0.5
+    prefix: str = 'gen'
+    chunk_size: int = 50000
+
+    @property
+    def chunks(self):
+        return (self.orders + self.chunk_size - 1) // self.chunk_size
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Generate a large synthetic order dataset')
+    parser.add_argument('--database-uri', default=Config.SQLALCHEMY_DATABASE_URI, help='Target PostgreSQL database')
+    parser.add_argument('--users', type=int, default=DatasetSpec.users)
+    parser.add_argument('--products', type=int, default=DatasetSpec.products)
+    parser.add_argument('--orders', type=int, default=DatasetSpec.orders)
+    parser.add_argument('--mean-lines', type=float, default=DatasetSpec.mean_lines, help='Average lines per order')
+    parser.add_argument('--max-lines', type=int, default=DatasetSpec.max_lines, help='Upper bound of lines per order')
+    parser.add_argument('--days', type=int, default=DatasetSpec.days, help='Days of history ending at --end-date')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=date.today(),
+                        help='Last day of generated orders (YYYY-MM-DD); pin it for reproducible data')
+    parser.add_argument('--seed', type=int, default=DatasetSpec.seed)
+    parser.add_argument('--zipf-s', type=float, default=DatasetSpec.zipf_s, help='Zipf exponent of product popularity')
+    parser.add_argument('--pareto-alpha', type=float, default=DatasetSpec.pareto_alpha,
+                        help='Pareto shape of orders per user (smaller is more skewed)')
+    parser.add_argument('--prefix', default=DatasetSpec.prefix, help='Tag for generated emails and product names')
+    parser.add_argument('--chunk-size', type=int, default=DatasetSpec.chunk_size, help='Orders per COPY chunk')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel loader processes')
+    return parser.parse_args()
+
+
+def make_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def cumulative(weights):
+    return list(itertools.accumulate(weights))
+
+
+class Population:
+    """Users, products and the sampling tables shared by every chunk."""
+
+    def __init__(self, spec):
+        rng = random.Random(f"{spec.seed}-users")
+        self.user_ids = [make_uuid(rng) for _ in range(spec.users)]
+        # A few heavy users place most orders; most users place a handful
+        self.user_cum = cumulative(rng.paretovariate(spec.pareto_alpha) for _ in range(spec.users))
+
+        rng = random.Random(f"{spec.seed}-products")
+        self.product_ids = [make_uuid(rng) for _ in range(spec.products)]
+        self.product_prices = [max(0.5, round(rng.lognormvariate(2.3, 0.6), 2)) for _ in range(spec.products)]
+        # Popularity rank is shuffled so the best sellers are not simply the first products
+        ranks = list(range(1, spec.products + 1))
+        rng.shuffle(ranks)
+        self.product_cum = cumulative(1.0 / rank ** spec.zipf_s for rank in ranks)
+
+        start = spec.end_date - timedelta(days=spec.days - 1)
+        self.days = [start + timedelta(days=i) for i in range(spec.days)]
+        self.day_cum = cumulative(
+            WEEKDAY_WEIGHTS[day.weekday()] * (1 + spec.growth * i / 365) for i, day in enumerate(self.days)
+        )
+        self.hour_cum = cumulative(HOURLY_WEIGHTS)
+
+    def user_rows(self, spec):
+        created_at = datetime.combine(self.days[0], datetime.min.time()) - timedelta(days=30)
+        for n, user_id in enumerate(self.user_ids, start=1):
+            yield (user_id, f"{spec.prefix}-user-{n}@example.com", f"{spec.prefix.title()} User", created_at)
+
+    def product_rows(self, spec):
+        created_at = datetime.combine(self.days[0], datetime.min.time()) - timedelta(days=30)
+        for n, (product_id, price) in enumerate(zip(self.product_ids, self.product_prices), start=1):
+            yield (product_id, f"{spec.prefix.title()} Product {n}", f"{price:.2f}", created_at)
+
+
+def pick(rng, cum):
+    return bisect_left(cum, rng.random() * cum[-1])
+
+
+def generate_chunk(spec, population, index):
+    """Return (order rows, line rows) for chunk `index`; identical for a given spec."""
+    rng = random.Random(f"{spec.seed}-orders-{index}")
+    first = index * spec.chunk_size
+    count = min(spec.chunk_size, spec.orders - first)
+    extra_lines = max(spec.mean_lines - 1, 0.0)
+
+    orders, lines = [], []
+    for _ in range(count):
+        order_id = make_uuid(rng)
+        user_id = population.user_ids[pick(rng, population.user_cum)]
+        day = population.days[pick(rng, population.day_cum)]
+        created_at = datetime(day.year, day.month, day.day, pick(rng, population.hour_cum),
+                              rng.randrange(60), rng.randrange(60), rng.randrange(1000000))
+        customer_name = f"{FIRST_NAMES[rng.randrange(len(FIRST_NAMES))]} {LAST_NAMES[rng.randrange(len(LAST_NAMES))]}"
+
+        line_count = 1
+        if extra_lines:
+            line_count = min(spec.max_lines, 1 + int(rng.expovariate(1 / extra_lines)))
+
+        total_cents = 0
+        # Repeated picks of the same product collapse into one line, as create_order does
+        for product_index in dict.fromkeys(pick(rng, population.product_cum) for _ in range(line_count)):
+            quantity = 1 + int(rng.expovariate(1.5))
+            price = population.product_prices[product_index]
+            total_cents += quantity * round(price * 100)
+            lines.append((make_uuid(rng), order_id, population.product_ids[product_index],
+                          quantity, f"{price:.2f}", created_at))
+
+        orders.append((order_id, user_id, customer_name, f"{total_cents / 100:.2f}", created_at))
+    return orders, lines
+
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into `table` with COPY ... FROM STDIN (text format)."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(value.isoformat(sep=' ') if isinstance(value, datetime) else str(value)
+                               for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def load_chunk(cursor, spec, population, index):
+    orders, lines = generate_chunk(spec, population, index)
+    copy_rows(cursor, 'orders', ['id', 'user_id', 'customer_name', 'total_price', 'created_at'], orders)
+    copy_rows(cursor, 'order_products',
+              ['id', 'order_id', 'product_id', 'quantity', 'unit_price', 'created_at'], lines)
+    return len(orders), len(lines)
+
+
+def months_between(first, last):
+    month = date(first.year, first.month, 1)
+    while month <= last:
+        yield month
+        month = date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def prepare(cursor, spec, population):
+    """Create partitions, users and products in the caller's transaction."""
+    cursor.execute("SELECT COUNT(*) FROM users WHERE email LIKE %s", (f"{spec.prefix}-user-%",))
+    if cursor.fetchone()[0]:
+        raise RuntimeError(f"Users tagged '{spec.prefix}' already exist; use another --prefix")
+
+    for month in months_between(population.days[0], population.days[-1]):
+        for parent in ('orders', 'order_products'):
+            cursor.execute("SELECT ensure_monthly_partition(%s, %s)", (parent, month))
+
+    copy_rows(cursor, 'users', ['id', 'email', 'name', 'created_at'], population.user_rows(spec))
+    copy_rows(cursor, 'products', ['id', 'name', 'price', 'created_at'], population.product_rows(spec))
+
+
+def finalize(cursor, spec):
+    """Bring derived per-user data in line with the loaded orders."""
+    cursor.execute("""
+    INSERT INTO user_data_versions (user_id, version, updated_at)
+    SELECT o.user_id, COUNT(*), MAX(o.created_at)
+    FROM orders o
+    JOIN users u ON u.id = o.user_id
+    WHERE u.email LIKE %s
+    GROUP BY o.user_id
+    ON CONFLICT (user_id) DO UPDATE
+    SET version = EXCLUDED.version, updated_at = EXCLUDED.updated_at,
+        history_version = user_data_versions.history_version + 1
+    """, (f"{spec.prefix}-user-%",))
+    cursor.execute("""
+    INSERT INTO user_order_stats (user_id, day, order_count, revenue)
+    SELECT o.user_id, o.created_at::DATE, COUNT(*), SUM(o.total_price)
+    FROM orders o
+    JOIN users u ON u.id = o.user_id
+    WHERE u.email LIKE %s
+    GROUP BY o.user_id, o.created_at::DATE
+    ON CONFLICT (user_id, day) DO UPDATE
+    SET order_count = EXCLUDED.order_count, revenue = EXCLUDED.revenue
+    """, (f"{spec.prefix}-user-%",))
+
+
+def generate(cursor, spec):
+    """Load a whole dataset through a single DB-API cursor, without committing.
+
+    Used by tests that seed inside a transaction they roll back afterwards.
+    """
+    population = Population(spec)
+    prepare(cursor, spec, population)
+    for index in range(spec.chunks):
+        load_chunk(cursor, spec, population, index)
+    finalize(cursor, spec)
+
+
+_worker_state = {}
+
+
+def _init_worker(database_uri, spec):
+    engine = create_engine(database_uri)
+    _worker_state['connection'] = engine.raw_connection()
+    _worker_state['spec'] = spec
+    _worker_state['population'] = Population(spec)
+
+
+def _load_chunk_in_worker(index):
+    connection = _worker_state['connection']
+    cursor = connection.cursor()
+    try:
+        counts = load_chunk(cursor, _worker_state['spec'], _worker_state['population'], index)
+        connection.commit()
+        return counts
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def run(database_uri, spec, workers):
+    engine = create_engine(database_uri)
+    started = time.perf_counter()
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        prepare(cursor, spec, Population(spec))
+        connection.commit()
+        print(f"Loaded {spec.users} users and {spec.products} products")
+    finally:
+        connection.close()
+
+    # Each chunk commits on its own; a failed run leaves the tagged rows to clean up by prefix
+    orders = lines = 0
+    with Pool(processes=workers, initializer=_init_worker, initargs=(database_uri, spec)) as pool:
+        for chunk_orders, chunk_lines in pool.imap_unordered(_load_chunk_in_worker, range(spec.chunks)):
+            orders += chunk_orders
+            lines += chunk_lines
+            print(f"  {orders}/{spec.orders} orders, {lines} lines "
+                  f"({orders / (time.perf_counter() - started):.0f} orders/s)")
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        finalize(cursor, spec)
+        connection.commit()
+        # ANALYZE cannot share a transaction block with the loads above
+        connection.set_session(autocommit=True)
+        cursor.execute("ANALYZE users, products, orders, order_products, user_data_versions, user_order_stats")
+    finally:
+        connection.close()
+    engine.dispose()
+
+    print(f"Generated {orders} orders and {lines} lines in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    spec = DatasetSpec(
+        users=args.users,
+        products=args.products,
+        orders=args.orders,
+        mean_lines=args.mean_lines,
+        max_lines=args.max_lines,
+        days=args.days,
+        end_date=args.end_date,
+        seed=args.seed,
+        zipf_s=args.zipf_s,
+        pareto_alpha=args.pareto_alpha,
+        prefix=args.prefix,
+        chunk_size=args.chunk_size,
+    )
+    run(args.database_uri, spec, args.workers)
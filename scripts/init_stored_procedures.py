@@ -2,9 +2,10 @@
 STORED_PROCEDURES = {
     # Authentication procedures
     "auth_login": """
-    -- DROP FUNCTION public.auth_login(text);
+    -- The token version column was added for stateless token checks
+    DROP FUNCTION IF EXISTS public.auth_login(text);
     CREATE OR REPLACE FUNCTION public.auth_login(p_email text)
-    RETURNS TABLE(id uuid, email character varying, name character varying, created_at timestamp without time zone)
+    RETURNS TABLE(id uuid, email character varying, name character varying, created_at timestamp without time zone, token_version integer)
     LANGUAGE plpgsql
     AS $function$
         BEGIN
@@ -13,9 +14,12 @@ STORED_PROCEDURES = {
                 u.id::UUID,
                 u.email,
                 u.name,
-                u.created_at
+                u.created_at,
+                COALESCE(v.version, 0)
             FROM 
                 users u
+            LEFT JOIN
+                user_token_versions v ON v.user_id = u.id
             WHERE 
                 u.email = p_email;
         END;
@@ -135,36 +139,110 @@ STORED_PROCEDURES = {
     """,
     
     # Order management procedures
-    "create_order": """
-    -- DROP FUNCTION public.create_order(varchar, varchar);
+    "create_order_with_id": """
+    -- Returned only the id; the lines need created_at, their partition key, as well
+    DROP FUNCTION IF EXISTS public.create_order_with_id(uuid, uuid, varchar, timestamp);
 
-    CREATE OR REPLACE FUNCTION public.create_order(p_user_id uuid, p_customer_name character varying)
-    RETURNS uuid
+    CREATE OR REPLACE FUNCTION public.create_order_with_id(p_order_id uuid, p_user_id uuid, p_customer_name character varying, p_created_at timestamp without time zone)
+    RETURNS TABLE(id uuid, created_at timestamp without time zone)
     LANGUAGE plpgsql
     AS $function$
     DECLARE
         new_order_id UUID;
+        new_created_at TIMESTAMP;
     BEGIN
-        -- Generate a new UUID for the order
-        new_order_id := gen_random_uuid();
-
-        -- Insert with proper UUID types
-        INSERT INTO orders (id, user_id, customer_name, total_price)
+        -- Queued orders keep the id and time they were accepted with
+        INSERT INTO orders (id, user_id, customer_name, total_price, created_at)
         VALUES (
-            new_order_id,
+            p_order_id,
             p_user_id,
             p_customer_name,
-            0
+            0,
+            COALESCE(p_created_at, NOW())
         )
-        RETURNING id INTO new_order_id;
+        RETURNING orders.id, orders.created_at INTO new_order_id, new_created_at;
+
+        -- Count the order for its day; update_order_total adds its value
+        INSERT INTO user_order_stats (user_id, day, order_count, revenue)
+        VALUES (p_user_id::VARCHAR, new_created_at::DATE, 1, 0)
+        ON CONFLICT (user_id, day) DO UPDATE
+        SET order_count = user_order_stats.order_count + 1;
 
-        RETURN new_order_id;
+        -- Bump the user's data version so cached order and report responses revalidate
+        PERFORM bump_user_data_version(p_user_id::VARCHAR, new_created_at);
+
+        id := new_order_id;
+        created_at := new_created_at;
+        RETURN NEXT;
     END;
     $function$
     ;
 
     """,
     
+    "create_order": """
+    -- Returned only the id, like create_order_with_id
+    DROP FUNCTION IF EXISTS public.create_order(uuid, varchar);
+
+    CREATE OR REPLACE FUNCTION public.create_order(p_user_id uuid, p_customer_name character varying)
+    RETURNS TABLE(id uuid, created_at timestamp without time zone)
+    LANGUAGE sql
+    AS $function$
+        SELECT * FROM create_order_with_id(gen_random_uuid(), p_user_id, p_customer_name, NULL);
+    $function$
+    ;
+
+    """,
+    
+    "bump_user_data_version": """
+    -- DROP FUNCTION public.bump_user_data_version(text, timestamp);
+    CREATE OR REPLACE FUNCTION public.bump_user_data_version(p_user_id text, p_created_at timestamp without time zone)
+    RETURNS void
+    LANGUAGE sql
+    AS $function$
+        -- Every change bumps version. history_version only moves for orders created before
+        -- the current hour: every time bucket that has ended starts on an hour, so buckets
+        -- that are over only change through such orders (write-behind, backdated, archived)
+        INSERT INTO user_data_versions (user_id, version, updated_at, history_version)
+        VALUES (
+            p_user_id,
+            1,
+            NOW(),
+            CASE WHEN p_created_at < date_trunc('hour', clock_timestamp()::TIMESTAMP) THEN 1 ELSE 0 END
+        )
+        ON CONFLICT (user_id) DO UPDATE
+        SET version = user_data_versions.version + 1,
+            updated_at = NOW(),
+            history_version = user_data_versions.history_version + EXCLUDED.history_version;
+    $function$
+    ;
+
+    """,
+    
+    "get_user_data_version": """
+    DROP FUNCTION IF EXISTS public.get_user_data_version(text);
+    CREATE OR REPLACE FUNCTION public.get_user_data_version(p_user_id text)
+    RETURNS TABLE(version bigint, updated_at timestamp with time zone, history_version bigint, checked_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- One row even before the user's first order. updated_at is written with NOW() on the
+        -- session clock and returned with its offset; checked_at is the time on that clock,
+        -- the one orders.created_at is written with
+        SELECT
+            COALESCE(v.version, 0)::BIGINT,
+            v.updated_at AT TIME ZONE current_setting('TimeZone'),
+            COALESCE(v.history_version, 0)::BIGINT,
+            LOCALTIMESTAMP::TIMESTAMP
+        FROM
+            (SELECT p_user_id AS user_id) u
+        LEFT JOIN
+            user_data_versions v ON v.user_id = u.user_id;
+    $function$
+    ;
+
+    """,
+    
     "create_or_get_product": """
     -- DROP FUNCTION public.create_or_get_product(varchar, numeric)
     CREATE OR REPLACE FUNCTION public.create_or_get_product(p_name character varying, p_price numeric)
@@ -206,9 +284,49 @@ STORED_PROCEDURES = {
     ;
     """,
     
+    "get_product_watermark": """
+    -- DROP FUNCTION public.get_product_watermark();
+    CREATE OR REPLACE FUNCTION public.get_product_watermark()
+    RETURNS bigint
+    LANGUAGE sql
+    VOLATILE
+    AS $function$
+        -- Oldest transaction still running: any product not committed yet has a
+        -- created_xid at or above it, however long its transaction takes
+        SELECT pg_snapshot_xmin(pg_current_snapshot())::text::BIGINT;
+    $function$
+    ;
+
+    """,
+    
+    "get_products_since": """
+    -- The watermark was a created_at timestamp
+    DROP FUNCTION IF EXISTS public.get_products_since(timestamp);
+    CREATE OR REPLACE FUNCTION public.get_products_since(p_since bigint)
+    RETURNS TABLE(id character varying, name character varying, price numeric)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- Every product when p_since is NULL, else those created by transactions from
+        -- the get_product_watermark() taken before the last read on (ix_products_created_xid)
+        SELECT
+            p.id,
+            p.name,
+            p.price
+        FROM
+            products p
+        WHERE
+            p_since IS NULL
+            OR p.created_xid >= p_since;
+    $function$
+    ;
+
+    """,
+    
     "add_product_to_order": """
-    -- DROP FUNCTION public.add_product_to_order(uuid, uuid, int4, numeric);
-    CREATE OR REPLACE FUNCTION public.add_product_to_order(p_order_id uuid, p_product_id uuid, p_quantity integer, p_unit_price numeric)
+    -- Looked the order's created_at up for every line, without the partition key
+    DROP FUNCTION IF EXISTS public.add_product_to_order(uuid, uuid, int4, numeric);
+    CREATE OR REPLACE FUNCTION public.add_product_to_order(p_order_id uuid, p_product_id uuid, p_quantity integer, p_unit_price numeric, p_order_created_at timestamp without time zone)
     RETURNS uuid
     LANGUAGE plpgsql
     AS $function$
@@ -218,6 +336,8 @@ STORED_PROCEDURES = {
             -- Generate a new UUID for the order product relationship
             new_order_product_id := gen_random_uuid();
             
+            -- Order lines share the order timestamp, which is their partition key; the
+            -- foreign key on (order_id, created_at) rejects a line that does not match
             -- Cast UUIDs to VARCHAR for insertion
             INSERT INTO order_products (id, order_id, product_id, quantity, unit_price, created_at)
             VALUES (
@@ -226,7 +346,7 @@ STORED_PROCEDURES = {
                 p_product_id::TEXT, 
                 p_quantity, 
                 p_unit_price,
-                CURRENT_TIMESTAMP
+                p_order_created_at
             )
             RETURNING id::UUID INTO new_order_product_id;
             
@@ -244,6 +364,7 @@ STORED_PROCEDURES = {
     AS $function$
     DECLARE
         total NUMERIC;
+        order_row RECORD;
     BEGIN
         -- Cast UUID to VARCHAR for the first comparison
         SELECT COALESCE(SUM(quantity * unit_price), 0)
@@ -251,21 +372,108 @@ STORED_PROCEDURES = {
         FROM order_products
         WHERE order_id = p_order_id::VARCHAR;
         
+        SELECT o.user_id, o.created_at, o.total_price
+        INTO order_row
+        FROM orders o
+        WHERE o.id = p_order_id::VARCHAR;
+        
         -- Cast UUID to VARCHAR for the second comparison
         UPDATE orders
         SET total_price = total
         WHERE id = p_order_id::VARCHAR;
         
+        -- Only the change is added, so recomputing a total never counts it twice
+        IF FOUND AND total <> order_row.total_price THEN
+            UPDATE user_order_stats
+            SET revenue = revenue + (total - order_row.total_price)
+            WHERE user_id = order_row.user_id
+                AND day = order_row.created_at::DATE;
+            
+            -- A new order was counted by create_order_with_id already
+            IF order_row.created_at < date_trunc('hour', clock_timestamp()::TIMESTAMP) THEN
+                PERFORM bump_user_data_version(order_row.user_id, order_row.created_at);
+            END IF;
+        END IF;
+        
         RETURN total;
     END;
     $function$;
     """,
     
+    "get_user_order_summary": """
+    DROP FUNCTION IF EXISTS public.get_user_order_summary(text, date, date);
+    CREATE OR REPLACE FUNCTION public.get_user_order_summary(p_user_id text, p_start_day date DEFAULT NULL::date, p_end_day date DEFAULT NULL::date)
+    RETURNS TABLE(today date, today_orders bigint, today_revenue double precision, month_orders bigint, month_revenue double precision, total_orders bigint, total_revenue double precision, range_orders bigint, range_revenue double precision, archived_orders bigint)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- One pass over the user's daily counters. Days follow the server clock, like
+        -- orders.created_at; the range is open where a bound is NULL. Counts include
+        -- archived orders; archived_orders says how many of them left the orders table
+        SELECT
+            CURRENT_DATE,
+            COALESCE(SUM(s.order_count) FILTER (WHERE s.day = CURRENT_DATE), 0)::BIGINT,
+            COALESCE(SUM(s.revenue) FILTER (WHERE s.day = CURRENT_DATE), 0)::FLOAT8,
+            COALESCE(SUM(s.order_count) FILTER (WHERE s.day >= date_trunc('month', CURRENT_DATE)), 0)::BIGINT,
+            COALESCE(SUM(s.revenue) FILTER (WHERE s.day >= date_trunc('month', CURRENT_DATE)), 0)::FLOAT8,
+            COALESCE(SUM(s.order_count), 0)::BIGINT,
+            COALESCE(SUM(s.revenue), 0)::FLOAT8,
+            COALESCE(SUM(s.order_count) FILTER (
+                WHERE s.day >= COALESCE(p_start_day, '-infinity'::DATE) AND s.day <= COALESCE(p_end_day, 'infinity'::DATE)
+            ), 0)::BIGINT,
+            COALESCE(SUM(s.revenue) FILTER (
+                WHERE s.day >= COALESCE(p_start_day, '-infinity'::DATE) AND s.day <= COALESCE(p_end_day, 'infinity'::DATE)
+            ), 0)::FLOAT8,
+            COALESCE(SUM(s.archived_count), 0)::BIGINT
+        FROM
+            user_order_stats s
+        WHERE
+            s.user_id = p_user_id;
+    $function$
+    ;
+
+    """,
+    
+    "rebuild_user_order_stats": """
+    -- DROP FUNCTION public.rebuild_user_order_stats(date, date);
+    CREATE OR REPLACE FUNCTION public.rebuild_user_order_stats(p_start_day date, p_end_day date)
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        -- Exact counters from orders, e.g. for orders loaded without the order procedures
+        DELETE FROM user_order_stats
+        WHERE day >= p_start_day
+            AND day <= p_end_day;
+        
+        WITH all_orders AS (
+            SELECT o.user_id, o.created_at, o.total_price, 0 AS archived
+            FROM orders o
+            WHERE o.created_at >= p_start_day
+                AND o.created_at < p_end_day + 1
+            UNION ALL
+            SELECT a.user_id, a.created_at, a.total_price, 1
+            FROM orders_archive a
+            WHERE a.created_at >= p_start_day
+                AND a.created_at < p_end_day + 1
+        ), inserted AS (
+            INSERT INTO user_order_stats (user_id, day, order_count, revenue, archived_count)
+            SELECT user_id, created_at::DATE, COUNT(*), SUM(total_price), SUM(archived)
+            FROM all_orders
+            GROUP BY user_id, created_at::DATE
+            RETURNING 1
+        )
+        SELECT COUNT(*)::INTEGER FROM inserted;
+    $function$
+    ;
+
+    """,
+    
     "get_order_details": """
-    -- DROP FUNCTION public.get_order_details(uuid);
+    -- Money is stored as NUMERIC(12,2) and handed to the driver as float8
+    DROP FUNCTION IF EXISTS public.get_order_details(uuid);
 
     CREATE OR REPLACE FUNCTION public.get_order_details(p_order_id uuid)
-    RETURNS TABLE(id uuid, user_id uuid, customer_name character varying, total_price numeric, created_at timestamp without time zone, product_id uuid, product_name character varying, quantity integer, unit_price numeric)
+    RETURNS TABLE(id uuid, user_id uuid, customer_name character varying, total_price double precision, created_at timestamp without time zone, product_id uuid, product_name character varying, quantity integer, unit_price double precision)
     LANGUAGE plpgsql
     AS $function$
     BEGIN
@@ -274,12 +482,12 @@ STORED_PROCEDURES = {
             o.id::UUID,
             o.user_id::UUID,
             o.customer_name,
-            o.total_price::NUMERIC,
+            o.total_price::FLOAT8,
             o.created_at,
             p.id::UUID AS product_id,
             p.name AS product_name,
             op.quantity,
-            op.unit_price::NUMERIC
+            op.unit_price::FLOAT8
         FROM 
             orders o
         JOIN 
@@ -295,123 +503,963 @@ STORED_PROCEDURES = {
     """,
     
     "get_order_byId": """
-    -- DROP FUNCTION public.get_order_byid(uuid, uuid);
+    DROP FUNCTION IF EXISTS public.get_order_byid(uuid, uuid);
 
     CREATE OR REPLACE FUNCTION public.get_order_byid(p_order_id uuid, p_user_id uuid)
-    RETURNS TABLE(id character varying, user_id character varying, customer_name character varying, total_price numeric, created_at timestamp without time zone)
-    LANGUAGE plpgsql
+    RETURNS TABLE(id character varying, user_id character varying, customer_name character varying, total_price double precision, created_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
     AS $function$
-        BEGIN
-            RETURN QUERY
-            SELECT
-                o.id::VARCHAR(36),
-                o.user_id::VARCHAR(36),
-                o.customer_name::VARCHAR(50),
-                o.total_price::NUMERIC(10,2),
-                o.created_at
-            FROM
-                orders o
-            WHERE
-                o.id = p_order_id::VARCHAR
-                AND o.user_id = p_user_id::VARCHAR;
-        END;
+        -- Plain SQL so the planner can inline the query into the caller
+        SELECT
+            o.id::VARCHAR(36),
+            o.user_id::VARCHAR(36),
+            o.customer_name::VARCHAR(50),
+            o.total_price::FLOAT8,
+            o.created_at
+        FROM
+            orders o
+        WHERE
+            o.id = p_order_id::VARCHAR
+            AND o.user_id = p_user_id::VARCHAR;
         $function$
     ;
 
     """,
     
+    "get_archived_order": """
+    -- DROP FUNCTION public.get_archived_order(text, text);
+    CREATE OR REPLACE FUNCTION public.get_archived_order(p_order_id text, p_user_id text)
+    RETURNS TABLE(id character varying, user_id character varying, customer_name character varying, total_price double precision, created_at timestamp without time zone, products jsonb)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- An order moved to orders_archive, with its lines; a primary key lookup
+        SELECT
+            a.id,
+            a.user_id,
+            a.customer_name,
+            a.total_price::FLOAT8,
+            a.created_at,
+            a.products
+        FROM
+            orders_archive a
+        WHERE
+            a.id = p_order_id
+            AND a.user_id = p_user_id;
+    $function$
+    ;
+
+    """,
+    
     "get_user_orders": """
-    -- DROP FUNCTION public.get_user_orders(uuid, varchar, timestamp, timestamp);
+    DROP FUNCTION IF EXISTS public.get_user_orders(uuid, varchar, timestamp, timestamp);
 
     CREATE OR REPLACE FUNCTION public.get_user_orders(p_user_id uuid, p_customer_name character varying DEFAULT NULL::character varying, p_start_date timestamp without time zone DEFAULT NULL::timestamp without time zone, p_end_date timestamp without time zone DEFAULT NULL::timestamp without time zone)
-    RETURNS TABLE(id character varying, user_id character varying, customer_name character varying, total_price numeric, created_at timestamp without time zone)
-    LANGUAGE plpgsql
+    RETURNS TABLE(id character varying, user_id character varying, customer_name character varying, total_price double precision, created_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
     AS $function$
-    BEGIN
-        -- Return orders without pagination
-        RETURN QUERY
+        -- Return orders without pagination; plain SQL so the query is inlined
+        -- and served by ix_orders_user_id_created_at
         SELECT
             o.id::VARCHAR(36),
             o.user_id::VARCHAR(36),
             o.customer_name::VARCHAR(50),
-            o.total_price::NUMERIC(10,2),
+            o.total_price::FLOAT8,
             o.created_at
         FROM
             orders o
         WHERE
             o.user_id = p_user_id::VARCHAR
             AND (p_customer_name IS NULL OR o.customer_name ILIKE '%' || p_customer_name || '%')
-            AND (p_start_date IS NULL OR o.created_at >= p_start_date)
-            AND (p_end_date IS NULL OR o.created_at <= p_end_date)
+            -- Open bounds become infinite so partition pruning still applies
+            AND o.created_at >= COALESCE(p_start_date, '-infinity'::TIMESTAMP)
+            AND o.created_at <= COALESCE(p_end_date, 'infinity'::TIMESTAMP)
         ORDER BY
             o.created_at DESC;
-    END;
     $function$
     ;
 
     """,
     
     "get_order_products_by_ids": """
-    -- DROP FUNCTION public.get_order_products_by_ids(text);
+    DROP FUNCTION IF EXISTS public.get_order_products_by_ids(text);
     CREATE OR REPLACE FUNCTION public.get_order_products_by_ids(p_order_ids text)
-    RETURNS TABLE(order_id character varying, product_id character varying, product_name character varying, quantity integer, unit_price numeric)
-    LANGUAGE plpgsql
+    RETURNS TABLE(order_id character varying, product_id character varying, product_name character varying, quantity integer, unit_price double precision)
+    LANGUAGE sql
+    STABLE
     AS $function$
-        BEGIN
-            RETURN QUERY
-            SELECT
-                op.order_id,
-                p.id AS product_id,
-                p.name AS product_name,
-                op.quantity,
-                op.unit_price::NUMERIC(10,2)
-            FROM
-                order_products op
-            JOIN
-                products p ON op.product_id = p.id
-            WHERE
-                op.order_id IN (
-                    SELECT unnest(string_to_array(p_order_ids, ','))
-                )
-            ORDER BY
-                op.order_id, p.name;
-        END;
+        -- An array comparison lets ix_order_products_order_id answer the lookup directly
+        SELECT
+            op.order_id,
+            p.id AS product_id,
+            p.name AS product_name,
+            op.quantity,
+            op.unit_price::FLOAT8
+        FROM
+            order_products op
+        JOIN
+            products p ON op.product_id = p.id
+        WHERE
+            op.order_id = ANY (string_to_array(p_order_ids, ','))
+        ORDER BY
+            op.order_id, p.name;
         $function$
     ;
 
     """,
     
+    # Partition maintenance procedures
+    "ensure_monthly_partition": """
+    -- DROP FUNCTION public.ensure_monthly_partition(text, date);
+    CREATE OR REPLACE FUNCTION public.ensure_monthly_partition(p_parent text, p_month date)
+    RETURNS text
+    LANGUAGE plpgsql
+    AS $function$
+    DECLARE
+        v_start DATE := date_trunc('month', p_month)::DATE;
+        v_end DATE := (date_trunc('month', p_month) + INTERVAL '1 month')::DATE;
+        v_partition TEXT := p_parent || '_p' || to_char(p_month, 'YYYY_MM');
+        v_default TEXT := p_parent || '_default';
+        v_stray BIGINT;
+    BEGIN
+        IF p_parent NOT IN ('orders', 'order_products') THEN
+            RAISE EXCEPTION 'Table % is not partitioned by month', p_parent;
+        END IF;
+
+        -- Nothing to do when the partition already exists
+        IF to_regclass(v_partition) IS NOT NULL THEN
+            RETURN v_partition;
+        END IF;
+
+        -- Rows already routed to the default partition would block the new range
+        IF to_regclass(v_default) IS NOT NULL THEN
+            EXECUTE format(
+                'SELECT COUNT(*) FROM %I WHERE created_at >= $1 AND created_at < $2',
+                v_default
+            )
+            INTO v_stray
+            USING v_start, v_end;
+
+            IF v_stray > 0 THEN
+                RAISE EXCEPTION '% rows of % for % are in the default partition', v_stray, p_parent, to_char(v_start, 'YYYY-MM')
+                    USING HINT = 'Move those rows out of the default partition before creating the month';
+            END IF;
+        END IF;
+
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+            v_partition, p_parent, v_start, v_end
+        );
+
+        RETURN v_partition;
+    END;
+    $function$
+    ;
+
+    """,
+    
     # Reporting procedures
+    "record_archived_orders": """
+    -- DROP FUNCTION public.record_archived_orders(text[], date[]);
+    CREATE OR REPLACE FUNCTION public.record_archived_orders(p_user_ids text[], p_days date[])
+    RETURNS void
+    LANGUAGE sql
+    AS $function$
+        -- One element per archived order. Archived orders leave the listings, so
+        -- their users' cached responses have to revalidate, history included
+        UPDATE user_order_stats s
+        SET archived_count = s.archived_count + a.archived
+        FROM (
+            SELECT u.user_id, u.day, COUNT(*) AS archived
+            FROM unnest(p_user_ids, p_days) AS u(user_id, day)
+            GROUP BY u.user_id, u.day
+        ) a
+        WHERE s.user_id = a.user_id
+            AND s.day = a.day;
+        
+        INSERT INTO user_data_versions (user_id, version, updated_at, history_version)
+        SELECT DISTINCT u.user_id, 1, NOW(), 1
+        FROM unnest(p_user_ids) AS u(user_id)
+        ON CONFLICT (user_id) DO UPDATE
+        SET version = user_data_versions.version + 1,
+            updated_at = NOW(),
+            history_version = user_data_versions.history_version + 1;
+    $function$
+    ;
+
+    """,
+    
+    "archive_orders": """
+    -- DROP FUNCTION public.archive_orders(timestamp, integer);
+    CREATE OR REPLACE FUNCTION public.archive_orders(p_before timestamp without time zone, p_batch_size integer)
+    RETURNS integer
+    LANGUAGE plpgsql
+    AS $function$
+    DECLARE
+        v_user_ids TEXT[];
+        v_days DATE[];
+    BEGIN
+        -- Moves one batch of the oldest orders created before p_before, found through
+        -- ix_orders_created_at. Each batch is its own transaction in the caller
+        WITH batch AS (
+            SELECT o.id, o.created_at
+            FROM orders o
+            WHERE o.created_at < p_before
+            ORDER BY o.created_at
+            LIMIT p_batch_size
+            FOR UPDATE
+        ), lines AS (
+            DELETE FROM order_products op
+            USING batch b
+            WHERE op.order_id = b.id
+                AND op.created_at = b.created_at
+                -- Repeated so only the old partitions are scanned
+                AND op.created_at < p_before
+            RETURNING op.order_id, op.product_id, op.quantity, op.unit_price
+        ), items AS MATERIALIZED (
+            -- Aggregated once; inlined, it was re-run for every archived order
+            SELECT
+                l.order_id,
+                jsonb_agg(
+                    jsonb_build_object('id', l.product_id, 'name', p.name, 'quantity', l.quantity, 'unit_price', l.unit_price)
+                    ORDER BY p.name
+                ) AS products
+            FROM lines l
+            JOIN products p ON p.id = l.product_id
+            GROUP BY l.order_id
+        ), moved AS (
+            DELETE FROM orders o
+            USING batch b
+            WHERE o.id = b.id
+                AND o.created_at = b.created_at
+                AND o.created_at < p_before
+            RETURNING o.id, o.user_id, o.customer_name, o.total_price, o.created_at
+        ), archived AS (
+            INSERT INTO orders_archive (id, user_id, customer_name, total_price, created_at, products, archived_at)
+            SELECT m.id, m.user_id, m.customer_name, m.total_price, m.created_at, COALESCE(i.products, '[]'::JSONB), NOW()
+            FROM moved m
+            LEFT JOIN items i ON i.order_id = m.id
+            -- Already archived by an earlier run: the copy in the archive is kept
+            ON CONFLICT (id) DO NOTHING
+            RETURNING user_id, created_at::DATE AS day
+        )
+        SELECT array_agg(a.user_id), array_agg(a.day)
+        INTO v_user_ids, v_days
+        FROM archived a;
+        
+        IF v_user_ids IS NULL THEN
+            RETURN 0;
+        END IF;
+        PERFORM record_archived_orders(v_user_ids, v_days);
+        RETURN cardinality(v_user_ids);
+    END;
+    $function$
+    ;
+
+    """,
+    
+    "get_archivable_months": """
+    -- DROP FUNCTION public.get_archivable_months(timestamp);
+    CREATE OR REPLACE FUNCTION public.get_archivable_months(p_before timestamp without time zone)
+    RETURNS SETOF date
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- Months whose orders partition ends on or before p_before
+        SELECT m.month
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        CROSS JOIN LATERAL (
+            SELECT to_date(substring(c.relname FROM '^orders_p([0-9]{4}_[0-9]{2})$'), 'YYYY_MM') AS month
+        ) m
+        WHERE i.inhparent = 'public.orders'::REGCLASS
+            AND m.month IS NOT NULL
+            AND m.month + INTERVAL '1 month' <= p_before
+        ORDER BY m.month;
+    $function$
+    ;
+
+    """,
+    
+    "archive_order_partition": """
+    -- DROP FUNCTION public.archive_order_partition(date);
+    CREATE OR REPLACE FUNCTION public.archive_order_partition(p_month date)
+    RETURNS integer
+    LANGUAGE plpgsql
+    AS $function$
+    DECLARE
+        v_orders TEXT := 'orders_p' || to_char(p_month, 'YYYY_MM');
+        v_lines TEXT := 'order_products_p' || to_char(p_month, 'YYYY_MM');
+        v_user_ids TEXT[];
+        v_days DATE[];
+    BEGIN
+        -- A whole month is copied to the archive and its partitions dropped, so the
+        -- hot tables are left with no dead rows to vacuum
+        IF to_regclass(v_orders) IS NULL THEN
+            RETURN 0;
+        END IF;
+        
+        -- Keep late writes out until the partitions are gone; reads go on while copying
+        IF to_regclass(v_lines) IS NOT NULL THEN
+            EXECUTE format('LOCK TABLE %I, %I IN SHARE MODE', v_lines, v_orders);
+        ELSE
+            EXECUTE format('LOCK TABLE %I IN SHARE MODE', v_orders);
+        END IF;
+        
+        EXECUTE format($sql$
+            WITH items AS (
+                SELECT
+                    op.order_id,
+                    jsonb_agg(
+                        jsonb_build_object('id', op.product_id, 'name', p.name, 'quantity', op.quantity, 'unit_price', op.unit_price)
+                        ORDER BY p.name
+                    ) AS products
+                FROM order_products op
+                JOIN products p ON p.id = op.product_id
+                WHERE op.created_at >= $1
+                    AND op.created_at < $2
+                GROUP BY op.order_id
+            ), archived AS (
+                INSERT INTO orders_archive (id, user_id, customer_name, total_price, created_at, products, archived_at)
+                SELECT o.id, o.user_id, o.customer_name, o.total_price, o.created_at, COALESCE(i.products, '[]'::JSONB), NOW()
+                FROM %I o
+                LEFT JOIN items i ON i.order_id = o.id
+                ON CONFLICT (id) DO NOTHING
+                RETURNING user_id, created_at::DATE AS day
+            )
+            SELECT array_agg(a.user_id), array_agg(a.day) FROM archived a
+        $sql$, v_orders)
+        INTO v_user_ids, v_days
+        USING p_month, (p_month + INTERVAL '1 month')::DATE;
+        
+        -- Detached first: the foreign key keeps a partition that is still attached from being dropped
+        IF to_regclass(v_lines) IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE order_products DETACH PARTITION %I', v_lines);
+            EXECUTE format('DROP TABLE %I', v_lines);
+        END IF;
+        EXECUTE format('ALTER TABLE orders DETACH PARTITION %I', v_orders);
+        EXECUTE format('DROP TABLE %I', v_orders);
+        
+        IF v_user_ids IS NULL THEN
+            RETURN 0;
+        END IF;
+        PERFORM record_archived_orders(v_user_ids, v_days);
+        RETURN cardinality(v_user_ids);
+    END;
+    $function$
+    ;
+
+    """,
+    
     "get_product_sales_report": """
     -- DROP FUNCTION public.get_product_sales_report(text, timestamp, timestamp);
 
     CREATE OR REPLACE FUNCTION public.get_product_sales_report(p_user_id text, p_start_date timestamp without time zone, p_end_date timestamp without time zone)
     RETURNS TABLE(product_name character varying, total_quantity bigint, total_price double precision)
-    LANGUAGE plpgsql
+    LANGUAGE sql
+    STABLE
     AS $function$
-    BEGIN
-        RETURN QUERY
+        -- Plain SQL so COUNT(*) and LIMIT/OFFSET from the caller are planned together with it.
+        -- Archived orders count too, through ix_orders_archive_user_id_created_at
         SELECT 
-            p.name AS product_name,
-            SUM(op.quantity)::BIGINT AS total_quantity,
-            SUM(op.quantity * op.unit_price)::FLOAT AS total_price
-        FROM 
-            products p
-        JOIN 
-            order_products op ON p.id = op.product_id
-        JOIN 
-            orders o ON op.order_id = o.id
-        WHERE 
-            o.user_id = p_user_id
-            AND o.created_at >= p_start_date
-            AND o.created_at <= p_end_date
+            l.name AS product_name,
+            SUM(l.quantity)::BIGINT AS total_quantity,
+            -- Sum and round in NUMERIC; only the final cent value becomes float8
+            ROUND(SUM(l.quantity * l.unit_price), 2)::FLOAT8 AS total_price
+        FROM (
+            SELECT p.name, op.quantity, op.unit_price
+            FROM 
+                products p
+            JOIN 
+                order_products op ON p.id = op.product_id
+            JOIN 
+                orders o ON op.order_id = o.id AND op.created_at = o.created_at
+            WHERE 
+                o.user_id = p_user_id
+                AND o.created_at >= p_start_date
+                AND o.created_at <= p_end_date
+                -- Repeat the range on order_products so both tables are pruned
+                AND op.created_at >= p_start_date
+                AND op.created_at <= p_end_date
+            UNION ALL
+            SELECT x.name, x.quantity, x.unit_price
+            FROM 
+                orders_archive a,
+                jsonb_to_recordset(a.products) AS x(name character varying, quantity integer, unit_price numeric)
+            WHERE 
+                a.user_id = p_user_id
+                AND a.created_at >= p_start_date
+                AND a.created_at <= p_end_date
+        ) l
+        GROUP BY 
+            l.name
+        ORDER BY 
+            total_quantity DESC;
+    $function$
+    ;
+
+    """,
+    
+    "get_team_product_sales_report": """
+    -- DROP FUNCTION public.get_team_product_sales_report(text[], timestamp, timestamp);
+    CREATE OR REPLACE FUNCTION public.get_team_product_sales_report(p_user_ids text[], p_start_date timestamp without time zone, p_end_date timestamp without time zone)
+    RETURNS TABLE(product_name character varying, total_quantity bigint, total_price double precision)
+    LANGUAGE sql
+    STABLE
+    PARALLEL SAFE
+    AS $function$
+        -- get_product_sales_report over several users (all of them when p_user_ids is NULL),
+        -- archived orders included. A single plain SELECT, so it is inlined into the caller's
+        -- query and can run as a parallel aggregate across the partitions
+        SELECT 
+            l.name AS product_name,
+            SUM(l.quantity)::BIGINT AS total_quantity,
+            ROUND(SUM(l.quantity * l.unit_price), 2)::FLOAT8 AS total_price
+        FROM (
+            SELECT p.name, op.quantity, op.unit_price
+            FROM 
+                products p
+            JOIN 
+                order_products op ON p.id = op.product_id
+            JOIN 
+                orders o ON op.order_id = o.id AND op.created_at = o.created_at
+            WHERE 
+                (p_user_ids IS NULL OR o.user_id = ANY (p_user_ids))
+                AND o.created_at >= p_start_date
+                AND o.created_at <= p_end_date
+                AND op.created_at >= p_start_date
+                AND op.created_at <= p_end_date
+            UNION ALL
+            SELECT x.name, x.quantity, x.unit_price
+            FROM 
+                orders_archive a,
+                jsonb_to_recordset(a.products) AS x(name character varying, quantity integer, unit_price numeric)
+            WHERE 
+                (p_user_ids IS NULL OR a.user_id = ANY (p_user_ids))
+                AND a.created_at >= p_start_date
+                AND a.created_at <= p_end_date
+        ) l
         GROUP BY 
-            p.name
+            l.name
         ORDER BY 
             total_quantity DESC;
+    $function$
+    ;
+
+    """,
+    
+    "get_revenue_report": """
+    -- Revenue was float8; the API adds cached buckets up, so they stay NUMERIC
+    DROP FUNCTION IF EXISTS public.get_revenue_report(text, timestamp, timestamp, text);
+    CREATE OR REPLACE FUNCTION public.get_revenue_report(p_user_id text, p_start_date timestamp without time zone, p_end_date timestamp without time zone, p_bucket text)
+    RETURNS TABLE(bucket_start timestamp without time zone, order_count bigint, revenue numeric)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- Index-only scans of ix_orders_user_id_created_at and ix_orders_archive_user_id_created_at,
+        -- which include total_price; buckets without orders are left out. p_bucket is 'hour', 'day' or 'week'
+        SELECT
+            date_trunc(p_bucket, o.created_at) AS bucket_start,
+            COUNT(*)::BIGINT AS order_count,
+            ROUND(COALESCE(SUM(o.total_price), 0), 2) AS revenue
+        FROM (
+            SELECT h.created_at, h.total_price
+            FROM orders h
+            WHERE h.user_id = p_user_id
+                AND h.created_at >= p_start_date
+                AND h.created_at <= p_end_date
+            UNION ALL
+            SELECT a.created_at, a.total_price
+            FROM orders_archive a
+            WHERE a.user_id = p_user_id
+                AND a.created_at >= p_start_date
+                AND a.created_at <= p_end_date
+        ) o
+        GROUP BY
+            1
+        ORDER BY
+            1;
+    $function$
+    ;
+
+    """,
+    
+    "record_product_sales": """
+    -- DROP FUNCTION public.record_product_sales(text, date, jsonb, integer);
+    CREATE OR REPLACE FUNCTION public.record_product_sales(p_user_id text, p_day date, p_items jsonb, p_capacity integer)
+    RETURNS void
+    LANGUAGE plpgsql
+    AS $function$
+        DECLARE
+            v_sketch JSONB;
+            v_untracked BIGINT;
+            v_entry JSONB;
+            v_min_name TEXT;
+            v_min JSONB;
+            item RECORD;
+        BEGIN
+            -- Space-saving update of the user's summary for the day; entries are [quantity, revenue, error].
+            -- The row lock serializes orders of the same user and day until commit
+            INSERT INTO product_sales_sketches (user_id, day, sketch, updated_at)
+            VALUES (p_user_id, p_day, '{}', NOW())
+            ON CONFLICT (user_id, day) DO NOTHING;
+            
+            SELECT s.sketch, s.untracked_quantity INTO v_sketch, v_untracked
+            FROM product_sales_sketches s
+            WHERE s.user_id = p_user_id
+                AND s.day = p_day
+            FOR UPDATE;
+            
+            FOR item IN
+                SELECT x.name, SUM(x.quantity)::BIGINT AS quantity, SUM(x.quantity * x.unit_price) AS revenue
+                FROM jsonb_to_recordset(p_items) AS x(name text, quantity integer, unit_price numeric)
+                GROUP BY x.name
+            LOOP
+                v_entry := v_sketch -> item.name;
+                IF v_entry IS NOT NULL THEN
+                    v_sketch := jsonb_set(v_sketch, ARRAY[item.name], jsonb_build_array(
+                        (v_entry ->> 0)::BIGINT + item.quantity,
+                        (v_entry ->> 1)::NUMERIC + item.revenue,
+                        (v_entry ->> 2)::BIGINT
+                    ));
+                ELSIF (SELECT COUNT(*) FROM jsonb_object_keys(v_sketch)) < p_capacity THEN
+                    v_sketch := v_sketch || jsonb_build_object(item.name, jsonb_build_array(item.quantity, item.revenue, 0));
+                ELSE
+                    -- Full: the product with the smallest count hands its slot and count to the new one.
+                    -- Revenue is not handed on, so it only counts sales made while holding a slot
+                    SELECT e.key, e.value INTO v_min_name, v_min
+                    FROM jsonb_each(v_sketch) e
+                    ORDER BY (e.value ->> 0)::BIGINT, e.key
+                    LIMIT 1;
+                    
+                    v_sketch := (v_sketch - v_min_name) || jsonb_build_object(item.name, jsonb_build_array(
+                        (v_min ->> 0)::BIGINT + item.quantity,
+                        item.revenue,
+                        (v_min ->> 0)::BIGINT
+                    ));
+                    -- No product left out of the summary sold more than the smallest count evicted so far
+                    v_untracked := GREATEST(v_untracked, (v_min ->> 0)::BIGINT);
+                END IF;
+            END LOOP;
+            
+            UPDATE product_sales_sketches
+            SET sketch = v_sketch,
+                untracked_quantity = v_untracked,
+                updated_at = NOW()
+            WHERE user_id = p_user_id
+                AND day = p_day;
+        END;
+        $function$
+    ;
+
+    """,
+    
+    "get_top_products_approx": """
+    -- DROP FUNCTION public.get_top_products_approx(text, date, date, integer);
+    CREATE OR REPLACE FUNCTION public.get_top_products_approx(p_user_id text, p_start_day date, p_end_day date, p_top integer)
+    RETURNS TABLE(product_name character varying, total_quantity bigint, total_price double precision, max_error bigint)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- Merges one small summary per day instead of aggregating order_products. On a day
+        -- whose summary lacks a product, that product sold at most the day's untracked_quantity,
+        -- which is counted in both its quantity and its error: total_quantity is an upper bound
+        -- and the product sold at least total_quantity - max_error. total_price only holds
+        -- sales recorded while the product had a slot, so it is exact when max_error is 0
+        WITH days AS (
+            SELECT s.sketch, s.untracked_quantity
+            FROM product_sales_sketches s
+            WHERE s.user_id = p_user_id
+                AND s.day >= p_start_day
+                AND s.day <= p_end_day
+        ), untracked AS (
+            SELECT COALESCE(SUM(d.untracked_quantity), 0) AS quantity
+            FROM days d
+        )
+        SELECT
+            e.key::VARCHAR AS product_name,
+            (SUM((e.value ->> 0)::BIGINT) + MIN(u.quantity) - SUM(d.untracked_quantity))::BIGINT AS total_quantity,
+            ROUND(SUM((e.value ->> 1)::NUMERIC), 2)::FLOAT8 AS total_price,
+            (SUM((e.value ->> 2)::BIGINT) + MIN(u.quantity) - SUM(d.untracked_quantity))::BIGINT AS max_error
+        FROM
+            days d
+            CROSS JOIN LATERAL jsonb_each(d.sketch) e
+            CROSS JOIN untracked u
+        GROUP BY
+            e.key
+        ORDER BY
+            total_quantity DESC,
+            product_name
+        LIMIT p_top;
+    $function$
+    ;
+
+    """,
+    
+    "rebuild_product_sales_sketches": """
+    -- DROP FUNCTION public.rebuild_product_sales_sketches(date, date, integer);
+    CREATE OR REPLACE FUNCTION public.rebuild_product_sales_sketches(p_start_day date, p_end_day date, p_capacity integer)
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        -- Exact summaries from order_products and orders_archive: each day keeps its p_capacity
+        -- best sellers with no error, and untracked_quantity is the most any product left out sold
+        DELETE FROM product_sales_sketches
+        WHERE day >= p_start_day
+            AND day <= p_end_day;
+        
+        WITH lines AS (
+            SELECT o.user_id, o.created_at, p.name, op.quantity, op.unit_price
+            FROM
+                orders o
+            JOIN
+                order_products op ON op.order_id = o.id AND op.created_at = o.created_at
+            JOIN
+                products p ON p.id = op.product_id
+            WHERE
+                o.created_at >= p_start_day
+                AND o.created_at < p_end_day + 1
+                AND op.created_at >= p_start_day
+                AND op.created_at < p_end_day + 1
+            UNION ALL
+            SELECT a.user_id, a.created_at, x.name, x.quantity, x.unit_price
+            FROM
+                orders_archive a,
+                jsonb_to_recordset(a.products) AS x(name character varying, quantity integer, unit_price numeric)
+            WHERE
+                a.created_at >= p_start_day
+                AND a.created_at < p_end_day + 1
+        ), sales AS (
+            SELECT
+                l.user_id,
+                l.created_at::DATE AS day,
+                l.name,
+                SUM(l.quantity)::BIGINT AS quantity,
+                SUM(l.quantity * l.unit_price) AS revenue,
+                ROW_NUMBER() OVER (
+                    PARTITION BY l.user_id, l.created_at::DATE
+                    ORDER BY SUM(l.quantity) DESC, l.name
+                ) AS rank
+            FROM
+                lines l
+            GROUP BY
+                l.user_id, l.created_at::DATE, l.name
+        ), inserted AS (
+            INSERT INTO product_sales_sketches (user_id, day, sketch, untracked_quantity, updated_at)
+            SELECT
+                user_id,
+                day,
+                jsonb_object_agg(name, jsonb_build_array(quantity, revenue, 0)) FILTER (WHERE rank <= p_capacity),
+                COALESCE(MAX(quantity) FILTER (WHERE rank > p_capacity), 0),
+                NOW()
+            FROM sales
+            GROUP BY user_id, day
+            RETURNING 1
+        )
+        SELECT COUNT(*)::INTEGER FROM inserted;
+    $function$
+    ;
+
+    """,
+    
+    # Idempotency-Key procedures
+    "claim_idempotency_key": """
+    -- DROP FUNCTION public.claim_idempotency_key(text, text, text, integer);
+    CREATE OR REPLACE FUNCTION public.claim_idempotency_key(p_user_id text, p_key text, p_request_hash text, p_ttl_seconds integer)
+    RETURNS TABLE(claimed boolean, stored_request_hash character varying, stored_status_code integer, stored_response_body text)
+    LANGUAGE plpgsql
+    AS $function$
+    BEGIN
+        -- A concurrent request holding the same key makes this wait until it commits
+        -- (the key is then taken) or rolls back (the key is free again)
+        INSERT INTO idempotency_keys (user_id, key, request_hash, expires_at)
+        VALUES (p_user_id, p_key, p_request_hash, NOW() + make_interval(secs => p_ttl_seconds))
+        ON CONFLICT (user_id, key) DO UPDATE
+        SET request_hash = EXCLUDED.request_hash,
+            status_code = NULL,
+            response_body = NULL,
+            created_at = NOW(),
+            expires_at = EXCLUDED.expires_at
+        -- Expired keys not yet pruned can be reused
+        WHERE idempotency_keys.expires_at <= NOW();
+
+        IF FOUND THEN
+            RETURN QUERY SELECT TRUE, p_request_hash::VARCHAR, NULL::INTEGER, NULL::TEXT;
+            RETURN;
+        END IF;
+
+        RETURN QUERY
+        SELECT
+            FALSE,
+            k.request_hash,
+            k.status_code,
+            k.response_body
+        FROM
+            idempotency_keys k
+        WHERE
+            k.user_id = p_user_id
+            AND k.key = p_key;
     END;
     $function$
     ;
 
+    """,
+    
+    "complete_idempotency_key": """
+    -- DROP FUNCTION public.complete_idempotency_key(text, text, integer, text);
+    CREATE OR REPLACE FUNCTION public.complete_idempotency_key(p_user_id text, p_key text, p_status_code integer, p_response_body text)
+    RETURNS void
+    LANGUAGE sql
+    AS $function$
+        UPDATE idempotency_keys
+        SET status_code = p_status_code,
+            response_body = p_response_body
+        WHERE user_id = p_user_id
+            AND key = p_key;
+    $function$
+    ;
+
+    """,
+    
+    "prune_idempotency_keys": """
+    -- DROP FUNCTION public.prune_idempotency_keys(integer);
+    CREATE OR REPLACE FUNCTION public.prune_idempotency_keys(p_batch_size integer)
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        -- One batch of the oldest expired keys, found through ix_idempotency_keys_expires_at
+        WITH expired AS (
+            SELECT user_id, key
+            FROM idempotency_keys
+            WHERE expires_at <= NOW()
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        ), deleted AS (
+            DELETE FROM idempotency_keys k
+            USING expired e
+            WHERE k.user_id = e.user_id
+                AND k.key = e.key
+            RETURNING 1
+        )
+        SELECT COUNT(*)::INTEGER FROM deleted;
+    $function$
+    ;
+
+    """,
+    
+    # Write-behind order queue procedures
+    "enqueue_order": """
+    -- DROP FUNCTION public.enqueue_order(text, jsonb);
+    CREATE OR REPLACE FUNCTION public.enqueue_order(p_user_id text, p_payload jsonb)
+    RETURNS TABLE(id character varying, created_at timestamp without time zone)
+    LANGUAGE sql
+    AS $function$
+        -- No row comes back for an unknown user
+        INSERT INTO order_queue (id, user_id, payload)
+        SELECT gen_random_uuid()::VARCHAR, u.id, p_payload
+        FROM users u
+        WHERE u.id = p_user_id
+        RETURNING order_queue.id, order_queue.created_at;
+    $function$
+    ;
+
+    """,
+    
+    "take_queued_orders": """
+    -- DROP FUNCTION public.take_queued_orders(integer);
+    CREATE OR REPLACE FUNCTION public.take_queued_orders(p_batch_size integer)
+    RETURNS TABLE(id character varying, user_id character varying, payload jsonb, created_at timestamp without time zone)
+    LANGUAGE sql
+    AS $function$
+        -- Locked until the caller commits; concurrent drainers skip to the next rows
+        SELECT q.id, q.user_id, q.payload, q.created_at
+        FROM order_queue q
+        WHERE q.status = 'pending'
+        ORDER BY q.created_at
+        LIMIT p_batch_size
+        FOR UPDATE SKIP LOCKED;
+    $function$
+    ;
+
+    """,
+    
+    "finish_queued_orders": """
+    -- DROP FUNCTION public.finish_queued_orders(text[]);
+    CREATE OR REPLACE FUNCTION public.finish_queued_orders(p_order_ids text[])
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        WITH deleted AS (
+            DELETE FROM order_queue
+            WHERE id = ANY (p_order_ids)
+            RETURNING 1
+        )
+        SELECT COUNT(*)::INTEGER FROM deleted;
+    $function$
+    ;
+
+    """,
+    
+    "fail_queued_order": """
+    -- DROP FUNCTION public.fail_queued_order(text, text);
+    CREATE OR REPLACE FUNCTION public.fail_queued_order(p_order_id text, p_error text)
+    RETURNS void
+    LANGUAGE sql
+    AS $function$
+        UPDATE order_queue
+        SET status = 'failed',
+            error = p_error
+        WHERE id = p_order_id;
+    $function$
+    ;
+
+    """,
+    
+    "get_order_status": """
+    -- DROP FUNCTION public.get_order_status(text, text);
+    CREATE OR REPLACE FUNCTION public.get_order_status(p_order_id text, p_user_id text)
+    RETURNS TABLE(status character varying, error text, created_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- One snapshot: the drain worker deletes the queue row in the transaction that writes the order
+        SELECT q.status, q.error, q.created_at
+        FROM order_queue q
+        WHERE q.id = p_order_id
+            AND q.user_id = p_user_id
+        UNION ALL
+        SELECT 'completed'::VARCHAR, NULL::TEXT, o.created_at
+        FROM orders o
+        WHERE o.id = p_order_id
+            AND o.user_id = p_user_id
+        LIMIT 1;
+    $function$
+    ;
+
+    """,
+    
+    # Token revocation procedures
+    "revoke_user_tokens": """
+    -- DROP FUNCTION public.revoke_user_tokens(text);
+    CREATE OR REPLACE FUNCTION public.revoke_user_tokens(p_user_id text)
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        -- Every token issued before this carries a lower version and stops being accepted
+        INSERT INTO user_token_versions (user_id, version, updated_at)
+        VALUES (p_user_id, 1, NOW())
+        ON CONFLICT (user_id) DO UPDATE
+        SET version = user_token_versions.version + 1,
+            updated_at = NOW()
+        RETURNING version;
+    $function$
+    ;
+
+    """,
+    
+    "get_token_versions_since": """
+    -- DROP FUNCTION public.get_token_versions_since(timestamp);
+    CREATE OR REPLACE FUNCTION public.get_token_versions_since(p_since timestamp without time zone)
+    RETURNS TABLE(user_id character varying, version integer, updated_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        SELECT
+            v.user_id,
+            v.version,
+            v.updated_at
+        FROM
+            user_token_versions v
+        WHERE
+            v.updated_at > p_since;
+    $function$
+    ;
+
+    """,
+    
+    "revoke_token": """
+    -- DROP FUNCTION public.revoke_token(text, text, timestamp);
+    CREATE OR REPLACE FUNCTION public.revoke_token(p_jti text, p_user_id text, p_expires_at timestamp without time zone)
+    RETURNS boolean
+    LANGUAGE sql
+    AS $function$
+        -- False when the token was already revoked
+        WITH inserted AS (
+            INSERT INTO revoked_tokens (jti, user_id, expires_at, revoked_at)
+            VALUES (p_jti, p_user_id, p_expires_at, NOW())
+            ON CONFLICT (jti) DO NOTHING
+            RETURNING 1
+        )
+        SELECT EXISTS (SELECT 1 FROM inserted);
+    $function$
+    ;
+
+    """,
+    
+    "is_token_revoked": """
+    -- DROP FUNCTION public.is_token_revoked(text);
+    CREATE OR REPLACE FUNCTION public.is_token_revoked(p_jti text)
+    RETURNS boolean
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        SELECT EXISTS (
+            SELECT 1
+            FROM revoked_tokens
+            WHERE jti = p_jti
+        );
+    $function$
+    ;
+
+    """,
+    
+    "get_revoked_tokens_since": """
+    -- DROP FUNCTION public.get_revoked_tokens_since(timestamp);
+    CREATE OR REPLACE FUNCTION public.get_revoked_tokens_since(p_since timestamp without time zone)
+    RETURNS TABLE(jti character varying, revoked_at timestamp without time zone)
+    LANGUAGE sql
+    STABLE
+    AS $function$
+        -- Tokens that have expired are rejected by their exp claim already
+        SELECT
+            r.jti,
+            r.revoked_at
+        FROM
+            revoked_tokens r
+        WHERE
+            r.revoked_at > p_since
+            AND r.expires_at > NOW();
+    $function$
+    ;
+
+    """,
+    
+    "prune_revoked_tokens": """
+    -- DROP FUNCTION public.prune_revoked_tokens(integer);
+    CREATE OR REPLACE FUNCTION public.prune_revoked_tokens(p_batch_size integer)
+    RETURNS integer
+    LANGUAGE sql
+    AS $function$
+        -- One batch of the oldest expired tokens, found through ix_revoked_tokens_expires_at
+        WITH expired AS (
+            SELECT jti
+            FROM revoked_tokens
+            WHERE expires_at <= NOW()
+            ORDER BY expires_at
+            LIMIT p_batch_size
+            FOR UPDATE SKIP LOCKED
+        ), deleted AS (
+            DELETE FROM revoked_tokens r
+            USING expired e
+            WHERE r.jti = e.jti
+            RETURNING 1
+        )
+        SELECT COUNT(*)::INTEGER FROM deleted;
+    $function$
+    ;
+
     """
-}
\ No newline at end of file
+}
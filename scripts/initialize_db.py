@@ -9,7 +9,7 @@ import os
 import sys
 import subprocess
 from pathlib import Path
-import init_stored_procedures as STORED_PROCEDURES
+from init_stored_procedures import STORED_PROCEDURES
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+Partition maintenance for the monthly partitioned orders and order_products tables.
+
+Run `create` from cron ahead of each month so new orders never land in the
+default partition, and `detach` to move old months out of the hot tables.
+"""
+
+import sys
+import argparse
+from datetime import date
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+
+# Parents are listed in dependency order: order_products references orders
+PARTITIONED_TABLES = ['orders', 'order_products']
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Manage monthly order partitions')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create_parser = subparsers.add_parser('create', help='Create partitions for upcoming months')
+    create_parser.add_argument('--months-ahead', type=int, default=3, help='Number of future months to create')
+
+    detach_parser = subparsers.add_parser('detach', help='Detach partitions older than a number of months')
+    detach_parser.add_argument('--older-than', type=int, required=True, help='Age in months of the newest month to detach')
+    detach_parser.add_argument('--archive-schema', default='archive', help='Schema that receives detached partitions')
+    detach_parser.add_argument('--drop', action='store_true', help='Drop detached partitions instead of archiving them')
+
+    subparsers.add_parser('list', help='List attached partitions')
+
+    return parser.parse_args()
+
+
+def add_months(month, count):
+    """Return the first day of the month `count` months away from `month`."""
+    index = month.year * 12 + month.month - 1 + count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month():
+    today = date.today()
+    return date(today.year, today.month, 1)
+
+
+def list_partitions(connection, parent):
+    """Return (partition name, bound expression) pairs attached to a parent table."""
+    query = text("""
+    SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = :parent
+    ORDER BY c.relname
+    """)
+    return connection.execute(query, {"parent": parent}).fetchall()
+
+
+def create_partitions(months_ahead):
+    """Create the current month and the next `months_ahead` months for every parent."""
+    with db.engine.begin() as connection:
+        for offset in range(months_ahead + 1):
+            month = add_months(current_month(), offset)
+            for parent in PARTITIONED_TABLES:
+                query = text("SELECT ensure_monthly_partition(:parent, :month)")
+                name = connection.execute(query, {"parent": parent, "month": month}).scalar()
+                print(f"Partition ready: {name}")
+
+
+def detach_partitions(older_than, archive_schema, drop):
+    """Detach monthly partitions older than `older_than` months and archive or drop them."""
+    cutoff = add_months(current_month(), -older_than)
+
+    with db.engine.begin() as connection:
+        if not drop:
+            connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{archive_schema}"'))
+
+        months = set()
+        for parent in PARTITIONED_TABLES:
+            for name, _ in list_partitions(connection, parent):
+                suffix = name[len(parent) + 2:]
+                if not name.startswith(f"{parent}_p") or len(suffix) != 7:
+                    continue
+                month = date(int(suffix[:4]), int(suffix[5:]), 1)
+                if month < cutoff:
+                    months.add(month)
+
+        for month in sorted(months):
+            # Lines go first: their foreign key keeps the order partition attached
+            line_partition = f"order_products_p{month:%Y_%m}"
+            order_partition = f"orders_p{month:%Y_%m}"
+
+            connection.execute(text(f'ALTER TABLE order_products DETACH PARTITION "{line_partition}"'))
+            connection.execute(text(
+                f'ALTER TABLE "{line_partition}" DROP CONSTRAINT IF EXISTS order_products_order_id_fkey'
+            ))
+            connection.execute(text(f'ALTER TABLE orders DETACH PARTITION "{order_partition}"'))
+
+            for partition in (line_partition, order_partition):
+                if drop:
+                    connection.execute(text(f'DROP TABLE "{partition}"'))
+                    print(f"Dropped partition: {partition}")
+                else:
+                    connection.execute(text(f'ALTER TABLE "{partition}" SET SCHEMA "{archive_schema}"'))
+                    print(f"Archived partition: {archive_schema}.{partition}")
+
+        if not months:
+            print(f"No partitions older than {cutoff.isoformat()}")
+
+
+def print_partitions():
+    with db.engine.connect() as connection:
+        for parent in PARTITIONED_TABLES:
+            print(f"{parent}:")
+            for name, bound in list_partitions(connection, parent):
+                print(f"  {name} {bound}")
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        if args.command == 'create':
+            create_partitions(args.months_ahead)
+        elif args.command == 'detach':
+            detach_partitions(args.older_than, args.archive_schema, args.drop)
+        else:
+            print_partitions()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+"""
+Delete expired Idempotency-Key responses.
+
+Run from cron (e.g. hourly). Keys are deleted oldest first in batches, each
+in its own short transaction, so pruning never holds locks on the whole table.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app import create_app
+from app.extensions import db
+from app.utils.idempotency import prune_expired_keys
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Delete expired idempotency keys')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Keys deleted per transaction')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            deleted = prune_expired_keys(connection, args.batch_size)
+        print(f"Deleted {deleted} expired idempotency keys")
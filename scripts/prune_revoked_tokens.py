@@ -0,0 +1,36 @@
+#!/usr/bin/env python
+"""
+Delete blocklisted access tokens that have expired.
+
+Run from cron (e.g. daily). An expired token is rejected by its exp claim, so
+its blocklist row is no longer needed; rows are deleted in batches, each in
+its own short transaction.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app import create_app
+from app.extensions import db
+from app.utils.token_blocklist import prune_revoked_tokens
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Delete expired revoked tokens')
+    parser.add_argument('--batch-size', type=int, default=10000, help='Tokens deleted per transaction')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        with db.engine.connect() as connection:
+            deleted = prune_revoked_tokens(connection, args.batch_size)
+        print(f"Deleted {deleted} expired revoked tokens")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+Rebuild the per-user, per-day order counters (user_order_stats) from orders.
+
+The order procedures keep the counters up to date and the migration seeds them
+for existing orders; run this for orders loaded some other way, or to repair a
+range. Each day is rebuilt exactly, one week per transaction.
+
+    python scripts/rebuild_order_stats.py --start-date 2025-01-01
+"""
+
+import sys
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rebuild daily order counters for a range of days')
+    parser.add_argument('--start-date', type=date.fromisoformat, required=True, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=date.today(), help='Last day (YYYY-MM-DD), default today')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        rebuilt = 0
+        start = args.start_date
+        with db.engine.connect() as connection:
+            while start <= args.end_date:
+                end = min(start + timedelta(days=6), args.end_date)
+                with connection.begin():
+                    query = text("""
+                    SELECT rebuild_user_order_stats(:start_day, :end_day)
+                    """)
+                    rebuilt += connection.execute(query, {"start_day": start, "end_day": end}).scalar()
+                start = end + timedelta(days=1)
+        print(f"Rebuilt {rebuilt} daily order counters")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""
+Rebuild the per-user, per-day product sales summaries from order_products and
+orders_archive.
+
+New orders keep the summaries up to date, and migration 97520acdfeff built them
+for the days before it ran; run this after changing PRODUCT_SKETCH_CAPACITY or
+loading orders without the order procedures. Each day is rebuilt exactly, one
+week per transaction.
+
+    python scripts/rebuild_product_sketches.py --start-date 2025-01-01
+"""
+
+import sys
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from sqlalchemy import text
+from app import create_app
+from app.extensions import db
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Rebuild product sales summaries for a range of days')
+    parser.add_argument('--start-date', type=date.fromisoformat, required=True, help='First day (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=date.fromisoformat, default=date.today(), help='Last day (YYYY-MM-DD), default today')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        capacity = app.config['PRODUCT_SKETCH_CAPACITY']
+        rebuilt = 0
+        start = args.start_date
+        with db.engine.connect() as connection:
+            while start <= args.end_date:
+                end = min(start + timedelta(days=6), args.end_date)
+                with connection.begin():
+                    query = text("""
+                    SELECT rebuild_product_sales_sketches(:start_day, :end_day, :capacity)
+                    """)
+                    rebuilt += connection.execute(
+                        query, {"start_day": start, "end_day": end, "capacity": capacity}
+                    ).scalar()
+                start = end + timedelta(days=1)
+        print(f"Rebuilt {rebuilt} daily product summaries")
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+Revoke every access token issued to a user so far, or a single token.
+
+With --email or --user-id, bumps the user's token version; each worker picks
+the new version up within TOKEN_VERSION_REFRESH_SECONDS and rejects older
+tokens with 401. Logging in again issues a token with the new version.
+
+With --jti, adds that token id to the blocklist; workers reject it within
+TOKEN_BLOCKLIST_REFRESH_SECONDS.
+
+    python scripts/revoke_tokens.py --email jane@example.com
+    python scripts/revoke_tokens.py --jti 0b7c6f5e-5d1e-4a4f-9a62-3a1f2a6e8c11
+"""
+
+import sys
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from app import create_app
+from app.extensions import db
+from app.utils.token_blocklist import revoke_token
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Revoke a user's access tokens")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--email', help='Email of the user')
+    group.add_argument('--user-id', help='Id of the user')
+    group.add_argument('--jti', help='Id (jti claim) of a single access token')
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    app = create_app()
+
+    with app.app_context():
+        if args.jti:
+            # The token is unknown here, so keep it for as long as any token can live
+            expires_at = datetime.utcnow() + app.config['JWT_ACCESS_TOKEN_EXPIRES']
+            with db.engine.begin() as connection:
+                revoke_token(connection, args.jti, None, expires_at)
+            print(f"Revoked token {args.jti}")
+        else:
+            with db.engine.begin() as connection:
+                user_id = args.user_id
+                if args.email:
+                    query = text("""
+                    SELECT * FROM auth_login(:email)
+                    """)
+                    user_row = connection.execute(query, {"email": args.email}).fetchone()
+                    if not user_row:
+                        sys.exit(f"User not found: {args.email}")
+                    user_id = str(user_row.id)
+
+                query = text("""
+                SELECT revoke_user_tokens(:user_id)
+                """)
+                version = connection.execute(query, {"user_id": user_id}).scalar()
+            print(f"Revoked tokens of user {user_id}; token version is now {version}")
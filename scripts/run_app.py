@@ -12,7 +12,6 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from app import create_app
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Run the Order Management API')
@@ -22,12 +21,17 @@ def parse_args():
     parser.add_argument('--reload', action='store_true', help='Enable auto-reload')
     parser.add_argument('--workers', type=int, default=1, help='Number of worker processes (production only)')
     parser.add_argument('--production', action='store_true', help='Run in production mode with Gunicorn')
+    parser.add_argument('--worker-class', choices=['sync', 'gthread', 'gevent'], default='sync',
+                        help='Gunicorn worker class (production only)')
+    parser.add_argument('--worker-connections', type=int, default=500,
+                        help='Concurrent requests per gevent worker (production only)')
     
     return parser.parse_args()
 
 
 def run_development(args):
     """Run the app in development mode with Flask's built-in server."""
+    from app import create_app
     app = create_app()
     app.run(host=args.host, port=args.port, debug=args.debug, use_reloader=args.reload)
 
@@ -54,14 +58,23 @@ def run_production(args):
         def load(self):
             return self.application
 
+    if args.worker_class == 'gevent':
+        # Must happen before the app (and its locks, sockets and pools) is imported
+        from gevent import monkey
+        monkey.patch_all()
+        from app.utils.green import patch_psycopg2
+        patch_psycopg2()
+
     # Create the Flask app
+    from app import create_app
     app = create_app()
     
     # Gunicorn options
     options = {
         'bind': f"{args.host}:{args.port}",
         'workers': args.workers,
-        'worker_class': 'sync',
+        'worker_class': args.worker_class,
+        'worker_connections': args.worker_connections,
         'timeout': 120,
         'reload': args.reload,
         'accesslog': '-',
@@ -1,8 +1,13 @@
 import pytest
 from app import create_app
+from app.config import Config
 from app.extensions import db
 from app.models import User, Product, Order, OrderProduct
 import os
+import sys
+import uuid
+from pathlib import Path
+from sqlalchemy import text
 
 
 @pytest.fixture(scope='function')
@@ -23,6 +28,118 @@ def app():
         db.drop_all()
 
 
+@pytest.fixture(scope='function')
+def make_app(tmp_path):
+    """Factory for apps on a throwaway SQLite file with config applied before init"""
+    def _make_app(**overrides):
+        settings = {
+            'TESTING': True,
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+            'SQLALCHEMY_ENGINE_OPTIONS': {},
+            'JWT_SECRET_KEY': 'test-key',
+        }
+        settings.update(overrides)
+        test_app = create_app(type('TestConfig', (Config,), settings))
+        with test_app.app_context():
+            db.create_all()
+        return test_app
+    return _make_app
+
+
+class FakeEngine:
+    """Engine stand-in for the per-worker caches; connecting raises while `fail` is set.
+
+    Every query records its params in `calls`. fetchall() returns `rows`, or
+    `select(rows, params)` when given; scalar() returns `scalar(params)`.
+    """
+
+    def __init__(self, rows=(), select=None, scalar=None):
+        self.rows = list(rows)
+        self.calls = []
+        self.fail = False
+        self._select = select
+        self._scalar = scalar
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        if self.fail:
+            raise RuntimeError('database is down')
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.calls.append(params)
+        return self
+
+    def fetchall(self):
+        if self._select is None:
+            return self.rows
+        return self._select(self.rows, self.calls[-1])
+
+    def scalar(self):
+        return self._scalar(self.calls[-1])
+
+
+@pytest.fixture(scope='function')
+def fake_engine():
+    """The FakeEngine class, for tests of the periodically refreshed caches"""
+    return FakeEngine
+
+
+# Endpoint tests that need the stored procedures run against a migrated PostgreSQL database
+TEST_DATABASE_URI = os.environ.get('TEST_DATABASE_URI')
+
+
+@pytest.fixture(scope='function')
+def pg_app():
+    """App on TEST_DATABASE_URI with the stored procedures installed; skips when unset"""
+    if not TEST_DATABASE_URI:
+        pytest.skip('TEST_DATABASE_URI is not set to a migrated PostgreSQL database')
+    sys.path.append(str(Path(__file__).parent.parent / 'scripts'))
+    from init_stored_procedures import STORED_PROCEDURES
+
+    settings = {
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': TEST_DATABASE_URI,
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'JWT_SECRET_KEY': 'test-key',
+        'HTTP_CACHE_ENABLED': False,
+    }
+    test_app = create_app(type('PostgresTestConfig', (Config,), settings))
+    with test_app.app_context():
+        with db.engine.begin() as connection:
+            for sql in STORED_PROCEDURES.values():
+                connection.execute(text(sql))
+    yield test_app
+    with test_app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture(scope='function')
+def pg_user(pg_app):
+    """A user created through the API on pg_app, with auth headers; deleted with all its data afterwards"""
+    client = pg_app.test_client()
+    email = f"pgtest-{uuid.uuid4().hex[:12]}@example.com"
+    user = client.post('/api/users', json={'email': email, 'name': 'Postgres Test'}).get_json()['user']
+    token = client.post('/api/auth/login', json={'email': email}).get_json()['access_token']
+    yield {**user, 'headers': {'Authorization': f'Bearer {token}'}}
+
+    with pg_app.app_context():
+        with db.engine.begin() as connection:
+            for table in ('idempotency_keys', 'order_queue', 'user_data_versions', 'user_token_versions', 'revoked_tokens',
+                          'product_sales_sketches', 'user_order_stats', 'orders_archive'):
+                connection.execute(text(f"DELETE FROM {table} WHERE user_id = :id"), {"id": user['id']})
+            connection.execute(text(
+                "DELETE FROM order_products WHERE order_id IN (SELECT id FROM orders WHERE user_id = :id)"
+            ), {"id": user['id']})
+            connection.execute(text("DELETE FROM orders WHERE user_id = :id"), {"id": user['id']})
+            connection.execute(text("DELETE FROM users WHERE id = :id"), {"id": user['id']})
+
+
 @pytest.fixture(scope='function')
 def client(app):
     """A test client for the app"""
@@ -101,6 +218,7 @@ def test_order(test_db, test_user, test_products):
     
     for op in order_products:
         op.order_id = order.id
+        op.created_at = order.created_at
         db.session.add(op)
     
     db.session.commit()
@@ -0,0 +1,45 @@
+import logging
+import os
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.utils import logging_config
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+def test_forked_child_gets_fresh_pool_and_log_handlers(make_app):
+    """Test that a child forked after create_app does not reuse the parent's connections or handlers"""
+    app = make_app()
+    with app.app_context():
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        assert db.engine.pool.checkedin() == 1
+    parent_handlers = list(logging_config._handlers)
+
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            with app.app_context():
+                pooled = db.engine.pool.checkedin()
+            shared = any(h in parent_handlers for h in logging_config._handlers)
+            os.write(write_end, f"{pooled},{int(shared)}".encode())
+        finally:
+            os._exit(0)
+
+    os.close(write_end)
+    result = os.read(read_end, 64).decode()
+    os.close(read_end)
+    os.waitpid(pid, 0)
+
+    assert result == "0,0"
+    with app.app_context():
+        assert db.engine.pool.checkedin() == 1
+
+
+def test_create_app_twice_keeps_one_set_of_handlers(make_app):
+    """Test that repeated create_app calls replace rather than stack log handlers"""
+    make_app()
+    count = len(logging.getLogger().handlers)
+    make_app()
+    assert len(logging.getLogger().handlers) == count
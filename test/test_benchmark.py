@@ -0,0 +1,37 @@
+from benchmarks.endpoints import compare_to_baseline, percentile, summarize
+
+
+def test_percentile_uses_nearest_rank():
+    """Test that percentiles pick an observed value by nearest rank"""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.99) == 0.0
+
+
+def test_summarize_reports_throughput_and_statements():
+    """Test that a run summary carries rps, percentiles and SQL statements per request"""
+    summary = summarize([0.01] * 50, [2] * 50, errors=1, elapsed=0.5)
+    assert summary["rps"] == 100.0
+    assert summary["p95_ms"] == 10.0
+    assert summary["statements_per_request"] == 2.0
+    assert summary["errors"] == 1
+
+
+def test_compare_to_baseline_flags_regressions():
+    """Test that slower, lower-throughput or chattier endpoints are reported"""
+    baseline = {
+        "get_orders@1": {"rps": 200.0, "p95_ms": 10.0, "statements_per_request": 2.0, "errors": 0},
+        "login@1": {"rps": 500.0, "p95_ms": 2.0, "statements_per_request": 1.0, "errors": 0},
+    }
+    results = {
+        "get_orders@1": {"rps": 140.0, "p95_ms": 14.0, "statements_per_request": 3.0, "errors": 0},
+        "login@1": {"rps": 480.0, "p95_ms": 2.2, "statements_per_request": 1.0, "errors": 0},
+        "get_users@1": {"rps": 10.0, "p95_ms": 90.0, "statements_per_request": 1.0, "errors": 0},
+    }
+
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+
+    assert len(regressions) == 3
+    assert all(line.startswith("get_orders@1") for line in regressions)
@@ -0,0 +1,51 @@
+import sys
+from collections import Counter
+from datetime import date
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'scripts'))
+from generate_data import DatasetSpec, Population, generate_chunk
+
+SPEC = DatasetSpec(users=500, products=300, orders=6000, chunk_size=2000, end_date=date(2026, 1, 31))
+
+
+def test_chunks_are_deterministic_for_a_seed():
+    """Test that a chunk is identical across runs and changes with the seed"""
+    first = generate_chunk(SPEC, Population(SPEC), 1)
+    again = generate_chunk(SPEC, Population(SPEC), 1)
+    reseeded = DatasetSpec(**{**SPEC.__dict__, 'seed': SPEC.seed + 1})
+
+    assert first == again
+    assert first[0] != generate_chunk(reseeded, Population(reseeded), 1)[0]
+
+
+def test_order_totals_match_their_lines():
+    """Test that every order total equals the sum of its lines"""
+    orders, lines = generate_chunk(SPEC, Population(SPEC), 0)
+    totals = Counter()
+    for _, order_id, _, quantity, unit_price, _ in lines:
+        totals[order_id] += quantity * round(float(unit_price) * 100)
+
+    assert len(orders) == SPEC.chunk_size
+    for order_id, _, _, total_price, created_at in orders:
+        assert round(float(total_price) * 100) == totals[order_id]
+        assert date(2025, 2, 1) <= created_at.date() <= SPEC.end_date
+
+
+def test_distributions_are_skewed():
+    """Test product popularity, orders per user and hour of day are far from uniform"""
+    population = Population(SPEC)
+    orders, lines = [], []
+    for index in range(SPEC.chunks):
+        chunk_orders, chunk_lines = generate_chunk(SPEC, population, index)
+        orders.extend(chunk_orders)
+        lines.extend(chunk_lines)
+
+    products = Counter(line[2] for line in lines).most_common()
+    users = Counter(order[1] for order in orders).most_common()
+    hours = Counter(order[4].hour for order in orders)
+
+    # Top 5% of products and users carry a disproportionate share of the volume
+    assert sum(c for _, c in products[:SPEC.products // 20]) > 0.3 * len(lines)
+    assert sum(c for _, c in users[:SPEC.users // 20]) > 0.2 * len(orders)
+    assert hours[12] > 5 * hours[3]
@@ -0,0 +1,131 @@
+import os
+import json
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Needs a migrated PostgreSQL database and gevent; runs in a subprocess because
+# monkey patching must happen before anything else is imported
+TEST_DATABASE_URI = os.environ.get('TEST_DATABASE_URI')
+
+pytestmark = [
+    pytest.mark.skipif(not TEST_DATABASE_URI, reason='TEST_DATABASE_URI is not set to a migrated PostgreSQL database'),
+    pytest.mark.skipif(not importlib.util.find_spec('gevent'), reason='gevent is not installed'),
+]
+
+GREENLETS = 200
+POOL_SIZE = 5
+SLEEP = 0.05
+
+SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+from app.utils.green import patch_psycopg2
+patch_psycopg2()
+
+import json, os, time
+import gevent
+from sqlalchemy import text
+from app import create_app
+from app.config import Config
+from app.extensions import db
+
+GREENLETS, POOL_SIZE, SLEEP = {greenlets}, {pool_size}, {sleep}
+
+
+class GreenConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ['TEST_DATABASE_URI']
+    SQLALCHEMY_ENGINE_OPTIONS = {{'pool_size': POOL_SIZE, 'max_overflow': 0, 'pool_timeout': 60}}
+    METRICS_ENABLED = False
+
+
+app = create_app(GreenConfig)
+client = app.test_client()
+
+
+def transaction(n):
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("SELECT set_config('app.greenlet', :n, true)"), {{'n': str(n)}})
+        connection.execute(text("SELECT pg_sleep(:s)"), {{'s': SLEEP}})
+        return connection.execute(text("SELECT current_setting('app.greenlet', true)")).scalar() == str(n)
+
+
+def register(n):
+    response = client.post('/api/users', json={{'name': 'Green Test', 'email': f'greentest-{{n}}@example.com'}})
+    return response.status_code
+
+
+def pooled_settings():
+    # Hold every pooled connection at once so each one is inspected
+    with app.app_context():
+        connections = [db.engine.connect() for _ in range(POOL_SIZE)]
+        try:
+            return [
+                list(c.execute(text(
+                    "SELECT coalesce(current_setting('app.greenlet', true), ''), "
+                    "current_setting('client_min_messages')"
+                )).one())
+                for c in connections
+            ]
+        finally:
+            for c in connections:
+                c.close()
+
+
+started = time.perf_counter()
+isolated = gevent.joinall([gevent.spawn(transaction, n) for n in range(GREENLETS)], raise_error=True)
+elapsed = time.perf_counter() - started
+
+created = gevent.joinall([gevent.spawn(register, n) for n in range(POOL_SIZE * 4)], raise_error=True)
+
+result = {{
+    'isolated': [job.value for job in isolated],
+    'elapsed': elapsed,
+    'created': [job.value for job in created],
+    'pooled': pooled_settings(),
+}}
+
+with app.app_context(), db.engine.begin() as connection:
+    connection.execute(text("DELETE FROM users WHERE email LIKE 'greentest-%@example.com'"))
+
+print(json.dumps(result))
+"""
+
+
+@pytest.fixture(scope='module')
+def green_run():
+    script = SCRIPT.format(greenlets=GREENLETS, pool_size=POOL_SIZE, sleep=SLEEP)
+    env = dict(os.environ, TEST_DATABASE_URI=TEST_DATABASE_URI)
+    env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+    completed = subprocess.run(
+        [sys.executable, '-c', script], cwd=PROJECT_ROOT, env=env,
+        capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_greenlets_share_the_pool_concurrently(green_run):
+    """Test that queries yield to other greenlets instead of blocking the process"""
+    serial = GREENLETS * SLEEP
+    # Bounded by the pool: GREENLETS / POOL_SIZE rounds of SLEEP each
+    assert green_run['elapsed'] < serial / 2
+
+
+def test_transaction_state_stays_with_its_greenlet(green_run):
+    """Test that every greenlet reads back only its own transaction-local setting"""
+    assert len(green_run['isolated']) == GREENLETS
+    assert all(green_run['isolated'])
+
+
+def test_no_session_state_leaks_into_the_pool(green_run):
+    """Test that connections returned to the pool carry no per-request settings"""
+    assert set(green_run['created']) == {201}
+    assert len(green_run['pooled']) == POOL_SIZE
+    for greenlet_setting, min_messages in green_run['pooled']:
+        assert greenlet_setting == ''
+        assert min_messages == 'notice'
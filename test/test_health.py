@@ -0,0 +1,71 @@
+from sqlalchemy import create_engine
+from app.extensions import db, readiness
+from app.utils.health import ReadinessCheck, pool_usage
+
+
+def test_ready_when_database_answers(make_app):
+    """Test that a fast probe and an idle pool report ok"""
+    client = make_app(READINESS_CACHE_SECONDS=0).test_client()
+
+    response = client.get('/health/ready')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['status'] == 'ok'
+    assert body['checks']['database']['ok'] is True
+    assert body['checks']['pool']['checked_out'] == 0
+
+
+def test_slow_probe_reports_degraded(make_app):
+    """Test that a probe slower than the threshold takes the worker out of rotation"""
+    client = make_app(READINESS_CACHE_SECONDS=0, READINESS_MAX_PROBE_MS=0).test_client()
+
+    response = client.get('/health/ready')
+
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'degraded'
+
+
+def test_saturated_pool_skips_probe(make_app):
+    """Test that an exhausted pool is reported without waiting for a connection"""
+    app = make_app(
+        READINESS_CACHE_SECONDS=0,
+        SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 1, 'max_overflow': 0, 'pool_timeout': 30},
+    )
+    with app.app_context():
+        held = db.engine.connect()
+        try:
+            assert pool_usage(db.engine) == {"checked_out": 1, "capacity": 1, "usage": 1.0}
+            response = app.test_client().get('/health/ready')
+        finally:
+            held.close()
+
+    assert response.status_code == 503
+    assert response.get_json()['checks']['database']['skipped'] == 'pool exhausted'
+
+
+def test_failed_probe_reports_unavailable(tmp_path):
+    """Test that an unreachable database is reported as unavailable"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'missing' / 'test.db'}")
+
+    result, cached = ReadinessCheck().check(engine)
+
+    assert cached is False
+    assert result['status'] == 'unavailable'
+    assert result['checks']['database']['ok'] is False
+
+
+def test_result_is_cached_between_probes(make_app, monkeypatch):
+    """Test that probes within the cache window reuse the last result"""
+    client = make_app(READINESS_CACHE_SECONDS=60).test_client()
+    calls = []
+    original = readiness._run
+    monkeypatch.setattr(readiness, '_run', lambda engine: calls.append(1) or original(engine))
+
+    first = client.get('/health/ready').get_json()
+    second = client.get('/health/ready').get_json()
+
+    assert len(calls) == 1
+    assert first['cached'] is False
+    assert second['cached'] is True
+    assert second['checked_at'] == first['checked_at']
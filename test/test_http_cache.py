@@ -0,0 +1,107 @@
+import pytest
+from datetime import datetime, timezone
+from flask import jsonify
+from flask_jwt_extended import create_access_token, jwt_required
+from app.utils import http_cache
+from app.utils.http_cache import conditional_by_user_version
+
+
+@pytest.fixture
+def cached_app(make_app, monkeypatch):
+    """App with a conditional route whose version stamp is controlled by the test"""
+    app = make_app()
+    state = {
+        'version': 3,
+        'updated_at': datetime(2026, 1, 5, 12, 30, 15, 120000, tzinfo=timezone.utc),
+        'day_start': datetime(2026, 1, 5, tzinfo=timezone.utc),
+        'calls': 0
+    }
+    monkeypatch.setattr(http_cache, 'get_user_version', lambda user_id: (state['version'], state['updated_at']))
+    monkeypatch.setattr(http_cache, 'day_start', lambda: state['day_start'])
+
+    @app.route('/cached')
+    @jwt_required()
+    @conditional_by_user_version
+    def cached_view():
+        state['calls'] += 1
+        return jsonify({"calls": state['calls']}), 200
+
+    with app.app_context():
+        token = create_access_token(identity='user-1')
+    app.config['TEST_HEADERS'] = {'Authorization': f'Bearer {token}'}
+    return app, state
+
+
+def test_response_carries_etag(cached_app):
+    """Test that a successful GET returns validators"""
+    app, state = cached_app
+    response = app.test_client().get('/cached', headers=app.config['TEST_HEADERS'])
+    assert response.status_code == 200
+    assert response.headers['ETag'].startswith('W/')
+    assert response.last_modified == datetime(2026, 1, 5, 12, 30, 15, tzinfo=timezone.utc)
+
+
+def test_matching_etag_returns_304_without_running_view(cached_app):
+    """Test that If-None-Match with the current ETag skips the view"""
+    app, state = cached_app
+    client = app.test_client()
+    etag = client.get('/cached', headers=app.config['TEST_HEADERS']).headers['ETag']
+
+    response = client.get('/cached', headers={**app.config['TEST_HEADERS'], 'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == etag
+    assert state['calls'] == 1
+
+
+def test_version_bump_invalidates_etag(cached_app):
+    """Test that a new order (version bump) produces a fresh response"""
+    app, state = cached_app
+    client = app.test_client()
+    etag = client.get('/cached', headers=app.config['TEST_HEADERS']).headers['ETag']
+
+    state['version'] += 1
+    response = client.get('/cached', headers={**app.config['TEST_HEADERS'], 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert state['calls'] == 2
+
+
+def test_if_modified_since(cached_app):
+    """Test that If-Modified-Since at the version timestamp returns 304"""
+    app, state = cached_app
+    response = app.test_client().get('/cached', headers={
+        **app.config['TEST_HEADERS'],
+        'If-Modified-Since': 'Mon, 05 Jan 2026 12:30:15 GMT'
+    })
+    assert response.status_code == 304
+    assert state['calls'] == 0
+
+
+def test_new_day_is_modified_since(cached_app):
+    """Test that Last-Modified moves to the start of the day, when default report ranges change"""
+    app, state = cached_app
+    state['day_start'] = datetime(2026, 1, 6, tzinfo=timezone.utc)
+    response = app.test_client().get('/cached', headers={
+        **app.config['TEST_HEADERS'],
+        'If-Modified-Since': 'Mon, 05 Jan 2026 12:30:15 GMT'
+    })
+    assert response.status_code == 200
+    assert response.last_modified == datetime(2026, 1, 6, tzinfo=timezone.utc)
+
+
+def test_disabled_cache_always_runs_view(make_app, monkeypatch):
+    """Test that HTTP_CACHE_ENABLED=False bypasses the version lookup"""
+    app = make_app(HTTP_CACHE_ENABLED=False)
+    monkeypatch.setattr(http_cache, 'get_user_version', pytest.fail)
+
+    @app.route('/cached')
+    @jwt_required()
+    @conditional_by_user_version
+    def cached_view():
+        return jsonify({}), 200
+
+    with app.app_context():
+        token = create_access_token(identity='user-1')
+    response = app.test_client().get('/cached', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
@@ -0,0 +1,125 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text
+from app.extensions import db, idempotency
+from app.utils.idempotency import IdempotencyStore, StoredResponse, prune_expired_keys, request_fingerprint
+
+ORDER = {
+    'customer_name': 'Retry Customer',
+    'products': [{'name': 'Idempotent Widget', 'price': 4.5, 'quantity': 2}]
+}
+
+
+def count_orders(app, user_id):
+    with app.app_context(), db.engine.connect() as connection:
+        return connection.execute(text("SELECT COUNT(*) FROM orders WHERE user_id = :id"), {"id": user_id}).scalar()
+
+
+def test_fingerprint_ignores_key_order():
+    """Test that the same payload hashes the same whatever its key order"""
+    reordered = {'products': ORDER['products'], 'customer_name': ORDER['customer_name']}
+    assert request_fingerprint(ORDER) == request_fingerprint(reordered)
+    assert request_fingerprint(ORDER) != request_fingerprint({**ORDER, 'customer_name': 'Someone Else'})
+
+
+def test_memory_store_is_bounded_and_expires(monkeypatch):
+    """Test that the per-worker LRU evicts the oldest key and forgets expired ones"""
+    store = IdempotencyStore()
+    store.max_entries = 2
+    response = StoredResponse('hash', 200, '{}')
+
+    store.remember('user-1', 'a', response)
+    store.remember('user-1', 'b', response)
+    store.lookup('user-1', 'a')
+    store.remember('user-1', 'c', response)
+    assert store.lookup('user-1', 'b') is None
+    assert store.lookup('user-1', 'a') == response
+
+    monkeypatch.setattr('app.utils.idempotency.time.time', lambda: 2 ** 40)
+    assert store.lookup('user-1', 'a') is None
+
+
+def test_replay_checks_the_request(make_app):
+    """Test that a stored response is replayed only for the same request"""
+    app = make_app()
+    stored = StoredResponse('hash', 201, '{"order": {"id": "1"}}')
+
+    with app.test_request_context():
+        response = IdempotencyStore.replay(stored, 'hash')
+        assert response.status_code == 201
+        assert response.get_data(as_text=True) == stored.body
+        assert response.headers['Idempotent-Replayed'] == 'true'
+
+        _, status = IdempotencyStore.replay(stored, 'other-hash')
+        assert status == 422
+
+        _, status = IdempotencyStore.replay(StoredResponse('hash', None, None), 'hash')
+        assert status == 409
+
+
+def test_retry_replays_without_creating_a_second_order(pg_app, pg_user):
+    """Test that a retried POST returns the original response and inserts nothing"""
+    client = pg_app.test_client()
+    headers = {**pg_user['headers'], 'Idempotency-Key': 'retry-1'}
+
+    first = client.post('/api/orders', headers=headers, json=ORDER)
+    assert first.status_code == 200
+
+    # Served from this worker's memory, then from PostgreSQL as another worker would
+    second = client.post('/api/orders', headers=headers, json=ORDER)
+    idempotency.clear()
+    third = client.post('/api/orders', headers=headers, json=ORDER)
+
+    for retry in (second, third):
+        assert retry.status_code == 200
+        assert retry.headers['Idempotent-Replayed'] == 'true'
+        assert retry.get_data() == first.get_data()
+    assert count_orders(pg_app, pg_user['id']) == 1
+
+    changed = client.post('/api/orders', headers=headers, json={**ORDER, 'customer_name': 'Other Customer'})
+    assert changed.status_code == 422
+    assert count_orders(pg_app, pg_user['id']) == 1
+
+
+def test_concurrent_retries_create_one_order(pg_app, pg_user):
+    """Test that simultaneous requests with one key wait for the first instead of inserting"""
+    headers = {**pg_user['headers'], 'Idempotency-Key': 'concurrent-1'}
+
+    def post(_):
+        with pg_app.test_client() as client:
+            return client.post('/api/orders', headers=headers, json=ORDER)
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        responses = list(pool.map(post, range(6)))
+
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.get_json()['order']['id'] for response in responses}) == 1
+    assert count_orders(pg_app, pg_user['id']) == 1
+
+
+def test_expired_keys_are_reused_and_pruned(pg_app, pg_user):
+    """Test that an expired key creates a new order and that pruning deletes expired keys"""
+    client = pg_app.test_client()
+    headers = {**pg_user['headers'], 'Idempotency-Key': 'expiring-1'}
+    client.post('/api/orders', headers=headers, json=ORDER)
+
+    with pg_app.app_context(), db.engine.begin() as connection:
+        connection.execute(text(
+            "UPDATE idempotency_keys SET expires_at = NOW() - INTERVAL '1 second' WHERE user_id = :id"
+        ), {"id": pg_user['id']})
+    idempotency.clear()
+
+    again = client.post('/api/orders', headers=headers, json=ORDER)
+    assert 'Idempotent-Replayed' not in again.headers
+    assert count_orders(pg_app, pg_user['id']) == 2
+
+    with pg_app.app_context(), db.engine.begin() as connection:
+        connection.execute(text(
+            "UPDATE idempotency_keys SET expires_at = NOW() - INTERVAL '1 second' WHERE user_id = :id"
+        ), {"id": pg_user['id']})
+    with pg_app.app_context(), db.engine.connect() as connection:
+        assert prune_expired_keys(connection, batch_size=1) >= 1
+        remaining = connection.execute(text(
+            "SELECT COUNT(*) FROM idempotency_keys WHERE user_id = :id"
+        ), {"id": pg_user['id']}).scalar()
+    assert remaining == 0
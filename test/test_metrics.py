@@ -0,0 +1,113 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from prometheus_client import CollectorRegistry, multiprocess
+from app.utils.metrics import REGISTRY, record_error
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_requests_are_timed_per_route(make_app):
+    """Test that latency is recorded under the route rule, not the raw path"""
+    app = make_app(METRICS_ENABLED=True)
+
+    @app.route('/_items/<item_id>')
+    def get_item(item_id):
+        return {'id': item_id}
+
+    labels = {'method': 'GET', 'route': '/_items/<item_id>', 'status': '200'}
+    before = sample('http_request_duration_seconds_count', **labels)
+
+    client = app.test_client()
+    client.get('/_items/1')
+    client.get('/_items/2')
+
+    assert sample('http_request_duration_seconds_count', **labels) == before + 2
+    assert sample('http_requests_in_flight', route='/_items/<item_id>') == 0
+
+
+def test_handled_errors_are_counted_by_class(make_app):
+    """Test that exceptions caught in views are counted by exception class"""
+    app = make_app(METRICS_ENABLED=True)
+
+    @app.route('/_fails')
+    def fails():
+        try:
+            raise KeyError('missing')
+        except Exception as e:
+            record_error(e)
+            return {'message': 'error'}, 500
+
+    before = sample('http_request_errors_total', route='/_fails', exception='KeyError')
+    app.test_client().get('/_fails')
+    assert sample('http_request_errors_total', route='/_fails', exception='KeyError') == before + 1
+
+
+def test_metrics_endpoint_exposes_text_format(make_app):
+    """Test that /metrics returns the Prometheus text exposition format"""
+    app = make_app(METRICS_ENABLED=True)
+    client = app.test_client()
+    client.get('/health')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_bucket{' in body
+    assert 'route="/health"' in body
+    assert 'db_pool_connections{state="size"}' in body
+
+
+def test_unhandled_exceptions_are_timed_as_500(make_app):
+    """Test that a request ending in an uncaught exception still records its latency"""
+    app = make_app(METRICS_ENABLED=True)
+
+    @app.route('/_crashes')
+    def crashes():
+        raise RuntimeError('boom')
+
+    labels = {'method': 'GET', 'route': '/_crashes', 'status': '500'}
+    before = sample('http_request_duration_seconds_count', **labels)
+
+    with pytest.raises(RuntimeError):
+        app.test_client().get('/_crashes')
+
+    assert sample('http_request_duration_seconds_count', **labels) == before + 1
+    assert sample('http_requests_in_flight', route='/_crashes') == 0
+
+
+def test_metrics_are_off_by_default(make_app):
+    """Test that no /metrics route exists unless metrics are enabled"""
+    assert make_app().test_client().get('/metrics').status_code == 404
+
+
+def test_metrics_token_is_required_when_set(make_app):
+    """Test that /metrics rejects scrapes without the configured bearer token"""
+    client = make_app(METRICS_ENABLED=True, METRICS_TOKEN='scrape-secret').test_client()
+
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'}).status_code == 200
+
+
+def test_counters_aggregate_across_processes(tmp_path):
+    """Test that samples written by separate worker processes are summed"""
+    script = (
+        "from app.utils.metrics import CACHE_LOOKUPS\n"
+        "CACHE_LOOKUPS.labels('report', 'hit').inc(3)\n"
+    )
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT, env=env, check=True)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+
+    assert registry.get_sample_value('cache_lookups_total', {'cache': 'report', 'result': 'hit'}) == 6
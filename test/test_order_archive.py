@@ -0,0 +1,80 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import text
+from app.extensions import db
+from app.schemas import OrderCreate
+from app.utils.order_archive import archive_orders
+from app.utils.order_writer import write_order
+
+ORDER = {'customer_name': 'Archive Customer', 'products': [
+    {'name': 'Archive Widget', 'price': 3.0, 'quantity': 2},
+    {'name': 'Archive Gadget', 'price': 1.5, 'quantity': 1},
+]}
+
+
+def test_old_orders_move_to_the_archive(pg_app, pg_user):
+    """Test that whole months and leftover orders are archived and still found by id"""
+    client = pg_app.test_client()
+    # January 2001 has no partition (the default one holds it); February gets its own
+    january, february = str(uuid.uuid4()), str(uuid.uuid4())
+    with pg_app.app_context(), db.engine.begin() as connection:
+        for parent in ('orders', 'order_products'):
+            connection.execute(text("SELECT ensure_monthly_partition(:parent, '2001-02-01')"), {"parent": parent})
+        for order_id, created_at in ((january, datetime(2001, 1, 15, 12)), (february, datetime(2001, 2, 10, 9))):
+            write_order(connection, pg_user['id'], OrderCreate.model_validate(ORDER),
+                        order_id=order_id, created_at=created_at)
+    assert client.post('/api/orders', json=ORDER, headers=pg_user['headers']).status_code == 200
+
+    with pg_app.app_context(), db.engine.connect() as connection:
+        assert archive_orders(connection, datetime(2001, 3, 1), batch_size=10) == 2
+        assert connection.execute(text("SELECT to_regclass('orders_p2001_02')")).scalar() is None
+        assert connection.execute(text("SELECT to_regclass('order_products_p2001_02')")).scalar() is None
+
+    for order_id in (january, february):
+        response = client.get(f'/api/orders/{order_id}', headers=pg_user['headers'])
+        assert response.status_code == 200
+        order = response.get_json()['order']
+        assert order['total_price'] == 7.5
+        assert [(p['name'], p['quantity'], p['unit_price']) for p in order['products']] == [
+            ('Archive Gadget', 1, 1.5), ('Archive Widget', 2, 3.0)
+        ]
+
+    # Listings only show orders still in the hot tables; the summary keeps the history
+    listing = client.get('/api/orders', headers=pg_user['headers']).get_json()
+    assert listing['pagination']['total'] == 1
+    assert len(listing['orders']) == 1
+    summary = client.get('/api/orders/summary', headers=pg_user['headers']).get_json()['summary']
+    assert summary['all_time']['order_count'] == 3
+
+
+def test_reports_keep_counting_archived_orders(pg_app, pg_user):
+    """Test that the product, team and revenue reports read archived orders, cached pages included"""
+    client = pg_app.test_client()
+    with pg_app.app_context(), db.engine.begin() as connection:
+        for created_at in (datetime(2001, 1, 15, 12), datetime(2001, 1, 20, 8)):
+            write_order(connection, pg_user['id'], OrderCreate.model_validate(ORDER),
+                        order_id=str(uuid.uuid4()), created_at=created_at)
+
+    products_url = '/api/reports/products?start_date=2001-01-01&end_date=2001-01-31'
+    revenue_url = '/api/reports/revenue?bucket=day&start_date=2001-01-01&end_date=2001-01-31'
+    before = client.get(products_url, headers=pg_user['headers']).get_json()
+    revenue_before = client.get(revenue_url, headers=pg_user['headers']).get_json()['report']
+
+    with pg_app.app_context(), db.engine.connect() as connection:
+        assert archive_orders(connection, datetime(2001, 2, 1), batch_size=10) == 2
+
+    after = client.get(products_url, headers=pg_user['headers']).get_json()
+    assert after == before
+    assert [(p['product_name'], p['total_quantity'], p['total_price']) for p in after['report']['products']] == [
+        ('Archive Widget', 4, 12.0), ('Archive Gadget', 2, 3.0)
+    ]
+    revenue_after = client.get(revenue_url, headers=pg_user['headers']).get_json()['report']
+    assert revenue_after == revenue_before
+    assert revenue_after['total_orders'] == 2
+    assert revenue_after['total_revenue'] == 15.0
+
+    with pg_app.app_context(), db.engine.connect() as connection:
+        team = connection.execute(text("""
+        SELECT * FROM get_team_product_sales_report(ARRAY[:user_id], '2001-01-01', '2001-02-01')
+        """), {"user_id": pg_user['id']}).fetchall()
+    assert [(row.product_name, row.total_quantity) for row in team] == [('Archive Widget', 4), ('Archive Gadget', 2)]
@@ -0,0 +1,100 @@
+import json
+import pytest
+from sqlalchemy import text
+from app.extensions import db
+from app.utils.order_queue import drain
+
+ORDER = {
+    'customer_name': 'Lunch Customer',
+    'products': [
+        {'name': 'Queued Soup', 'price': 4.5, 'quantity': 2},
+        {'name': 'Queued Bread', 'price': 1.25, 'quantity': 1}
+    ]
+}
+
+
+@pytest.fixture
+def queue_app(pg_app):
+    pg_app.config['ORDER_WRITE_BEHIND'] = True
+    return pg_app
+
+
+def drain_queue(app, batch_size=100):
+    with app.app_context(), db.engine.connect() as connection:
+        return drain(connection, batch_size)
+
+
+def count_orders(app, user_id):
+    with app.app_context(), db.engine.connect() as connection:
+        return connection.execute(text("SELECT COUNT(*) FROM orders WHERE user_id = :id"), {"id": user_id}).scalar()
+
+
+def test_order_is_accepted_then_written_by_the_drain(queue_app, pg_user):
+    """Test that a queued order answers 202, stays pending, then matches a direct write"""
+    client = queue_app.test_client()
+    accepted = client.post('/api/orders', headers=pg_user['headers'], json=ORDER)
+    assert accepted.status_code == 202
+    order = accepted.get_json()['order']
+    assert order['status'] == 'pending'
+    assert accepted.headers['Location'].endswith(f"/api/orders/{order['id']}/status")
+    assert count_orders(queue_app, pg_user['id']) == 0
+
+    status = client.get(accepted.headers['Location'], headers=pg_user['headers'])
+    assert status.get_json()['order']['status'] == 'pending'
+
+    assert drain_queue(queue_app).written >= 1
+
+    status = client.get(accepted.headers['Location'], headers=pg_user['headers'])
+    assert status.get_json()['order']['status'] == 'completed'
+
+    written = client.get(f"/api/orders/{order['id']}", headers=pg_user['headers']).get_json()['order']
+    assert written['total_price'] == 10.25
+    assert written['created_at'] == order['created_at']
+    assert sorted(p['name'] for p in written['products']) == ['Queued Bread', 'Queued Soup']
+
+
+def test_failed_order_does_not_block_its_batch(queue_app, pg_user):
+    """Test that an order that cannot be written is marked failed while the rest commit"""
+    client = queue_app.test_client()
+    good = [client.post('/api/orders', headers=pg_user['headers'], json=ORDER).get_json()['order']['id']
+            for _ in range(3)]
+    broken = {**ORDER, 'products': [{'name': 'Queued Soup', 'price': 4.5, 'quantity': 'two'}]}
+    with queue_app.app_context(), db.engine.begin() as connection:
+        broken_id = connection.execute(
+            text("SELECT id FROM enqueue_order(:user_id, CAST(:payload AS jsonb))"),
+            {"user_id": pg_user['id'], "payload": json.dumps(broken)}
+        ).scalar()
+
+    result = drain_queue(queue_app, batch_size=2)
+    assert result.failed >= 1
+    assert count_orders(queue_app, pg_user['id']) == len(good)
+
+    status = client.get(f"/api/orders/{broken_id}/status", headers=pg_user['headers']).get_json()['order']
+    assert status['status'] == 'failed'
+    assert 'quantity' in status['error']
+    for order_id in good:
+        status = client.get(f"/api/orders/{order_id}/status", headers=pg_user['headers']).get_json()['order']
+        assert status['status'] == 'completed'
+
+
+def test_idempotent_retry_queues_once(queue_app, pg_user):
+    """Test that an Idempotency-Key retry replays the 202 instead of queueing again"""
+    client = queue_app.test_client()
+    headers = {**pg_user['headers'], 'Idempotency-Key': 'queued-1'}
+    first = client.post('/api/orders', headers=headers, json=ORDER)
+    retry = client.post('/api/orders', headers=headers, json=ORDER)
+
+    assert retry.status_code == 202
+    assert retry.get_data() == first.get_data()
+    with queue_app.app_context(), db.engine.connect() as connection:
+        queued = connection.execute(
+            text("SELECT COUNT(*) FROM order_queue WHERE user_id = :id"), {"id": pg_user['id']}
+        ).scalar()
+    assert queued == 1
+
+
+def test_status_of_unknown_order(queue_app, pg_user):
+    """Test that another user's or an unknown order id is not found"""
+    client = queue_app.test_client()
+    response = client.get('/api/orders/3f0e4c1e-8f5a-4f7b-9d5e-0a6b1c2d3e4f/status', headers=pg_user['headers'])
+    assert response.status_code == 404
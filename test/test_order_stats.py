@@ -0,0 +1,66 @@
+import uuid
+from datetime import date, datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from app.extensions import db
+from app.schemas import OrderCreate
+from app.utils.order_writer import write_order
+
+ORDER = {'customer_name': 'Stats Customer', 'products': [{'name': 'Stats Widget', 'price': 2.5, 'quantity': 2}]}
+
+
+def test_summary_rejects_bad_dates(make_app):
+    """Test that the summary range is validated like the reports"""
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+    assert client.get('/api/orders/summary?start_date=yesterday', headers=headers).status_code == 400
+
+
+def test_summary_reports_database_errors(make_app):
+    """Test that a failing summary query is answered like the order listing's database errors"""
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+    # SQLite has no get_user_order_summary
+    response = client.get('/api/orders/summary', headers=headers)
+    assert response.status_code == 500
+    assert response.get_json() == {'message': 'A database error occurred'}
+
+
+def test_summary_and_total_follow_new_orders(pg_app, pg_user):
+    """Test that order creation keeps the daily counters behind the summary and pagination total"""
+    client = pg_app.test_client()
+    with pg_app.app_context(), db.engine.begin() as connection:
+        write_order(connection, pg_user['id'], OrderCreate.model_validate(ORDER),
+                    order_id=str(uuid.uuid4()), created_at=datetime.now() - timedelta(days=40))
+    for _ in range(2):
+        assert client.post('/api/orders', json=ORDER, headers=pg_user['headers']).status_code == 200
+
+    summary = client.get('/api/orders/summary', headers=pg_user['headers']).get_json()['summary']
+    assert summary['today'] == {'order_count': 2, 'revenue': 10.0}
+    assert summary['this_month']['order_count'] == 2
+    assert summary['all_time'] == {'order_count': 3, 'revenue': 15.0}
+    assert 'range' not in summary
+
+    start = (date.today() - timedelta(days=45)).isoformat()
+    end = (date.today() - timedelta(days=1)).isoformat()
+    ranged = client.get(f'/api/orders/summary?start_date={start}&end_date={end}', headers=pg_user['headers']).get_json()
+    assert ranged['summary']['range']['order_count'] == 1
+
+    # Recomputing a total adds nothing
+    with pg_app.app_context(), db.engine.begin() as connection:
+        order_id = connection.execute(text("SELECT id FROM orders WHERE user_id = :id LIMIT 1"), {"id": pg_user['id']}).scalar()
+        connection.execute(text("SELECT update_order_total(:id)"), {"id": order_id})
+    summary = client.get('/api/orders/summary', headers=pg_user['headers']).get_json()['summary']
+    assert summary['all_time']['revenue'] == 15.0
+
+    page = client.get('/api/orders?per_page=2&page=2', headers=pg_user['headers']).get_json()
+    assert page['pagination']['total'] == 3
+    assert page['pagination']['pages'] == 2
+    assert len(page['orders']) == 1
+    past_end = client.get('/api/orders?per_page=2&page=5', headers=pg_user['headers']).get_json()
+    assert past_end['pagination']['total'] == 3
+    assert past_end['orders'] == []
@@ -1,5 +1,10 @@
 import json
+import uuid
 import pytest
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
 from app.models import Order, Product
 
 
@@ -105,4 +110,38 @@ def test_create_order_with_existing_product(client, auth_headers, test_products)
     # Verify the product wasn't duplicated in database
     response_data = json.loads(response.data)
     product_in_response = response_data['order']['products'][0]
-    assert product_in_response['product_name'] == existing_product.name
\ No newline at end of file
+    assert product_in_response['product_name'] == existing_product.name
+
+def test_money_is_summed_exactly(pg_app, pg_user):
+    """Test that totals are added up in NUMERIC and returned as cent values"""
+    client = pg_app.test_client()
+    suffix = uuid.uuid4().hex[:8]
+    data = {'customer_name': 'Cents Customer', 'products': [
+        {'name': f'Dime {suffix}', 'price': 0.1, 'quantity': 3},
+        {'name': f'Fifth {suffix}', 'price': 0.2, 'quantity': 1},
+    ]}
+    order = client.post('/api/orders', json=data, headers=pg_user['headers']).get_json()['order']
+    # Float arithmetic would give 0.5000000000000001
+    assert order['total_price'] == 0.5
+
+    report = client.get('/api/reports/products', headers=pg_user['headers']).get_json()['report']
+    assert {product['total_price'] for product in report['products']} == {0.3, 0.2}
+
+
+def test_order_lines_need_their_order_timestamp(pg_app, pg_user):
+    """Test that a line is only written with the created_at of its order, its partition key"""
+    with pg_app.app_context(), db.engine.connect() as connection:
+        with connection.begin():
+            order_id, created_at = connection.execute(
+                text("SELECT * FROM create_order(:user_id, 'Line Customer')"), {"user_id": pg_user['id']}
+            ).fetchone()
+            product_id = connection.execute(
+                text("SELECT id FROM create_or_get_product(:name, 1.0)"), {"name": f"Line {uuid.uuid4().hex[:8]}"}
+            ).scalar()
+            query = text("SELECT add_product_to_order(:order_id, :product_id, 1, 1.0, :created_at)")
+            connection.execute(query, {"order_id": order_id, "product_id": product_id, "created_at": created_at})
+            with pytest.raises(IntegrityError):
+                with connection.begin_nested():
+                    connection.execute(query, {
+                        "order_id": order_id, "product_id": product_id, "created_at": datetime(2001, 1, 1)
+                    })
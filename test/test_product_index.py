@@ -0,0 +1,149 @@
+import uuid
+from collections import namedtuple
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+from app.extensions import db, product_index
+from app.utils.product_index import ProductIndex
+
+ProductRow = namedtuple('ProductRow', ['id', 'name', 'price', 'created_xid'])
+
+
+def product_engine(fake_engine, rows):
+    """Answers get_products_since from `rows`. get_product_watermark() is
+    `engine.oldest_running`, or past every row when no transaction is running.
+    """
+    def watermark(params):
+        if engine.oldest_running is not None:
+            return engine.oldest_running
+        return max((row.created_xid for row in engine.rows), default=0) + 1
+
+    engine = fake_engine(
+        rows,
+        select=lambda rows, params: [row for row in rows if params['since'] is None or row.created_xid >= params['since']],
+        scalar=watermark
+    )
+    engine.oldest_running = None
+    return engine
+
+
+def since_calls(engine):
+    return [params['since'] for params in engine.calls if params is not None]
+
+
+def product(xid, name):
+    return ProductRow(f'id-{xid}', name, 2.5, xid)
+
+
+def names(products):
+    return [p['name'] for p in products]
+
+
+def test_search_matches_prefix_ignoring_case(fake_engine):
+    """Test that a prefix finds names in order regardless of case, up to the limit"""
+    engine = product_engine(fake_engine, [product(0, 'Coffee'), product(1, 'cola'), product(2, 'Bagel'), product(3, 'Cocoa')])
+    index = ProductIndex()
+    index.refresh_seconds = 60
+
+    assert names(index.search('co', 10, engine)) == ['Cocoa', 'Coffee', 'cola']
+    assert names(index.search('CO', 2, engine)) == ['Cocoa', 'Coffee']
+    assert index.search('tea', 10, engine) == []
+    assert len(since_calls(engine)) == 1
+
+
+def test_refresh_merges_new_products(fake_engine):
+    """Test that a refresh only reads recent products and merges them in sorted order once"""
+    engine = product_engine(fake_engine, [product(0, 'Coffee'), product(100, 'Cocoa')])
+    index = ProductIndex()
+    index.refresh(engine)
+
+    engine.rows.append(product(101, 'Coconut'))
+    index.refresh(engine)
+    assert since_calls(engine) == [None, 101]
+    assert names(index.search('co', 10, engine)) == ['Cocoa', 'Coconut', 'Coffee']
+    assert len(index) == 3
+
+
+def test_refresh_picks_up_late_commits(fake_engine):
+    """Test that a product committed after a later transaction's product is read on the next refresh"""
+    engine = product_engine(fake_engine, [product(1, 'Coffee')])
+    index = ProductIndex()
+    index.refresh(engine)
+
+    # Transaction 2 is still running while transaction 3 commits a product
+    engine.oldest_running = 2
+    engine.rows.append(product(3, 'Cocoa'))
+    index.refresh(engine)
+    assert names(index.search('co', 10, engine)) == ['Cocoa', 'Coffee']
+
+    engine.oldest_running = None
+    engine.rows.append(product(2, 'Coconut'))
+    index.refresh(engine)
+    assert since_calls(engine) == [None, 2, 2]
+    assert names(index.search('co', 10, engine)) == ['Cocoa', 'Coconut', 'Coffee']
+
+
+def test_failed_refresh_keeps_index(fake_engine):
+    """Test that a refresh error keeps the products already loaded"""
+    engine = product_engine(fake_engine, [product(0, 'Coffee')])
+    index = ProductIndex()
+    index.refresh(engine)
+
+    engine.fail = True
+    index.refresh(engine)
+    assert names(index.search('c', 10, engine)) == ['Coffee']
+
+
+def test_search_requires_query(make_app):
+    """Test that a missing or too long q is a validation error"""
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+
+    assert client.get('/api/products', headers=headers).status_code == 400
+    assert client.get(f"/api/products?q={'a' * 51}", headers=headers).status_code == 400
+    assert client.get('/api/products?q=co&limit=0', headers=headers).status_code == 400
+
+
+def test_search_endpoint_finds_new_products(pg_app, pg_user):
+    """Test that products created by an order are found by prefix without a query per search"""
+    client = pg_app.test_client()
+    name = f"Typeahead {pg_user['id'][:8].translate(str.maketrans('0123456789', 'abcdefghij'))}"
+    client.get('/api/products?q=Typeahead', headers=pg_user['headers'])
+
+    order = {'customer_name': 'Search Customer', 'products': [{'name': name, 'price': 3.25, 'quantity': 1}]}
+    assert client.post('/api/orders', json=order, headers=pg_user['headers']).status_code == 200
+    product_index.refresh_seconds = 0
+    response = client.get(f'/api/products?q={name[:12].lower()}', headers=pg_user['headers'])
+    assert {'name': name, 'price': 3.25} in [
+        {'name': p['name'], 'price': p['price']} for p in response.get_json()['products']
+    ]
+
+    product_index.refresh_seconds = 3600
+    queries = []
+    record = lambda *args: queries.append(args[2])
+    with pg_app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        for length in range(1, len(name) + 1):
+            assert client.get(f'/api/products?q={name[:length]}', headers=pg_user['headers']).status_code == 200
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert queries == []
+
+
+def test_products_committed_late_reach_the_index(pg_app):
+    """Test that a product whose transaction commits after a refresh is found on the next one"""
+    index = ProductIndex()
+    name = f"Late {uuid.uuid4().hex[:8]}"
+    with pg_app.app_context():
+        index.refresh(db.engine)
+        with db.engine.connect() as slow:
+            transaction = slow.begin()
+            slow.execute(text("SELECT * FROM create_or_get_product(:name, 1.25)"), {"name": name})
+            # A product committed meanwhile moves the newest created_xid past the slow transaction
+            with db.engine.begin() as fast:
+                fast.execute(text("SELECT * FROM create_or_get_product(:name, 1.25)"), {"name": f"{name} fast"})
+            index.refresh(db.engine)
+            assert names(index.search(name, 10, db.engine)) == [f"{name} fast"]
+            transaction.commit()
+        index.refresh(db.engine)
+        assert names(index.search(name, 10, db.engine)) == [name, f"{name} fast"]
@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import text
+from app.extensions import db
+
+
+def place_order(client, user, lines):
+    order = {
+        'customer_name': 'Sketch Customer',
+        'products': [{'name': name, 'price': 2.0, 'quantity': quantity} for name, quantity in lines]
+    }
+    assert client.post('/api/orders', json=order, headers=user['headers']).status_code == 200
+
+
+def top_products(client, user, **params):
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    response = client.get(f'/api/reports/products?{query}', headers=user['headers'])
+    assert response.status_code == 200
+    return [(p['product_name'], p['total_quantity']) for p in response.get_json()['report']['products']]
+
+
+def test_top_requires_positive_count(make_app):
+    """Test that top outside 1-100 is a validation error"""
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+    assert client.get('/api/reports/products?top=0', headers=headers).status_code == 400
+    assert client.get('/api/reports/products?top=101', headers=headers).status_code == 400
+
+
+def test_approximate_top_matches_exact_under_capacity(pg_app, pg_user):
+    """Test that with fewer products than the capacity the summaries are exact"""
+    client = pg_app.test_client()
+    place_order(client, pg_user, [('Sketch Coffee', 5), ('Sketch Bagel', 2)])
+    place_order(client, pg_user, [('Sketch Bagel', 4), ('Sketch Juice', 1)])
+
+    exact = top_products(client, pg_user, top=2)
+    assert exact == [('Sketch Bagel', 6), ('Sketch Coffee', 5)]
+    assert top_products(client, pg_user, top=2, approximate='true') == exact
+
+
+def test_full_summary_keeps_heavy_hitters(pg_app, pg_user):
+    """Test that a full summary keeps the best seller and the total quantity it has seen"""
+    pg_app.config['PRODUCT_SKETCH_CAPACITY'] = 2
+    client = pg_app.test_client()
+    place_order(client, pg_user, [('Sketch Coffee', 10)])
+    for name in ('Sketch Bagel', 'Sketch Juice', 'Sketch Scone'):
+        place_order(client, pg_user, [(name, 1)])
+    place_order(client, pg_user, [('Sketch Coffee', 10)])
+
+    approximate = top_products(client, pg_user, top=5, approximate='true')
+    assert approximate[0] == ('Sketch Coffee', 20)
+    assert len(approximate) == 2
+    # Space-saving never loses quantity: it is handed on with the slot
+    assert sum(quantity for _, quantity in approximate) == 23
+
+
+def test_rebuild_matches_exact_report(pg_app, pg_user):
+    """Test that rebuilding the day's summaries reproduces the exact top products"""
+    client = pg_app.test_client()
+    place_order(client, pg_user, [('Sketch Coffee', 3), ('Sketch Bagel', 7)])
+    with pg_app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("DELETE FROM product_sales_sketches WHERE user_id = :id"), {"id": pg_user['id']})
+        connection.execute(
+            text("SELECT rebuild_product_sales_sketches(:day, :day, 64)"), {"day": date.today()}
+        )
+
+    assert top_products(client, pg_user, top=10, approximate='true') == top_products(client, pg_user, top=10)
+
+
+def test_merged_days_bound_missing_products(pg_app, pg_user):
+    """Test that a product missing from a full day's summary is counted with that day's bound"""
+    pg_app.config['PRODUCT_SKETCH_CAPACITY'] = 2
+    client = pg_app.test_client()
+    place_order(client, pg_user, [('Sketch Coffee', 10), ('Sketch Bagel', 3)])
+    # Full: Juice takes Bagel's slot and count, but not its revenue
+    place_order(client, pg_user, [('Sketch Juice', 1)])
+    with pg_app.app_context(), db.engine.begin() as connection:
+        untracked = connection.execute(text(
+            "SELECT untracked_quantity FROM product_sales_sketches WHERE user_id = :id"
+        ), {"id": pg_user['id']}).scalar()
+        assert untracked == 3
+        # Yesterday Bagel was the only product sold
+        connection.execute(text("""
+            INSERT INTO product_sales_sketches (user_id, day, sketch, untracked_quantity)
+            VALUES (:id, CURRENT_DATE - 1, '{"Sketch Bagel": [5, 10.0, 0]}', 0)
+        """), {"id": pg_user['id']})
+
+    response = client.get(
+        f'/api/reports/products?top=5&approximate=true&start_date={date.today() - timedelta(days=1)}',
+        headers=pg_user['headers']
+    )
+    products = {p['product_name']: p for p in response.get_json()['report']['products']}
+    # 5 yesterday, and at most 3 today when it lost its slot
+    assert (products['Sketch Bagel']['total_quantity'], products['Sketch Bagel']['max_error']) == (8, 3)
+    assert (products['Sketch Juice']['total_quantity'], products['Sketch Juice']['max_error']) == (4, 3)
+    assert products['Sketch Juice']['total_price'] == 2.0
+    assert products['Sketch Coffee']['max_error'] == 0
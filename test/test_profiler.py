@@ -0,0 +1,101 @@
+import os
+import signal
+import threading
+import time
+from app.extensions import profiler
+from app.utils.profiler import SamplingProfiler
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def run_busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=busy_loop, args=(stop,), daemon=True)
+    thread.start()
+    return stop, thread
+
+
+def test_sampler_collapses_stacks_of_other_threads():
+    """Test that samples of a busy thread end in its function, root first"""
+    stop, thread = run_busy_thread()
+    try:
+        output = SamplingProfiler(interval=0.001).run_for(0.2)
+    finally:
+        stop.set()
+        thread.join()
+
+    lines = [line.rsplit(' ', 1) for line in output.splitlines()]
+    busy = [(stack, int(count)) for stack, count in lines if 'busy_loop' in stack]
+    assert busy
+    assert all(stack.split(';')[0].startswith('_bootstrap') for stack, _ in busy)
+    assert '_sample_loop' not in output
+
+
+def test_profile_endpoint_requires_token(make_app):
+    """Test that profiling is refused without the configured token"""
+    client = make_app(PROFILER_ENABLED=True, PROFILER_TOKEN='secret').test_client()
+
+    assert client.post('/debug/profile?seconds=0').status_code == 403
+    assert client.post('/debug/profile?seconds=0', headers={'X-Profiler-Token': 'wrong'}).status_code == 403
+
+
+def test_profile_endpoint_is_absent_unless_enabled(make_app):
+    """Test that the endpoint does not exist by default"""
+    client = make_app(PROFILER_TOKEN='secret').test_client()
+    assert client.post('/debug/profile', headers={'X-Profiler-Token': 'secret'}).status_code == 404
+
+
+def test_profile_endpoint_returns_collapsed_stacks(make_app):
+    """Test that an authorized request returns the worker's collapsed stacks"""
+    client = make_app(PROFILER_ENABLED=True, PROFILER_TOKEN='secret', PROFILER_INTERVAL_MS=1).test_client()
+    stop, thread = run_busy_thread()
+    try:
+        # As a gthread worker would serve it
+        response = client.post('/debug/profile?seconds=0.2', headers={'X-Profiler-Token': 'secret'},
+                               multithread=True)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert response.status_code == 200
+    assert 'busy_loop' in response.get_data(as_text=True)
+    assert response.headers['Content-Disposition'].endswith('.collapsed"')
+
+
+def test_profile_endpoint_refuses_single_threaded_workers(make_app):
+    """Test that a sync worker is pointed at the signal instead of stalling on its own request"""
+    client = make_app(PROFILER_ENABLED=True, PROFILER_TOKEN='secret').test_client()
+    response = client.post('/debug/profile?seconds=5', headers={'X-Profiler-Token': 'secret'},
+                           multithread=False)
+    assert response.status_code == 409
+    assert 'PROFILER_SIGNAL' in response.get_json()['message']
+
+
+def test_sampled_requests_dump_cprofile_stats(make_app, tmp_path):
+    """Test that requests picked by the sample rate leave a .prof file"""
+    output_dir = tmp_path / 'profiles'
+    client = make_app(PROFILE_REQUEST_SAMPLE_RATE=1.0, PROFILER_OUTPUT_DIR=str(output_dir)).test_client()
+
+    client.get('/health')
+
+    assert [name for name in os.listdir(output_dir) if name.startswith('request-health_check-')]
+
+
+def test_signal_writes_profile_file(make_app, tmp_path):
+    """Test that the profiling signal writes a collapsed-stack file in the background"""
+    output_dir = tmp_path / 'profiles'
+    make_app(PROFILER_ENABLED=True, PROFILER_SIGNAL_SECONDS=0.1, PROFILER_OUTPUT_DIR=str(output_dir))
+    previous = signal.getsignal(signal.SIGUSR2)
+    try:
+        profiler.install_signal_handler()
+        os.kill(os.getpid(), signal.SIGUSR2)
+        deadline = time.time() + 5
+        while time.time() < deadline and not (output_dir.exists() and os.listdir(output_dir)):
+            time.sleep(0.05)
+    finally:
+        signal.signal(signal.SIGUSR2, previous)
+
+    assert [name for name in os.listdir(output_dir) if name.endswith('.collapsed')]
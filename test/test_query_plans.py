@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import pytest
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import create_engine, text
+
+sys.path.append(str(Path(__file__).parent.parent / 'scripts'))
+from init_stored_procedures import STORED_PROCEDURES
+from generate_data import DatasetSpec, generate
+
+# Plan checks need a real PostgreSQL database migrated to the latest revision
+TEST_DATABASE_URI = os.environ.get('TEST_DATABASE_URI')
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URI,
+    reason='TEST_DATABASE_URI is not set to a migrated PostgreSQL database'
+)
+
+# Same generator as the benchmarks, at a size where the planner prefers indexes
+SEED_SPEC = DatasetSpec(
+    users=500,
+    products=200,
+    orders=60000,
+    mean_lines=3,
+    days=365,
+    end_date=datetime.utcnow().date(),
+    prefix='plan',
+    chunk_size=20000,
+)
+
+
+def _seq_scans(plan):
+    """Yield the relation names of every sequential scan in a JSON plan tree"""
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name']
+    for child in plan.get('Plans', []):
+        yield from _seq_scans(child)
+
+
+@pytest.fixture(scope='module')
+def seeded_connection():
+    """Seed a dataset inside a transaction that is rolled back afterwards"""
+    engine = create_engine(TEST_DATABASE_URI)
+    with engine.connect() as connection:
+        transaction = connection.begin()
+
+        for sql in STORED_PROCEDURES.values():
+            connection.execute(text(sql))
+
+        cursor = connection.connection.cursor()
+        generate(cursor, SEED_SPEC)
+        cursor.close()
+        connection.execute(text("ANALYZE users, products, orders, order_products"))
+
+        yield connection
+
+        transaction.rollback()
+    engine.dispose()
+
+
+@pytest.fixture(scope='module')
+def plan_ids(seeded_connection):
+    """A generated user with its ten most recent order ids"""
+    user_id = seeded_connection.execute(text("""
+    SELECT id FROM users WHERE email = 'plan-user-1@example.com'
+    """)).scalar()
+    order_ids = seeded_connection.execute(text("""
+    SELECT id FROM orders WHERE user_id = :user_id ORDER BY created_at DESC LIMIT 10
+    """), {"user_id": user_id}).scalars().all()
+    return {"user_id": user_id, "order_ids": order_ids}
+
+
+@pytest.fixture(scope='module')
+def populated_relations(seeded_connection):
+    """Names of order tables and partitions that actually hold rows"""
+    result = seeded_connection.execute(text("""
+    SELECT relname FROM pg_class
+    WHERE relkind = 'r' AND reltuples > 0
+    AND (relname LIKE 'orders%' OR relname LIKE 'order_products%')
+    """))
+    return {row.relname for row in result}
+
+
+def assert_no_seq_scans(connection, populated_relations, query, params):
+    plan = connection.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scanned = set(_seq_scans(plan[0]['Plan'])) & populated_relations
+    assert not scanned, f"Sequential scan on {sorted(scanned)} for: {query.strip()}"
+
+
+def test_get_user_orders_uses_index(seeded_connection, populated_relations, plan_ids):
+    """Test that a user's recent orders are read through the covering index"""
+    today = datetime.utcnow()
+    assert_no_seq_scans(
+        seeded_connection,
+        populated_relations,
+        "SELECT * FROM get_user_orders(:user_id, NULL, :start_date, :end_date)",
+        {
+            "user_id": plan_ids["user_id"],
+            "start_date": today - timedelta(days=30),
+            "end_date": today
+        }
+    )
+
+
+def test_get_order_by_id_uses_index(seeded_connection, populated_relations, plan_ids):
+    """Test that a single order lookup never scans whole partitions"""
+    assert_no_seq_scans(
+        seeded_connection,
+        populated_relations,
+        "SELECT * FROM get_order_byId(:order_id, :user_id)",
+        {"order_id": plan_ids["order_ids"][0], "user_id": plan_ids["user_id"]}
+    )
+
+
+def test_get_order_products_by_ids_uses_index(seeded_connection, populated_relations, plan_ids):
+    """Test that order lines for a page of orders come from the order_id index"""
+    assert_no_seq_scans(
+        seeded_connection,
+        populated_relations,
+        "SELECT * FROM get_order_products_by_ids(:order_ids_csv)",
+        {"order_ids_csv": ','.join(plan_ids["order_ids"])}
+    )
+
+
+def test_product_sales_report_uses_index(seeded_connection, populated_relations, plan_ids):
+    """Test that the monthly product report prunes partitions and uses indexes"""
+    today = datetime.utcnow()
+    assert_no_seq_scans(
+        seeded_connection,
+        populated_relations,
+        "SELECT * FROM get_product_sales_report(:user_id, :start_date, :end_date)",
+        {
+            "user_id": plan_ids["user_id"],
+            "start_date": today - timedelta(days=30),
+            "end_date": today
+        }
+    )
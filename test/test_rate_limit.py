@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import event
+from app.extensions import db
+from app.utils.rate_limit import MemoryRateLimitStore, SQLiteRateLimitStore
+
+WINDOW = 60
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Each backend"""
+    if request.param == 'sqlite':
+        return SQLiteRateLimitStore(str(tmp_path / 'limits.db'), max_keys=100)
+    return MemoryRateLimitStore(max_keys=100)
+
+
+def test_store_allows_limit_per_window(store):
+    """Test that a key gets `limit` requests, then a wait until the window slides past them"""
+    limits = [('email:a@example.com', 3)]
+    assert [store.hit(limits, WINDOW, 600 + i) for i in range(3)] == [0, 0, 0]
+
+    wait = store.hit(limits, WINDOW, 630)
+    # At 680 the three weigh as two in the next window
+    assert wait == 50
+    assert store.hit(limits, WINDOW, 630 + wait - 1) > 0
+    assert store.hit(limits, WINDOW, 630 + wait) == 0
+
+
+def test_store_weights_previous_window(store):
+    """Test that requests late in the previous window still count early in the next one"""
+    limits = [('ip:10.0.0.1', 4)]
+    for i in range(4):
+        assert store.hit(limits, WINDOW, 650 + i) == 0
+
+    # At 660 the four count fully, at 675 as three
+    assert store.hit(limits, WINDOW, 660) == 15
+    assert store.hit(limits, WINDOW, 675) == 0
+
+
+def test_store_counts_nothing_when_one_key_is_over(store):
+    """Test that a request rejected for one key is not counted against the others"""
+    assert store.hit([('ip:10.0.0.1', 10), ('email:a@example.com', 1)], WINDOW, 600) == 0
+    assert store.hit([('ip:10.0.0.1', 10), ('email:a@example.com', 1)], WINDOW, 601) > 0
+    for i in range(9):
+        assert store.hit([('ip:10.0.0.1', 10), (f'email:{i}@example.com', 1)], WINDOW, 602) == 0
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    """Test that two stores on the same file share their counters"""
+    path = str(tmp_path / 'limits.db')
+    limits = [('email:a@example.com', 2)]
+    assert SQLiteRateLimitStore(path, 100).hit(limits, WINDOW, 600) == 0
+    assert SQLiteRateLimitStore(path, 100).hit(limits, WINDOW, 601) == 0
+    assert SQLiteRateLimitStore(path, 100).hit(limits, WINDOW, 602) > 0
+
+
+def test_throttled_login_does_not_query(make_app):
+    """Test that a login over the per-email limit gets 429 without reaching the database"""
+    app = make_app(LOGIN_RATE_LIMIT_PER_EMAIL=2)
+    client = app.test_client()
+    for _ in range(2):
+        client.post('/api/auth/login', json={'email': 'Jane@example.com'})
+
+    queries = []
+    record = lambda *args: queries.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        response = client.post('/api/auth/login', json={'email': 'jane@example.com'})
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 429
+    assert response.get_json()['error'] == 'rate_limited'
+    assert int(response.headers['Retry-After']) > 0
+    assert queries == []
+
+
+def test_limits_below_one_are_refused(make_app):
+    """Test that a zero limit fails at startup instead of letting every login through"""
+    with pytest.raises(ValueError, match='LOGIN_RATE_LIMIT_PER_IP'):
+        make_app(LOGIN_RATE_LIMIT_PER_IP=0)
+
+
+def test_clients_behind_a_trusted_proxy_are_counted_apart(make_app):
+    """Test that with PROXY_FIX_X_FOR each forwarded client has its own per-IP counter"""
+    client = make_app(LOGIN_RATE_LIMIT_PER_IP=1, PROXY_FIX_X_FOR=1).test_client()
+    proxy = {'REMOTE_ADDR': '10.0.0.1'}
+
+    first = client.post('/api/auth/login', json={'email': 'a@example.com'},
+                        headers={'X-Forwarded-For': '203.0.113.1'}, environ_base=proxy)
+    other = client.post('/api/auth/login', json={'email': 'b@example.com'},
+                        headers={'X-Forwarded-For': '203.0.113.2'}, environ_base=proxy)
+    again = client.post('/api/auth/login', json={'email': 'c@example.com'},
+                        headers={'X-Forwarded-For': '203.0.113.1'}, environ_base=proxy)
+    assert first.status_code != 429
+    assert other.status_code != 429
+    assert again.status_code == 429
@@ -0,0 +1,138 @@
+import uuid
+import pytest
+from datetime import date
+from flask_jwt_extended import create_access_token
+from app.api import reports
+from app.extensions import db, report_cache
+from app.schemas import OrderCreate
+from app.utils.order_writer import write_order
+from app.utils.report_cache import MemoryReportStore, SQLiteReportStore, ReportCache
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Each backend with room for three entries"""
+    if request.param == 'sqlite':
+        return SQLiteReportStore(str(tmp_path / 'reports.db'), max_entries=3)
+    return MemoryReportStore(max_entries=3)
+
+
+def test_store_round_trip(store):
+    """Test that a stored report page is returned for the same key"""
+    key = ('user-1', '2026-01-01', '2026-01-31', 1, 10, 1)
+    store.set(key, {"products": [{"product_name": "Coffee"}]}, None)
+    assert store.get(key, 0) == {"products": [{"product_name": "Coffee"}]}
+
+
+def test_store_evicts_least_recently_used(store):
+    """Test that the oldest untouched entry is evicted first"""
+    keys = [('user-1', f'2026-0{month}-01', f'2026-0{month}-28', 1, 10, 1) for month in range(1, 5)]
+    for key in keys[:3]:
+        store.set(key, {"month": key[1]}, None)
+
+    # Touch the first entry so the second becomes least recently used
+    assert store.get(keys[0], 0) is not None
+    store.set(keys[3], {"month": keys[3][1]}, None)
+
+    assert store.get(keys[1], 0) is None
+    assert store.get(keys[0], 0) is not None
+    assert store.get(keys[3], 0) is not None
+
+
+def test_store_invalidates_ranges_containing_day(store):
+    """Test that invalidation only drops the user's ranges that contain the day"""
+    january = ('user-1', '2026-01-01', '2026-01-31', 1, 10, 1)
+    february = ('user-1', '2026-02-01', '2026-02-28', 1, 10, 1)
+    other_user = ('user-2', '2026-01-01', '2026-01-31', 1, 10, 1)
+    for key in (january, february, other_user):
+        store.set(key, {}, None)
+
+    assert store.invalidate('user-1', '2026-01-15') == 1
+    assert store.get(january, 0) is None
+    assert store.get(february, 0) is not None
+    assert store.get(other_user, 0) is not None
+
+
+def test_store_expires_entries(store):
+    """Test that entries past their expiry are treated as misses"""
+    key = ('user-1', '2026-01-01', '2026-01-31', 1, 10, 1)
+    store.set(key, {}, 100.0)
+    assert store.get(key, 99.0) is not None
+    assert store.get(key, 100.0) is None
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    """Test that two stores on the same file see each other's writes and invalidations"""
+    path = str(tmp_path / 'reports.db')
+    first, second = SQLiteReportStore(path, 10), SQLiteReportStore(path, 10)
+    key = ('user-1', '2026-01-01', '2026-01-31', 1, 10, 1)
+
+    first.set(key, {"total_records": 2}, None)
+    assert second.get(key, 0) == {"total_records": 2}
+
+    second.invalidate('user-1', '2026-01-31')
+    assert first.get(key, 0) is None
+
+
+def test_new_workers_keep_the_shared_entries(tmp_path):
+    """Test that opening the store in another worker does not reset the file"""
+    path = str(tmp_path / 'reports.db')
+    first = SQLiteReportStore(path, 10)
+    key = ('user-1', '2026-01-01', '2026-01-31', 1, 10, 1)
+    first.set(key, {"total_records": 2}, None)
+
+    assert SQLiteReportStore(path, 10).get(key, 0) == {"total_records": 2}
+    assert first.get(key, 0) == {"total_records": 2}
+
+
+def test_open_ranges_get_a_ttl(make_app):
+    """Test that ranges ending today expire while closed ranges do not"""
+    cache = ReportCache(make_app(REPORT_CACHE_OPEN_TTL=30))
+    today = date.today().isoformat()
+
+    cache.set(cache.make_key('user-1', '2020-01-01', '2020-01-31', 1, 10, 1), {})
+    cache.set(cache.make_key('user-1', today, today, 1, 10, 1), {})
+
+    entries = cache.store._entries
+    assert entries[('user-1', '2020-01-01', '2020-01-31', 1, 10, 1)][1] is None
+    assert entries[('user-1', today, today, 1, 10, 1)][1] is not None
+
+
+def test_report_endpoint_serves_cached_page(make_app, monkeypatch):
+    """Test that a cached report page is returned without querying the database"""
+    app = make_app(HTTP_CACHE_ENABLED=False)
+    monkeypatch.setattr(reports, 'get_user_version', lambda user_id: (1, None))
+    cached = {
+        "start_date": "2026-01-01",
+        "end_date": "2026-01-31",
+        "page": 1,
+        "page_size": 10,
+        "total_pages": 1,
+        "total_records": 1,
+        "products": [{"product_name": "Coffee", "total_quantity": 3, "total_price": 10.5}]
+    }
+    report_cache.set(report_cache.make_key('user-1', '2026-01-01', '2026-01-31', 1, 10, 1), cached)
+
+    with app.app_context():
+        token = create_access_token(identity='user-1')
+    response = app.test_client().get(
+        '/api/reports/products?start_date=2026-01-01&end_date=2026-01-31',
+        headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == 200
+    assert response.get_json()['report'] == cached
+
+
+def test_orders_written_elsewhere_reach_cached_reports(pg_app, pg_user):
+    """Test that an order written outside the request (as by the drain worker) is not hidden by the cache"""
+    client = pg_app.test_client()
+    order = {'customer_name': 'Cache Customer', 'products': [{'name': 'Cache Widget', 'price': 3.0, 'quantity': 1}]}
+    assert client.post('/api/orders', json=order, headers=pg_user['headers']).status_code == 200
+    first = client.get('/api/reports/products', headers=pg_user['headers']).get_json()['report']
+    assert first['products'][0]['total_quantity'] == 1
+
+    # No invalidation in this process; only the data version changes
+    with pg_app.app_context(), db.engine.begin() as connection:
+        write_order(connection, pg_user['id'], OrderCreate.model_validate(order), order_id=str(uuid.uuid4()))
+    second = client.get('/api/reports/products', headers=pg_user['headers']).get_json()['report']
+    assert second['products'][0]['total_quantity'] == 2
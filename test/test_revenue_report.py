@@ -0,0 +1,143 @@
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, text
+from app.extensions import db, revenue_cache
+from app.schemas import OrderCreate
+from app.utils.order_writer import write_order
+from app.utils.revenue_cache import RevenueCache, bucket_start, bucket_starts
+
+
+def test_buckets_align_like_date_trunc():
+    """Test that bucket starts match date_trunc, with weeks starting on Monday"""
+    moment = datetime(2026, 10, 22, 14, 35, 12)
+    assert bucket_start(moment, 'hour') == datetime(2026, 10, 22, 14)
+    assert bucket_start(moment, 'day') == datetime(2026, 10, 22)
+    assert bucket_start(moment, 'week') == datetime(2026, 10, 19)
+    assert bucket_starts(datetime(2026, 10, 1), datetime(2026, 10, 14, 23, 59, 59), 'week') == [
+        datetime(2026, 9, 28), datetime(2026, 10, 5), datetime(2026, 10, 12)
+    ]
+
+
+def test_only_closed_buckets_are_cached():
+    """Test that open buckets are not stored and a new history version misses the cache"""
+    cache = RevenueCache()
+    now = datetime(2026, 10, 22, 14, 35)
+    closed, current = bucket_start(now - timedelta(days=2), 'day'), bucket_start(now, 'day')
+    cache.set_many('user-1', 'day', {closed: (3, Decimal('12.50')), current: (1, Decimal('2.00'))}, 7, now)
+
+    assert cache.get_many('user-1', 'day', [closed, current], 7) == {closed: (3, Decimal('12.50'))}
+    assert cache.get_many('user-1', 'day', [closed], 8) == {}
+
+
+def test_grace_is_measured_on_the_given_clock():
+    """Test that a bucket closes REVENUE_CACHE_GRACE_SECONDS after it ends on the clock passed in"""
+    cache = RevenueCache()
+    start = datetime(2026, 10, 22, 13)
+    assert not cache.is_closed(start, 'hour', datetime(2026, 10, 22, 14, 4, 59))
+    assert cache.is_closed(start, 'hour', datetime(2026, 10, 22, 14, 5))
+
+
+def test_revenue_rejects_unknown_bucket(make_app):
+    """Test that bucket must be hour, day or week and ranges are bounded"""
+    app = make_app()
+    client = app.test_client()
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+    assert client.get('/api/reports/revenue?bucket=month', headers=headers).status_code == 400
+    response = client.get('/api/reports/revenue?bucket=hour&start_date=2020-01-01&end_date=2026-01-01', headers=headers)
+    assert response.status_code == 400
+
+
+def test_weekly_range_is_widened_to_whole_weeks(pg_app, pg_user):
+    """Test that the echoed range covers the orders counted in the first and last weeks"""
+    client = pg_app.test_client()
+    order = {'customer_name': 'Revenue Customer', 'products': [{'name': 'Revenue Widget', 'price': 4.0, 'quantity': 2}]}
+    with pg_app.app_context(), db.engine.begin() as connection:
+        # Monday, before the Wednesday the range starts on
+        write_order(connection, pg_user['id'], OrderCreate.model_validate(order),
+                    order_id=str(uuid.uuid4()), created_at=datetime(2026, 9, 28, 10))
+
+    url = '/api/reports/revenue?bucket=week&start_date=2026-09-30&end_date=2026-10-06'
+    report = client.get(url, headers=pg_user['headers']).get_json()['report']
+    assert (report['start_date'], report['end_date']) == ('2026-09-28', '2026-10-11')
+    assert [bucket['start'][:10] for bucket in report['buckets']] == ['2026-09-28', '2026-10-05']
+    assert report['total_orders'] == 1
+
+
+def test_revenue_buckets_and_cached_history(pg_app, pg_user):
+    """Test daily buckets over a range with history, and that closed days are served from the cache"""
+    client = pg_app.test_client()
+    order = {'customer_name': 'Revenue Customer', 'products': [{'name': 'Revenue Widget', 'price': 4.0, 'quantity': 2}]}
+    with pg_app.app_context(), db.engine.begin() as connection:
+        # Placed three days ago
+        write_order(connection, pg_user['id'], OrderCreate.model_validate(order),
+                    order_id=str(uuid.uuid4()), created_at=datetime.utcnow() - timedelta(days=3))
+    assert client.post('/api/orders', json=order, headers=pg_user['headers']).status_code == 200
+
+    today = date.today()
+    url = f"/api/reports/revenue?bucket=day&start_date={today - timedelta(days=6)}&end_date={today}"
+    report = client.get(url, headers=pg_user['headers']).get_json()['report']
+    assert len(report['buckets']) == 7
+    assert report['total_orders'] == 2
+    assert report['total_revenue'] == 16.0
+    by_day = {bucket['start'][:10]: bucket for bucket in report['buckets']}
+    assert by_day[(today - timedelta(days=3)).isoformat()]['order_count'] == 1
+    assert by_day[today.isoformat()]['revenue'] == 8.0
+
+    # Only today's bucket is still open: the query starts there
+    params = []
+    record = lambda conn, cursor, statement, parameters, *args: params.append(parameters)
+    with pg_app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        again = client.get(url, headers=pg_user['headers']).get_json()['report']
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert again == report
+    revenue_queries = [p for p in params if isinstance(p, dict) and p.get('bucket') == 'day']
+    assert len(revenue_queries) == 1
+    assert revenue_queries[0]['start_date'] == datetime.combine(today, datetime.min.time())
+
+
+def test_backdated_orders_reach_cached_buckets(pg_app, pg_user):
+    """Test that an order written into a closed bucket after it was cached shows up"""
+    client = pg_app.test_client()
+    order = {'customer_name': 'Revenue Customer', 'products': [{'name': 'Revenue Widget', 'price': 4.0, 'quantity': 2}]}
+    today = date.today()
+    url = f"/api/reports/revenue?bucket=day&start_date={today - timedelta(days=6)}&end_date={today}"
+    before = client.get(url, headers=pg_user['headers']).get_json()['report']
+    assert before['total_orders'] == 0
+
+    # Written later, as the write-behind queue or another worker would
+    with pg_app.app_context(), db.engine.begin() as connection:
+        write_order(connection, pg_user['id'], OrderCreate.model_validate(order),
+                    order_id=str(uuid.uuid4()), created_at=datetime.now() - timedelta(days=2))
+
+    after = client.get(url, headers=pg_user['headers']).get_json()['report']
+    assert after['total_orders'] == 1
+    by_day = {bucket['start'][:10]: bucket for bucket in after['buckets']}
+    assert by_day[(today - timedelta(days=2)).isoformat()]['revenue'] == 8.0
+
+
+def test_revenue_totals_are_exact(pg_app, pg_user):
+    """Test that cached and fresh buckets are added up as decimals"""
+    client = pg_app.test_client()
+    today = date.today()
+    with pg_app.app_context(), db.engine.begin() as connection:
+        for days_ago, price in ((3, 0.1), (2, 0.2), (1, 0.3)):
+            order = {'customer_name': 'Revenue Customer', 'products': [{'name': f'Revenue Cent {days_ago}', 'price': price, 'quantity': 1}]}
+            write_order(connection, pg_user['id'], OrderCreate.model_validate(order),
+                        order_id=str(uuid.uuid4()), created_at=datetime.now() - timedelta(days=days_ago))
+
+    url = f"/api/reports/revenue?bucket=day&start_date={today - timedelta(days=3)}&end_date={today}"
+    # The second request adds up cached buckets
+    for _ in range(2):
+        report = client.get(url, headers=pg_user['headers']).get_json()['report']
+        assert report['total_revenue'] == 0.6
+    with pg_app.app_context(), db.engine.connect() as connection:
+        history_version = connection.execute(
+            text("SELECT history_version FROM get_user_data_version(:user_id)"), {"user_id": pg_user['id']}
+        ).scalar()
+    yesterday = bucket_start(datetime.now() - timedelta(days=1), 'day')
+    cached = revenue_cache.get_many(pg_user['id'], 'day', [yesterday], history_version)
+    assert cached == {yesterday: (1, Decimal('0.30'))}
@@ -0,0 +1,76 @@
+import pytest
+from pydantic import ValidationError
+from app.schemas import DateRangeParams, OrderCreate, OrderCreateList, OrderList, UserCreate
+from app.utils.helpers import format_error_message
+
+ORDER = {
+    'customer_name': 'Jane Doe',
+    'products': [{'name': 'Coffee', 'price': 3.5, 'quantity': 2}]
+}
+
+
+def messages(model, data):
+    with pytest.raises(ValidationError) as excinfo:
+        model.model_validate(data)
+    return [format_error_message(err) for err in excinfo.value.errors()]
+
+
+@pytest.mark.parametrize('name, message', [
+    ('Jane1', 'customer_name: Value error, must contain only letters and spaces - no numbers or symbols'),
+    ('TRUE', 'customer_name: Value error, cannot be the string "True" or "False"'),
+    ('Jo', 'customer_name: String should have at least 3 characters'),
+    (7, 'customer_name: Input should be a valid string'),
+])
+def test_customer_name_errors(name, message):
+    """Test that name checks keep their error messages"""
+    assert messages(OrderCreate, {**ORDER, 'customer_name': name}) == [message]
+
+
+def test_order_lines_are_validated_per_field():
+    """Test that order line errors point at the line field"""
+    products = [{'name': 'false', 'price': 3.5, 'quantity': 2}, {'name': 'Tea', 'price': 1, 'quantity': 1, 'size': 'L'}]
+    assert messages(OrderCreate, {**ORDER, 'products': products}) == [
+        'name: Value error, cannot be the string "True" or "False"',
+        'size: Extra inputs are not permitted',
+    ]
+    assert messages(OrderCreate, {**ORDER, 'products': []}) == [
+        'products: List should have at least 1 item after validation, not 0'
+    ]
+
+
+def test_order_lines_are_plain_dicts():
+    """Test that validated lines are dicts, as the order writer reads them"""
+    order = OrderCreate.model_validate(ORDER)
+    assert order.products == ORDER['products']
+    assert order.model_dump() == ORDER
+
+
+@pytest.mark.parametrize('value, valid', [
+    ('2026-01-05', True), ('2026-1-5', True), ('2026-02-30', False),
+    ('2026/01/05', False), ('20260105', False), ('2026-01-05x', False),
+])
+def test_date_format(value, valid):
+    """Test that dates accept the same inputs as strptime('%Y-%m-%d')"""
+    for model in (DateRangeParams, OrderList):
+        if valid:
+            assert model(start_date=value).start_date == value
+        else:
+            assert messages(model, {'start_date': value}) == ['start_date: Value error, Date must be in YYYY-MM-DD format']
+
+
+def test_user_name_rules():
+    """Test that user names use the same checks as customer names"""
+    assert UserCreate.model_validate({'name': 'Jane Doe', 'email': 'jane@example.com'}).name == 'Jane Doe'
+    assert messages(UserCreate, {'name': 'Jane_Doe', 'email': 'jane@example.com'}) == [
+        'name: Value error, must contain only letters and spaces - no numbers or symbols'
+    ]
+
+
+def test_order_list_adapter():
+    """Test that the list adapter returns models and locates errors by index"""
+    orders = OrderCreateList.validate_python([ORDER, ORDER])
+    assert all(isinstance(order, OrderCreate) for order in orders)
+
+    with pytest.raises(ValidationError) as excinfo:
+        OrderCreateList.validate_python([ORDER, {**ORDER, 'customer_name': 'X1'}])
+    assert {err['loc'][0] for err in excinfo.value.errors()} == {1}
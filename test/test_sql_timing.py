@@ -0,0 +1,59 @@
+import json
+import logging
+from sqlalchemy import event, text
+from app.extensions import db, sql_timing
+from app.utils.sql_timing import describe_statement
+
+
+def add_query_route(app, statements=2):
+    @app.route('/_sql')
+    def run_queries():
+        with db.engine.connect() as connection:
+            for _ in range(statements):
+                connection.execute(text("SELECT 1"))
+        return {'status': 'ok'}
+
+
+def test_describe_statement_names_the_procedure():
+    """Test that statements are labelled by the stored procedure they call"""
+    assert describe_statement("\n SELECT * FROM get_user_orders(\n :user_id)") == 'get_user_orders'
+    assert describe_statement("SELECT COUNT(*) FROM get_product_sales_report(%(a)s)") == 'get_product_sales_report'
+    assert describe_statement("SELECT   1") == 'SELECT 1'
+
+
+def test_server_timing_reports_statements(make_app):
+    """Test that the Server-Timing header carries statement count and DB time"""
+    app = make_app(SQL_TIMING_ENABLED=True, SLOW_REQUEST_THRESHOLD_MS=60000)
+    add_query_route(app, statements=3)
+
+    response = app.test_client().get('/_sql')
+
+    header = response.headers['Server-Timing']
+    assert 'db;dur=' in header
+    assert 'desc="3 statements"' in header
+    assert 'db-slowest;dur=' in header
+
+
+def test_slow_requests_are_logged(make_app, caplog):
+    """Test that requests over the threshold emit one structured log line"""
+    app = make_app(SQL_TIMING_ENABLED=True, SLOW_REQUEST_THRESHOLD_MS=0)
+    add_query_route(app)
+
+    with caplog.at_level(logging.WARNING, logger='app.utils.sql_timing'):
+        app.test_client().get('/_sql')
+
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.name == 'app.utils.sql_timing']
+    assert len(records) == 1
+    assert records[0]['event'] == 'slow_request'
+    assert records[0]['path'] == '/_sql'
+    assert records[0]['statements'] == 2
+
+
+def test_disabled_timing_registers_nothing(make_app):
+    """Test that no listeners or headers are added when the feature is off"""
+    app = make_app(SQL_TIMING_ENABLED=False)
+    add_query_route(app)
+
+    with app.app_context():
+        assert not event.contains(db.engine, 'before_cursor_execute', sql_timing._before_cursor_execute)
+    assert 'Server-Timing' not in app.test_client().get('/_sql').headers
@@ -0,0 +1,38 @@
+from flask_jwt_extended import create_access_token
+
+
+def test_team_report_is_limited_to_managers(make_app):
+    """Test that only REPORT_MANAGER_USER_IDS get the team report and user_ids are validated"""
+    app = make_app(REPORT_MANAGER_USER_IDS='user-0, USER-1')
+    client = app.test_client()
+    with app.app_context():
+        manager = {'Authorization': f"Bearer {create_access_token(identity='user-1')}"}
+        # The email of a manager does not make the token a manager's
+        member = {'Authorization': f"Bearer {create_access_token(identity='user-2', additional_claims={'email': 'user-1'})}"}
+
+    assert client.get('/api/reports/products/team', headers=member).status_code == 403
+    response = client.get('/api/reports/products/team?user_ids=not-a-uuid', headers=manager)
+    assert response.status_code == 400
+    assert client.get('/api/reports/products/team?page_size=500', headers=manager).status_code == 400
+
+
+def test_team_report_sums_the_listed_users(pg_app, pg_user):
+    """Test that the team report aggregates the orders of the listed users in one paginated query"""
+    pg_app.config['REPORT_MANAGER_USER_IDS'] = pg_user['id']
+    client = pg_app.test_client()
+    order = {'customer_name': 'Team Customer', 'products': [
+        {'name': 'Team Widget', 'price': 2.5, 'quantity': 4},
+        {'name': 'Team Gadget', 'price': 10.0, 'quantity': 1},
+    ]}
+    for _ in range(2):
+        assert client.post('/api/orders', json=order, headers=pg_user['headers']).status_code == 200
+
+    response = client.get(f"/api/reports/products/team?user_ids={pg_user['id']}&page_size=1", headers=pg_user['headers'])
+    assert response.status_code == 200
+    report = response.get_json()['report']
+    assert report['total_records'] == 2
+    assert report['total_pages'] == 2
+    assert report['products'] == [{'product_name': 'Team Widget', 'total_quantity': 8, 'total_price': 20.0}]
+
+    past_end = client.get(f"/api/reports/products/team?user_ids={pg_user['id']}&page=5", headers=pg_user['headers'])
+    assert past_end.get_json()['report']['total_records'] == 2
@@ -0,0 +1,106 @@
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask_jwt_extended import decode_token
+from sqlalchemy import event, text
+from app.extensions import db, token_blocklist
+from app.utils.token_blocklist import BloomFilter, TokenBlocklist
+
+RevokedRow = namedtuple('RevokedRow', ['jti', 'revoked_at'])
+
+
+def blocklist_engine(fake_engine, rows):
+    """Answers get_revoked_tokens_since with `rows` and is_token_revoked from them"""
+    return fake_engine(rows, scalar=lambda params: any(row.jti == params['jti'] for row in rows))
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """Test that every added value is found and few others are"""
+    bloom = BloomFilter(1000, 0.01)
+    added = [str(uuid.uuid4()) for _ in range(1000)]
+    for value in added:
+        bloom.add(value)
+
+    assert all(value in bloom for value in added)
+    false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_unrevoked_tokens_need_no_query(fake_engine):
+    """Test that after a sync a token missing from the filter is accepted without a query"""
+    revoked = RevokedRow('revoked-jti', datetime(2026, 1, 1))
+    engine = blocklist_engine(fake_engine, [revoked])
+    blocklist = TokenBlocklist()
+    blocklist.refresh_seconds = 60
+
+    assert blocklist.is_revoked('revoked-jti', engine)
+    queries = len(engine.calls)
+    assert not blocklist.is_revoked('other-jti', engine)
+    assert blocklist.is_revoked('revoked-jti', engine)
+    assert len(engine.calls) == queries
+
+
+def test_filter_is_rebuilt_when_full(fake_engine):
+    """Test that a filter past its capacity is reloaded into a larger one"""
+    start = datetime(2026, 1, 1)
+    engine = blocklist_engine(fake_engine, [RevokedRow(f'jti-{i}', start + timedelta(seconds=i)) for i in range(5)])
+    blocklist = TokenBlocklist()
+    blocklist.capacity = 4
+    blocklist.refresh(engine)
+
+    blocklist.refresh(engine)
+    assert blocklist.capacity == 8
+    assert engine.calls[-1]['since'] == datetime.min
+    assert all(blocklist.is_revoked(f'jti-{i}', engine) for i in range(5))
+
+
+def test_failed_refresh_keeps_filter(fake_engine):
+    """Test that a refresh error keeps the tokens already loaded"""
+    engine = blocklist_engine(fake_engine, [RevokedRow('revoked-jti', datetime(2026, 1, 1))])
+    blocklist = TokenBlocklist()
+    blocklist.refresh(engine)
+
+    engine.fail = True
+    blocklist.refresh(engine)
+    assert blocklist.is_revoked('revoked-jti', engine)
+
+
+def test_logout_revokes_token(pg_app, pg_user):
+    """Test that a logged out token is rejected while a new login works"""
+    client = pg_app.test_client()
+    response = client.post('/api/auth/logout', headers=pg_user['headers'])
+    assert response.status_code == 200
+
+    response = client.get('/api/auth/verify', headers=pg_user['headers'])
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'token_revoked'
+
+    token = client.post('/api/auth/login', json={'email': pg_user['email']}).get_json()['access_token']
+    assert client.get('/api/auth/verify', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+
+
+def test_revocation_reaches_other_workers(pg_app, pg_user):
+    """Test that a token revoked elsewhere is rejected after the next sync, and others need no query"""
+    client = pg_app.test_client()
+    token_blocklist.refresh_seconds = 3600
+    assert client.get('/api/auth/verify', headers=pg_user['headers']).status_code == 200
+
+    queries = []
+    record = lambda *args: queries.append(args[2])
+    with pg_app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        assert client.get('/api/auth/verify', headers=pg_user['headers']).status_code == 200
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert queries == []
+
+    with pg_app.app_context(), db.engine.begin() as connection:
+        # Revoked by another worker: this one only learns about it by syncing
+        jti = decode_token(pg_user['headers']['Authorization'].split()[1])['jti']
+        connection.execute(
+            text("SELECT revoke_token(:jti, :user_id, :expires_at)"),
+            {"jti": jti, "user_id": pg_user['id'], "expires_at": datetime.utcnow() + timedelta(hours=1)}
+        )
+    assert client.get('/api/auth/verify', headers=pg_user['headers']).status_code == 200
+
+    token_blocklist.refresh_seconds = 0
+    assert client.get('/api/auth/verify', headers=pg_user['headers']).status_code == 401
@@ -0,0 +1,84 @@
+from collections import namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+from app.extensions import db, token_versions
+from app.utils.token_versions import TokenVersions
+
+VersionRow = namedtuple('VersionRow', ['user_id', 'version', 'updated_at'])
+
+
+def test_older_versions_are_rejected(fake_engine):
+    """Test that a token is current only from the user's latest version on"""
+    engine = fake_engine([VersionRow('user-1', 2, datetime(2026, 1, 1))])
+    versions = TokenVersions()
+    versions.refresh_seconds = 60
+
+    assert not versions.is_current('user-1', 1, engine)
+    assert versions.is_current('user-1', 2, engine)
+    assert versions.is_current('user-2', 0, engine)
+    assert len(engine.calls) == 1
+
+
+def test_refresh_is_incremental(fake_engine):
+    """Test that later refreshes only ask for versions near or after the newest one seen"""
+    updated_at = datetime(2026, 1, 1, 12, 0)
+    engine = fake_engine([VersionRow('user-1', 1, updated_at)])
+    versions = TokenVersions()
+    versions.refresh(engine)
+
+    engine.rows = [VersionRow('user-1', 1, updated_at), VersionRow('user-2', 3, updated_at + timedelta(seconds=5))]
+    versions.refresh(engine)
+    assert engine.calls[0]['since'] == datetime.min
+    assert engine.calls[1]['since'] < updated_at
+    assert not versions.is_current('user-2', 2, engine)
+
+
+def test_failed_refresh_keeps_table(fake_engine):
+    """Test that a refresh error keeps the versions already loaded"""
+    engine = fake_engine([VersionRow('user-1', 1, datetime(2026, 1, 1))])
+    versions = TokenVersions()
+    versions.refresh(engine)
+
+    engine.fail = True
+    versions.refresh(engine)
+    assert not versions.is_current('user-1', 0, engine)
+
+
+def test_verify_reads_claims(pg_app, pg_user):
+    """Test that /verify answers from the token without querying the database"""
+    client = pg_app.test_client()
+    token_versions.refresh_seconds = 3600
+    client.get('/api/auth/verify', headers=pg_user['headers'])
+
+    queries = []
+    record = lambda *args: queries.append(args[2])
+    with pg_app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', record)
+        response = client.get('/api/auth/verify', headers=pg_user['headers'])
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert response.status_code == 200
+    user = response.get_json()['user']
+    assert user['id'] == pg_user['id']
+    assert user['email'] == pg_user['email']
+    assert user['name'] == pg_user['name']
+    assert queries == []
+
+
+def test_revoked_token_is_rejected(pg_app, pg_user):
+    """Test that revoking a user's tokens rejects the old token and a new login works"""
+    client = pg_app.test_client()
+    token_versions.refresh_seconds = 0
+    assert client.get('/api/auth/verify', headers=pg_user['headers']).status_code == 200
+
+    with pg_app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("SELECT revoke_user_tokens(:id)"), {"id": pg_user['id']})
+
+    response = client.get('/api/auth/verify', headers=pg_user['headers'])
+    assert response.status_code == 401
+    assert response.get_json()['error'] == 'token_revoked'
+    assert client.get('/api/orders', headers=pg_user['headers']).status_code == 401
+
+    token = client.post('/api/auth/login', json={'email': pg_user['email']}).get_json()['access_token']
+    response = client.get('/api/auth/verify', headers={'Authorization': f'Bearer {token}'})
+    assert response.status_code == 200